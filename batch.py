@@ -0,0 +1,105 @@
+from chess import Board, Move, PackedMoves, PACKED_MAX_BOARD_SIZE, getAllPossibleMoves
+from collections import deque
+from itertools import islice
+import multiprocessing
+
+"""
+Batch move generation over many positions, sharded across a pool of worker processes
+Positions are (boardInfo, isFirstPlayer) pairs and results come back in input order as a stream
+
+Boards are sent to the workers as tuples of piece classes and positions,
+moves come back as piece indexes and target squares and are rebuilt with the caller's pieces,
+so every result is the same as getAllPossibleMoves on the caller's board
+Asking for packed results keeps the work left in the calling process to a minimum
+"""
+
+""" Number of chunks per worker in flight, bounds the memory used by a batch """
+CHUNKS_PER_WORKER = 4
+
+
+""" Encode a board as (boardSize, ((pieceClass, position), ...) of p1, ... of p2) """
+def encodeBoard(boardInfo):
+	return (boardInfo['boardSize'],
+		tuple((type(piece), piece.position) for piece in boardInfo['P1']),
+		tuple((type(piece), piece.position) for piece in boardInfo['P2']))
+
+def decodeBoard(encoded):
+	boardSize, p1Pieces, p2Pieces = encoded
+	return Board(boardSize, [pieceClass(position) for pieceClass, position in p1Pieces],
+		[pieceClass(position) for pieceClass, position in p2Pieces])
+
+"""
+Generate the moves of one encoded position in a worker
+Returns an array of (piece index, target square) pairs when the squares fit in a PackedMoves array,
+otherwise a list of (piece index, position) pairs, which is also used with a backend
+"""
+def _encodedMoves(task):
+	encoded, isFirstPlayer, backend, packed = task
+	boardInfo = decodeBoard(encoded)
+	pieces = boardInfo['P1' if isFirstPlayer else 'P2']
+	if backend is not None:
+		indexes = dict((id(piece), i) for i, piece in enumerate(pieces))
+		return [(indexes[id(move.piece)], move.position) for move in getAllPossibleMoves(boardInfo, isFirstPlayer, backend)]
+	if packed or boardInfo['boardSize'] <= PACKED_MAX_BOARD_SIZE:
+		return getAllPossibleMoves(boardInfo, isFirstPlayer, packed=True).data
+	return [(i, position) for i, piece in enumerate(pieces) for position in piece.getPossiblePositions(boardInfo, isFirstPlayer)]
+
+""" Generate the moves of a chunk of encoded positions in a worker """
+def _encodedChunk(tasks):
+	return [_encodedMoves(task) for task in tasks]
+
+""" Rebuild the moves of a worker result with the pieces of the original board """
+def _decodeMoves(boardInfo, isFirstPlayer, encodedMoves, packed):
+	pieces = boardInfo['P1' if isFirstPlayer else 'P2']
+	if isinstance(encodedMoves, list):
+		return [Move(pieces[pieceIndex], position) for pieceIndex, position in encodedMoves]
+	moves = PackedMoves(pieces, boardInfo['boardSize'])
+	moves.data = encodedMoves
+	if packed:
+		return moves
+	return list(moves)
+
+"""
+Yield the possible moves of every (boardInfo, isFirstPlayer) position, in input order
+workers is the number of processes, all cores by default, 1 generates the moves in this process
+chunkSize is the number of positions sent to a worker at a time
+If packed is set each result is a PackedMoves list
+
+Up to CHUNKS_PER_WORKER chunks per worker are in flight, a new chunk is sent as soon as the oldest one is taken,
+before its results are yielded, so the workers keep busy while the caller goes through the results
+"""
+def iterBatchMoves(positions, workers=None, chunkSize=64, backend=None, packed=False):
+	if backend is not None and packed:
+		raise ValueError('Packed moves are only generated by the piece classes')
+	if workers is None:
+		workers = multiprocessing.cpu_count()
+	if workers <= 1:
+		for boardInfo, isFirstPlayer in positions:
+			yield getAllPossibleMoves(boardInfo, isFirstPlayer, backend, packed)
+		return
+
+	positions = iter(positions)
+	pending = deque()
+	pool = multiprocessing.Pool(workers)
+	try:
+		def submit():
+			chunk = list(islice(positions, chunkSize))
+			if chunk:
+				tasks = [(encodeBoard(boardInfo), isFirstPlayer, backend, packed) for boardInfo, isFirstPlayer in chunk]
+				pending.append((chunk, pool.apply_async(_encodedChunk, (tasks,))))
+			return bool(chunk)
+		while len(pending) < workers * CHUNKS_PER_WORKER and submit():
+			pass
+		while pending:
+			chunk, result = pending.popleft()
+			submit()
+			for (boardInfo, isFirstPlayer), encodedMoves in zip(chunk, result.get()):
+				yield _decodeMoves(boardInfo, isFirstPlayer, encodedMoves, packed)
+		pool.close()
+	finally:
+		pool.terminate()
+		pool.join()
+
+""" Get the possible moves of every position as a list, see iterBatchMoves """
+def getBatchMoves(positions, workers=None, chunkSize=64, backend=None, packed=False):
+	return list(iterBatchMoves(positions, workers, chunkSize, backend, packed))
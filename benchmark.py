@@ -0,0 +1,131 @@
+from chess import Board, Move, makeMove
+from batch import getBatchMoves
+from perft import POSITIONS, runSuite, countMismatches, splitPaths
+from timeit import default_timer
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+"""
+Throughput of the perft and batch workloads, and comparison of the same workloads between interpreters
+
+The perft workload is the perft suite, the batch workload generates the moves of the positions
+a few plies below each suite position, as getBatchMoves does for a batch of positions
+--compare runs this module under each given interpreter, e.g. python2 and python3, and reports the throughput
+of each interpreter relative to the first one, it fails if the interpreters do not count the same nodes and moves
+
+Usage: python benchmark.py [--depth N] [--positions name,...] [--backend name] [--plies N] [--limit N]
+	[--json] [--compare INTERPRETER ...]
+"""
+
+"""
+Get the (Board, isFirstPlayer) positions plies moves below each suite position,
+at most limit positions per suite position
+"""
+def batchPositions(names=None, plies=2, limit=1000):
+	positions = []
+	for name in (names or POSITIONS.keys()):
+		build = POSITIONS[name][0]
+		for rootIndex, path in splitPaths(build(), True, plies)[:limit]:
+			board = Board.fromBoardInfo(build())
+			isFirstPlayer = True
+			for fromPosition, toPosition in path:
+				makeMove(board, Move(board.pieceAt(fromPosition, isFirstPlayer), toPosition), isFirstPlayer)
+				isFirstPlayer = not isFirstPlayer
+			positions.append((board, isFirstPlayer))
+	return positions
+
+""" Generate the moves of every position in this process, returns the result dictionary of the batch workload """
+def runBatch(positions, backend=None):
+	start = default_timer()
+	moves = sum(len(positionMoves) for positionMoves in getBatchMoves(positions, 1, backend=backend))
+	seconds = default_timer() - start
+	return {
+		'name': 'batch',
+		'positions': len(positions),
+		'moves': moves,
+		'seconds': seconds,
+		'pps': len(positions) / seconds if seconds > 0 else float('inf'),
+	}
+
+""" Run both workloads, returns {'python': interpreter, 'perft': suite results, 'batch': batch result} """
+def runBenchmark(names=None, depth=None, backend=None, plies=2, limit=1000):
+	positions = batchPositions(names, plies, limit)
+	return {
+		'python': '%s %s' % (platform.python_implementation(), platform.python_version()),
+		'perft': runSuite(names, depth, backend),
+		'batch': runBatch(positions, backend),
+	}
+
+""" Run the benchmark under another interpreter with the given benchmark arguments, returns its results """
+def runInterpreter(interpreter, arguments):
+	output = subprocess.check_output([interpreter, os.path.abspath(__file__), '--json'] + arguments)
+	return json.loads(output.decode('utf-8'))
+
+"""
+Compare the results of several interpreters, the first one is the reference
+Returns (rows, failures), a row is (workload, count, [throughput of each interpreter]),
+failures list the workloads whose counts differ between interpreters or from the reference counts
+"""
+def compareResults(runs):
+	rows = []
+	failures = []
+	for i, result in enumerate(runs[0]['perft']):
+		results = [run['perft'][i] for run in runs]
+		rows.append((result['name'], result['nodes'], [other['nps'] for other in results]))
+		if any(other['nodes'] != result['nodes'] for other in results) or countMismatches(results):
+			failures.append(result['name'])
+	batches = [run['batch'] for run in runs]
+	rows.append(('batch', batches[0]['moves'], [batch['pps'] for batch in batches]))
+	if any(batch['moves'] != batches[0]['moves'] for batch in batches):
+		failures.append('batch')
+	return rows, failures
+
+def formatComparison(runs, rows):
+	lines = ['%-12s %10s  %s' % ('workload', 'count', '  '.join('%24s' % run['python'] for run in runs))]
+	for name, count, rates in rows:
+		lines.append('%-12s %10d  %s' % (name, count, '  '.join('%14.0f/s %7.2fx' % (rate, rate / rates[0]) for rate in rates)))
+	return '\n'.join(lines)
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Perft and batch throughput, compared between interpreters')
+	parser.add_argument('--depth', type=int, help='perft depth of every position instead of its default depth')
+	parser.add_argument('--positions', help='comma separated position names, one of ' + ', '.join(POSITIONS.keys()))
+	parser.add_argument('--backend', help='move generation backend, e.g. bitboard')
+	parser.add_argument('--plies', type=int, default=2, help='plies below the suite positions of the batch positions')
+	parser.add_argument('--limit', type=int, default=1000, help='batch positions taken below each suite position')
+	parser.add_argument('--json', action='store_true', help='write the results as JSON')
+	parser.add_argument('--compare', nargs='+', metavar='INTERPRETER', help='run under each interpreter and compare them')
+	args = parser.parse_args(argv)
+
+	if args.compare:
+		arguments = ['--plies', str(args.plies), '--limit', str(args.limit)]
+		for option, value in [('--depth', args.depth), ('--positions', args.positions), ('--backend', args.backend)]:
+			if value is not None:
+				arguments.extend([option, str(value)])
+		runs = [runInterpreter(interpreter, arguments) for interpreter in args.compare]
+		rows, failures = compareResults(runs)
+		print(formatComparison(runs, rows))
+		for name in failures:
+			print('MISMATCH %s: counts differ between interpreters or from the reference' % name)
+		return 1 if failures else 0
+
+	names = args.positions.split(',') if args.positions else None
+	results = runBenchmark(names, args.depth, args.backend, args.plies, args.limit)
+	if args.json:
+		print(json.dumps(results, sort_keys=True))
+	else:
+		print(results['python'])
+		for result in results['perft']:
+			print('%-12s depth %d  %10d nodes  %8.3fs  %10.0f nodes/s' % (
+				result['name'], result['depth'], result['nodes'], result['seconds'], result['nps']))
+		batch = results['batch']
+		print('%-12s %d positions  %8d moves  %8.3fs  %10.0f positions/s' % (
+			'batch', batch['positions'], batch['moves'], batch['seconds'], batch['pps']))
+	return 1 if countMismatches(results['perft']) else 0
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,160 @@
+from chess import Move, SlidingPiece, JumpingPiece, Pawn
+from chess import KING_OFFSETS, KNIGHT_OFFSETS, BISHOP_DIRECTIONS, ROOK_DIRECTIONS
+
+"""
+Bitboard move generation for standard 8x8 boards
+Occupancy is kept as 64 bit integer masks, square index is x + 8 * y
+so bit 0 is position (0, 0) and bit 63 is position (7, 7)
+
+Gives the same moves as chess.getAllPossibleMoves
+Moves are grouped by piece in the order of the player's pieces,
+the moves of one piece are ordered by square index
+"""
+
+BOARD_SIZE = 8
+
+POSITIONS = tuple((square & 7, square >> 3) for square in range(64))
+
+
+def _onBoard(x, y):
+	return 0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE
+
+""" Build the target mask of every square for a set of jump offsets """
+def _buildJumpTable(offsets):
+	table = []
+	for x, y in POSITIONS:
+		mask = 0
+		for dx, dy in offsets:
+			if _onBoard(x + dx, y + dy):
+				mask |= 1 << (x + dx + BOARD_SIZE * (y + dy))
+		table.append(mask)
+	return tuple(table)
+
+""" Build the ray mask of every square for a direction, not including the square itself """
+def _buildRayTable(direction):
+	table = []
+	for x, y in POSITIONS:
+		mask = 0
+		x, y = x + direction[0], y + direction[1]
+		while _onBoard(x, y):
+			mask |= 1 << (x + BOARD_SIZE * y)
+			x, y = x + direction[0], y + direction[1]
+		table.append(mask)
+	return tuple(table)
+
+""" Build the diagonal attack masks of p1 pawns (moving up) or p2 pawns (moving down) """
+def _buildPawnAttackTable(displacement):
+	return _buildJumpTable(((displacement, displacement), (-displacement, displacement)))
+
+""" Get the target masks of a set of jump offsets, built on first use """
+def jumpTable(offsets):
+	table = JUMP_TABLES.get(offsets)
+	if table is None:
+		table = JUMP_TABLES[offsets] = _buildJumpTable(offsets)
+	return table
+
+"""
+Get the ray masks of a direction with a flag telling if the ray goes towards higher square indexes
+The flag decides if the closest blocker is the lowest or the highest set bit
+"""
+def rayTable(direction):
+	rays = RAYS.get(direction)
+	if rays is None:
+		increasing = direction[1] > 0 or (direction[1] == 0 and direction[0] > 0)
+		rays = RAYS[direction] = (_buildRayTable(direction), increasing)
+	return rays
+
+KING_ATTACKS = _buildJumpTable(KING_OFFSETS)
+KNIGHT_ATTACKS = _buildJumpTable(KNIGHT_OFFSETS)
+P1_PAWN_ATTACKS = _buildPawnAttackTable(1)
+P2_PAWN_ATTACKS = _buildPawnAttackTable(-1)
+
+JUMP_TABLES = {KING_OFFSETS: KING_ATTACKS, KNIGHT_OFFSETS: KNIGHT_ATTACKS}
+RAYS = {}
+for direction in BISHOP_DIRECTIONS + ROOK_DIRECTIONS:
+	rayTable(direction)
+
+
+""" Get the squares a slider reaches along its directions, stopping at the first piece """
+def slidingAttacks(square, directions, occupied):
+	attacks = 0
+	for direction in directions:
+		rays, increasing = RAYS.get(direction) or rayTable(direction)
+		ray = rays[square]
+		blockers = ray & occupied
+		if blockers:
+			if increasing:
+				blocker = (blockers & -blockers).bit_length() - 1
+			else:
+				blocker = blockers.bit_length() - 1
+			ray ^= rays[blocker]
+		attacks |= ray
+	return attacks
+
+""" Get the push and capture targets of a pawn """
+def pawnTargets(square, isP1Piece, own, enemy):
+	if isP1Piece:
+		displacement = BOARD_SIZE
+		startingRow = 1
+		attacks = P1_PAWN_ATTACKS[square]
+	else:
+		displacement = -BOARD_SIZE
+		startingRow = BOARD_SIZE - 2
+		attacks = P2_PAWN_ATTACKS[square]
+	targets = attacks & enemy
+
+	# pushes are only blocked by own pieces and stop at the edge of the board
+	push = square + displacement
+	if 0 <= push < BOARD_SIZE * BOARD_SIZE and not (own >> push) & 1:
+		targets |= 1 << push
+		push += displacement
+		if (square >> 3) == startingRow and not (own >> push) & 1:
+			targets |= 1 << push
+	return targets
+
+""" Get the mask of positions occupied by a list of pieces """
+def occupancyMask(pieces):
+	mask = 0
+	for piece in pieces:
+		x, y = piece.position
+		if not _onBoard(x, y):
+			raise ValueError('Piece %s is off the board at %s' % (type(piece).__name__, piece.position))
+		mask |= 1 << (x + BOARD_SIZE * y)
+	return mask
+
+""" Get the target mask of a piece, None if the piece type is not known to this backend """
+def pieceTargets(piece, isP1Piece, own, enemy):
+	square = piece.position[0] + BOARD_SIZE * piece.position[1]
+	if isinstance(piece, SlidingPiece):
+		targets = slidingAttacks(square, piece.directions, own | enemy)
+	elif isinstance(piece, JumpingPiece):
+		targets = jumpTable(piece.offsets)[square]
+	elif isinstance(piece, Pawn):
+		return pawnTargets(square, isP1Piece, own, enemy)
+	else:
+		return None
+	return targets & ~own
+
+""" Iterate through all of players pieces and get all possible moves """
+def getAllPossibleMoves(boardInfo, isFirstPlayer):
+	if boardInfo['boardSize'] != BOARD_SIZE:
+		raise ValueError('Bitboard backend only supports %dx%d boards' % (BOARD_SIZE, BOARD_SIZE))
+	p1 = occupancyMask(boardInfo['P1'])
+	p2 = occupancyMask(boardInfo['P2'])
+	if isFirstPlayer:
+		pieces, own, enemy = boardInfo['P1'], p1, p2
+	else:
+		pieces, own, enemy = boardInfo['P2'], p2, p1
+
+	moves = []
+	for piece in pieces:
+		targets = pieceTargets(piece, isFirstPlayer, own, enemy)
+		if targets is None:
+			# custom pieces fall back to their own move generation
+			moves.extend(piece.getPossibleMoves(boardInfo, isFirstPlayer))
+			continue
+		while targets:
+			bit = targets & -targets
+			moves.append(Move(piece, POSITIONS[bit.bit_length() - 1]))
+			targets ^= bit
+	return moves
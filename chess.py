@@ -1,16 +1,31 @@
 from abc import ABCMeta, abstractmethod
+from array import array
+from collections import OrderedDict
+import hashlib
+
+try:
+	xrange = xrange
+except NameError:
+	xrange = range
 
 """
 Give all the possible moves from one player based on board information and whose turn it is
 Piece classes give possible moves from each piece
+Custom pieces can subclass SlidingPiece or JumpingPiece and only declare their directions or offsets
 Board info is a dictionary with keys, 'P1' and 'P2'
 Values are the pieces each player has
+A Board can be used in place of the dictionary for constant time collision checks
+and an incrementally updated position hash
+Moves can also be returned as a PackedMoves list that stores integer square indexes
 
-Moves do not take into account castling or checks
+Moves do not take into account castling or checks,
+getLegalMoves filters out the moves that leave a king attacked
 """
 
 class Move(object):
 	"""Move class"""
+	__slots__ = ('piece', 'position')
+
 	def __init__(self, piece, position):
 		self.piece = piece
 		self.position = position
@@ -19,10 +34,300 @@ class Move(object):
 		return str(self.piece) + str(self.position)
 
 
-class Piece:
-	__metaclass__ = ABCMeta
+"""
+Zobrist style position hashing
+Every (piece class, player, position), board size and the side to move has a random 64 bit key
+and the hash of a position is the xor of its keys, so it can be updated one piece at a time
+Keys are derived from a digest of what they stand for, so they are the same in every process
+"""
+_zobristKeys = {}
+
+def zobristKey(*parts):
+	key = _zobristKeys.get(parts)
+	if key is None:
+		digest = hashlib.md5(repr(parts).encode('ascii')).hexdigest()
+		key = _zobristKeys[parts] = int(digest[:16], 16)
+	return key
+
+""" Get the key of a piece of p1 or p2 standing on a position """
+def pieceKey(piece, isP1Piece, position):
+	pieceClass = type(piece)
+	return zobristKey(pieceClass.__module__, pieceClass.__name__, bool(isP1Piece), position)
+
+""" Get the xor of the keys of a list of pieces """
+def piecesHash(pieces, isP1Piece):
+	pieceHash = 0
+	for piece in pieces:
+		pieceHash ^= pieceKey(piece, isP1Piece, piece.position)
+	return pieceHash
+
+""" Piece class -> whether it derives from Pawn, looked up without the abstract class checks of isinstance """
+_pawnClasses = {}
+
+def isPawnClass(pieceClass):
+	isPawn = _pawnClasses.get(pieceClass)
+	if isPawn is None:
+		isPawn = _pawnClasses[pieceClass] = issubclass(pieceClass, Pawn)
+	return isPawn
+
+""" Get the xor of the keys of the pawns of a list of pieces """
+def pawnsHash(pieces, isP1Piece):
+	return piecesHash([piece for piece in pieces if isPawnClass(type(piece))], isP1Piece)
+
+""" Get the hash of a position from the pieces, the board size and the side to move """
+def positionHash(boardInfo, isFirstPlayer):
+	if isinstance(boardInfo, Board):
+		return boardInfo.positionHash(isFirstPlayer)
+	pieceHash = piecesHash(boardInfo['P1'], True) ^ piecesHash(boardInfo['P2'], False)
+	return pieceHash ^ zobristKey('boardSize', boardInfo['boardSize']) ^ zobristKey('side', bool(isFirstPlayer))
+
+
+class Board(dict):
+	"""
+	Board info dictionary that also keeps a position -> piece map for each player
+	Can be used anywhere a board info dictionary is expected
+	Pieces must be moved, added and removed through the board so the maps and hashes stay in sync
+	Besides the hash of all pieces, the hash of the pawns alone is kept for caches keyed by the pawn structure
+	"""
+	def __init__(self, boardSize, p1Pieces=(), p2Pieces=()):
+		dict.__init__(self)
+		self['boardSize'] = boardSize
+		self['P1'] = list(p1Pieces)
+		self['P2'] = list(p2Pieces)
+
+	""" Build a board from an existing board info dictionary """
+	@classmethod
+	def fromBoardInfo(cls, boardInfo):
+		return cls(boardInfo['boardSize'], boardInfo['P1'], boardInfo['P2'])
+
+	""" Rebuild the occupancy map and hash when a player's piece list is replaced """
+	def __setitem__(self, key, value):
+		dict.__setitem__(self, key, value)
+		if key == 'P1':
+			self.p1Occupancy = dict((piece.position, piece) for piece in value)
+			self.p1Hash = piecesHash(value, True)
+			self.p1PawnHash = pawnsHash(value, True)
+		elif key == 'P2':
+			self.p2Occupancy = dict((piece.position, piece) for piece in value)
+			self.p2Hash = piecesHash(value, False)
+			self.p2PawnHash = pawnsHash(value, False)
+
+	""" Get the hash of the position with the given side to move """
+	def positionHash(self, isFirstPlayer):
+		return (self.p1Hash ^ self.p2Hash ^ zobristKey('boardSize', self['boardSize'])
+			^ zobristKey('side', bool(isFirstPlayer)))
+
+	""" Get the hash of the pawns of both players and the board size """
+	def pawnHash(self):
+		return self.p1PawnHash ^ self.p2PawnHash ^ zobristKey('boardSize', self['boardSize'])
+
+	""" Add or remove the key of a piece on a position from its player's hashes """
+	def togglePieceKey(self, piece, isP1Piece, position):
+		key = pieceKey(piece, isP1Piece, position)
+		isPawn = _pawnClasses.get(type(piece))
+		if isPawn is None:
+			isPawn = isPawnClass(type(piece))
+		if isP1Piece:
+			self.p1Hash ^= key
+			if isPawn:
+				self.p1PawnHash ^= key
+		else:
+			self.p2Hash ^= key
+			if isPawn:
+				self.p2PawnHash ^= key
+
+	""" Get the position -> piece map of p1 or p2 """
+	def occupancy(self, isP1Piece):
+		if isP1Piece:
+			return self.p1Occupancy
+		return self.p2Occupancy
+
+	""" Get the piece of p1 or p2 at a position, None if empty """
+	def pieceAt(self, position, isP1Piece):
+		return self.occupancy(isP1Piece).get(position)
+
+	""" Add a piece at the end of its player's list, or at an index of the list """
+	def addPiece(self, piece, isP1Piece, index=None):
+		pieces = self['P1' if isP1Piece else 'P2']
+		if index is None:
+			pieces.append(piece)
+		else:
+			pieces.insert(index, piece)
+		self.occupancy(isP1Piece)[piece.position] = piece
+		self.togglePieceKey(piece, isP1Piece, piece.position)
+
+	""" Remove a piece and return the index it had in its player's list """
+	def removePiece(self, piece, isP1Piece):
+		pieces = self['P1' if isP1Piece else 'P2']
+		index = pieces.index(piece)
+		del pieces[index]
+		del self.occupancy(isP1Piece)[piece.position]
+		self.togglePieceKey(piece, isP1Piece, piece.position)
+		return index
+
+	""" Move a piece to a new position and update the occupancy map and hash """
+	def movePiece(self, piece, position, isP1Piece):
+		occupancy = self.occupancy(isP1Piece)
+		del occupancy[piece.position]
+		self.togglePieceKey(piece, isP1Piece, piece.position)
+		piece.position = position
+		occupancy[position] = piece
+		self.togglePieceKey(piece, isP1Piece, position)
+
+
+KING_OFFSETS = tuple((row, col) for row in xrange(-1, 2) for col in xrange(-1, 2) if not ((row == 0) and col == 0))
+KNIGHT_OFFSETS = ((1, 2), (2, 1), (1, -2), (2, -1), (-1, 2), (-2, 1), (-1, -2), (-2, -1))
+BISHOP_DIRECTIONS = ((1, 1), (-1, 1), (1, -1), (-1, -1))
+ROOK_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class LazyTable(dict):
+	"""
+	position -> precomputed moves of one ray or jump set
+	The entry of a position is built the first time it is looked up,
+	positions off the board have no moves
+	"""
+	def __init__(self, build, boardSize):
+		dict.__init__(self)
+		self.build = build
+		self.boardSize = boardSize
+
+	def __missing__(self, position):
+		if not (0 <= position[0] < self.boardSize and 0 <= position[1] < self.boardSize):
+			return ()
+		entry = self[position] = self.build(position)
+		return entry
+
 
-	""" Piece class (Abstract) """
+class MoveTables(object):
+	"""
+	Precomputed in bounds rays and jump targets of every position for one board size
+	The entries of a position are built the first time it is looked up and kept for the life of the tables,
+	so a short lived process only pays for the positions its pieces stand on
+	"""
+	def __init__(self, boardSize):
+		self.boardSize = boardSize
+		self.raySets = {}
+		self.jumpSets = {}
+
+	""" Get position -> one ray of in bounds positions per direction, closest position first """
+	def getRaySet(self, directions):
+		raySet = self.raySets.get(directions)
+		if raySet is None:
+			raySet = self.raySets[directions] = LazyTable(
+				lambda position: tuple(self.ray(position, direction) for direction in directions), self.boardSize)
+		return raySet
+
+	""" Get position -> in bounds target positions, in the order of the offsets """
+	def getJumpSet(self, offsets):
+		jumpSet = self.jumpSets.get(offsets)
+		if jumpSet is None:
+			jumpSet = self.jumpSets[offsets] = LazyTable(lambda position: self.jumps(position, offsets), self.boardSize)
+		return jumpSet
+
+	def jumps(self, position, offsets):
+		x, y = position
+		return tuple((x + dx, y + dy) for dx, dy in offsets if 0 <= x + dx < self.boardSize and 0 <= y + dy < self.boardSize)
+
+	def ray(self, position, direction):
+		positions = []
+		x, y = position[0] + direction[0], position[1] + direction[1]
+		while 0 <= x < self.boardSize and 0 <= y < self.boardSize:
+			positions.append((x, y))
+			x, y = x + direction[0], y + direction[1]
+		return tuple(positions)
+
+
+""" Maximum number of board sizes kept in the move table cache """
+TABLE_CACHE_SIZE = 8
+
+_moveTables = OrderedDict()
+_lastMoveTables = None
+
+""" Get the move tables of a board size, least recently used sizes are dropped from the cache """
+def getMoveTables(boardSize):
+	global _lastMoveTables
+	if _lastMoveTables is not None and _lastMoveTables.boardSize == boardSize:
+		return _lastMoveTables
+	tables = _moveTables.pop(boardSize, None)
+	if tables is None:
+		tables = MoveTables(boardSize)
+		while len(_moveTables) >= TABLE_CACHE_SIZE:
+			_moveTables.popitem(last=False)
+	_moveTables[boardSize] = tables
+	_lastMoveTables = tables
+	return tables
+
+
+""" Convert a position to its integer square index """
+def squareIndex(position, boardSize):
+	return position[0] + boardSize * position[1]
+
+""" Convert an integer square index back to its position """
+def squarePosition(square, boardSize):
+	return (square % boardSize, square // boardSize)
+
+
+""" Largest board size whose square indexes fit in the unsigned shorts of PackedMoves """
+PACKED_MAX_BOARD_SIZE = 256
+
+class PackedMoves(object):
+	"""
+	Compact list of the moves of one player, backed by an unsigned short array
+	Each move is stored as the index of the piece in the player's piece list followed by the target square index
+	Move objects are only created when a move is accessed, so boards are limited to 256x256
+	"""
+	__slots__ = ('pieces', 'boardSize', 'data')
+
+	def __init__(self, pieces, boardSize):
+		self.pieces = pieces
+		self.boardSize = boardSize
+		self.data = array('H')
+
+	def append(self, pieceIndex, position):
+		self.data.append(pieceIndex)
+		self.data.append(position[0] + self.boardSize * position[1])
+
+	def __len__(self):
+		return len(self.data) // 2
+
+	def __getitem__(self, index):
+		if index < 0:
+			index += len(self)
+		if not 0 <= index < len(self):
+			raise IndexError('move index out of range')
+		return Move(self.pieces[self.data[2 * index]], squarePosition(self.data[2 * index + 1], self.boardSize))
+
+	def __iter__(self):
+		data = self.data
+		for i in xrange(0, len(data), 2):
+			yield Move(self.pieces[data[i]], squarePosition(data[i + 1], self.boardSize))
+
+
+""" Function behind a method of a class, unbound methods of Python 2 are unwrapped """
+def _function(cls, name):
+	method = getattr(cls, name)
+	return getattr(method, '__func__', method)
+
+""" Piece classes that override getPossibleMoves or getPossiblePositions """
+_completePieceClasses = set()
+
+""" Fail instead of recursing between the two defaults of Piece when a class overrides neither """
+def _checkComplete(cls):
+	if all(_function(cls, name) is _function(Piece, name) for name in ('getPossibleMoves', 'getPossiblePositions')):
+		raise NotImplementedError('%s defines neither getPossibleMoves nor getPossiblePositions' % cls.__name__)
+	_completePieceClasses.add(cls)
+
+""" Abstract base of Piece, built by calling ABCMeta so the same code declares the metaclass in Python 2 and 3 """
+_AbstractPiece = ABCMeta('_AbstractPiece', (object,), {'__slots__': ()})
+
+class Piece(_AbstractPiece):
+	__slots__ = ('position',)
+
+	"""
+	Piece class (Abstract)
+	Subclasses give either getPossiblePositions or getPossibleMoves, the other one is derived from it
+	"""
 	def __init__(self, position):
 		self.position = position
 
@@ -30,9 +335,31 @@ class Piece:
 	def __str__(self):
 		""" Convert to string for readability """
 
-	@abstractmethod
-	def getPossibleMoves(self, boardSize, isP1Piece):
-		""" Get all possible moves from this piece """
+	""" Get all possible moves from this piece """
+	def getPossibleMoves(self, boardInfo, isP1Piece):
+		if type(self) not in _completePieceClasses:
+			_checkComplete(type(self))
+		return [Move(self, position) for position in self.getPossiblePositions(boardInfo, isP1Piece)]
+
+	""" Get the target positions of all possible moves from this piece """
+	def getPossiblePositions(self, boardInfo, isP1Piece):
+		if type(self) not in _completePieceClasses:
+			_checkComplete(type(self))
+		return [move.position for move in self.getPossibleMoves(boardInfo, isP1Piece)]
+
+	""" Get the target positions of the possible moves from this piece that capture an enemy piece """
+	def getCapturePositions(self, boardInfo, isP1Piece):
+		return [position for position in self.getPossiblePositions(boardInfo, isP1Piece)
+			if self.hasCollision(position, boardInfo, not isP1Piece)]
+
+	""" Yield the possible moves from this piece one at a time """
+	def iterPossibleMoves(self, boardInfo, isP1Piece):
+		for position in self.iterPossiblePositions(boardInfo, isP1Piece):
+			yield Move(self, position)
+
+	""" Yield the target positions of the possible moves from this piece, lazily where the piece supports it """
+	def iterPossiblePositions(self, boardInfo, isP1Piece):
+		return iter(self.getPossiblePositions(boardInfo, isP1Piece))
 
 	""" Check if piece position is out of bounds """
 	def outOfBounds(self, checkPosition, boardSize):
@@ -41,6 +368,8 @@ class Piece:
 
 	""" Check if colliding with p1 or p2 pieces """
 	def hasCollision(self, checkPosition, boardInfo, checkP1Piece):
+		if isinstance(boardInfo, Board):
+			return checkPosition in boardInfo.occupancy(checkP1Piece)
 		if checkP1Piece:
 			piecesToCheck = boardInfo['P1']
 		else:
@@ -82,103 +411,149 @@ class Piece:
 				possibleMoves.append(Move(self, positions[i]))
 		return possibleMoves
 
+	"""
+	Iterate through precomputed in bounds rays and keep the positions that can be moved to
+	Each ray is stopped if blocked by own pieces or if capturing an enemy piece
+	"""
+	def walkRays(self, rays, boardInfo, isP1Piece):
+		possiblePositions = []
+		for ray in rays:
+			for position in ray:
+				if self.hasCollision(position, boardInfo, isP1Piece):
+					break
+				possiblePositions.append(position)
+				if self.hasCollision(position, boardInfo, not isP1Piece):
+					break
+		return possiblePositions
+
+	""" Keep the precomputed in bounds positions that are not blocked by own pieces """
+	def walkJumps(self, positions, boardInfo, isP1Piece):
+		return [position for position in positions if not self.hasCollision(position, boardInfo, isP1Piece)]
+
+	""" Keep the first position of each ray if it holds an enemy piece and no own piece stands before it """
+	def walkCaptures(self, rays, boardInfo, isP1Piece):
+		own, enemy = _sides(boardInfo, isP1Piece)
+		capturePositions = []
+		for ray in rays:
+			for position in ray:
+				if position in own:
+					break
+				if position in enemy:
+					capturePositions.append(position)
+					break
+		return capturePositions
+
+	""" Lazy version of walkRays, the next position of a ray is only checked when asked for """
+	def iterRays(self, rays, boardInfo, isP1Piece):
+		for ray in rays:
+			for position in ray:
+				if self.hasCollision(position, boardInfo, isP1Piece):
+					break
+				yield position
+				if self.hasCollision(position, boardInfo, not isP1Piece):
+					break
+
+	""" Lazy version of walkJumps """
+	def iterJumps(self, positions, boardInfo, isP1Piece):
+		for position in positions:
+			if not self.hasCollision(position, boardInfo, isP1Piece):
+				yield position
+
+
+class SlidingPiece(Piece):
+	"""
+	Piece that moves any distance along a set of directions (Abstract)
+	Subclasses only declare their direction vectors, e.g. directions = ((1, 1), (-1, -1))
+	"""
+	__slots__ = ()
+	directions = ()
 
-class King(Piece):
-	def __str__(self):
-		return 'K'
+	""" Checks each line movement along the directions """
+	def getPossiblePositions(self, boardInfo, isP1Piece):
+		rays = getMoveTables(boardInfo['boardSize']).getRaySet(self.directions)[self.position]
+		return self.walkRays(rays, boardInfo, isP1Piece)
 
-	""" Checks neighboring spaces """
-	def getPossibleMoves(self, boardInfo, isP1Piece):
-		possibleMoves = []
-		checkMoves = [(self.position[0] + row, self.position[1] + col) for row in xrange(-1, 2) for col in xrange(-1, 2) if not ((row == 0) and col == 0)]
-		return self.setPossiblePositionsNoBlocking(checkMoves, boardInfo, isP1Piece)
+	def iterPossiblePositions(self, boardInfo, isP1Piece):
+		rays = getMoveTables(boardInfo['boardSize']).getRaySet(self.directions)[self.position]
+		return self.iterRays(rays, boardInfo, isP1Piece)
 
+	def getCapturePositions(self, boardInfo, isP1Piece):
+		rays = getMoveTables(boardInfo['boardSize']).getRaySet(self.directions)[self.position]
+		return self.walkCaptures(rays, boardInfo, isP1Piece)
 
-class Queen(Piece):
-	def __str__(self):
-		return 'Q'
 
-	""" Checks union of Bishop + Rook moves """
-	def getPossibleMoves(self, boardInfo, isP1Piece):
-		b = Bishop(self.position)
-		possibleMoves = b.getPossibleMoves(boardInfo, isP1Piece)
-		r = Rook(self.position)
-		possibleMoves.extend(r.getPossibleMoves(boardInfo, isP1Piece))
-		possibleMoves[:] = [Move(self, st.position) for st in possibleMoves]
-		return possibleMoves
+class JumpingPiece(Piece):
+	"""
+	Piece that jumps to a fixed set of offsets (Abstract)
+	Subclasses only declare their offsets, e.g. offsets = ((1, 2), (2, 1))
+	"""
+	__slots__ = ()
+	offsets = ()
 
-class Bishop(Piece):
-	def __str__(self):
-		return 'B'
+	""" Checks each jump offset """
+	def getPossiblePositions(self, boardInfo, isP1Piece):
+		jumps = getMoveTables(boardInfo['boardSize']).getJumpSet(self.offsets)[self.position]
+		return self.walkJumps(jumps, boardInfo, isP1Piece)
 
-	""" Checks diagonal lines """
-	def getPossibleMoves(self, boardInfo, isP1Piece):
-		boardSize = boardInfo['boardSize']
-		possibleMoves = []
+	def iterPossiblePositions(self, boardInfo, isP1Piece):
+		jumps = getMoveTables(boardInfo['boardSize']).getJumpSet(self.offsets)[self.position]
+		return self.iterJumps(jumps, boardInfo, isP1Piece)
 
-		upperRightPositions = [(self.position[0] + i, self.position[1] + i) for i in xrange(1, boardSize)]
-		possibleMoves.extend(self.setPossiblePositions(upperRightPositions, boardInfo, isP1Piece))
+	def getCapturePositions(self, boardInfo, isP1Piece):
+		jumps = getMoveTables(boardInfo['boardSize']).getJumpSet(self.offsets)[self.position]
+		enemy = _sides(boardInfo, isP1Piece)[1]
+		return [position for position in jumps if position in enemy]
 
-		upperLeftPositions = [(self.position[0] - i, self.position[1] + i) for i in xrange(1, boardSize)]
-		possibleMoves.extend(self.setPossiblePositions(upperLeftPositions, boardInfo, isP1Piece))
 
-		lowerRightPositions = [(self.position[0] + i, self.position[1] - i) for i in xrange(1, boardSize)]
-		possibleMoves.extend(self.setPossiblePositions(lowerRightPositions, boardInfo, isP1Piece))
+class King(JumpingPiece):
+	""" Checks neighboring spaces """
+	__slots__ = ()
+	offsets = KING_OFFSETS
 
-		lowerLeftPositions = [(self.position[0] - i, self.position[1] - i) for i in xrange(1, boardSize)]
-		possibleMoves.extend(self.setPossiblePositions(lowerLeftPositions, boardInfo, isP1Piece))
+	def __str__(self):
+		return 'K'
 
-		return possibleMoves
 
-class Knight(Piece):
-	def __str__(self):
-		return 'N'
+class Queen(SlidingPiece):
+	""" Checks union of Bishop + Rook moves """
+	__slots__ = ()
+	directions = BISHOP_DIRECTIONS + ROOK_DIRECTIONS
 
-	""" Checks all possible L moves """
-	def getPossibleMoves(self, boardInfo, isP1Piece):
-		possibleMoves = []
-		boardSize = boardInfo['boardSize']
-		toCheckPositions = []
-		toCheckPositions.extend([(self.position[0] + 1, self.position[1] + 2),
-			(self.position[0] + 2, self.position[1] + 1),
-			(self.position[0] + 1, self.position[1] - 2),
-			(self.position[0] + 2, self.position[1] - 1),
-			(self.position[0] - 1, self.position[1] + 2),
-			(self.position[0] - 2, self.position[1] + 1),
-			(self.position[0] - 1, self.position[1] - 2),
-			(self.position[0] - 2, self.position[1] - 1)])
-
-		return self.setPossiblePositionsNoBlocking(toCheckPositions, boardInfo, isP1Piece)	
-
-class Rook(Piece):
 	def __str__(self):
-		return 'R'
+		return 'Q'
 
-	""" Checks each horizontal/vertical line movement """
-	def getPossibleMoves(self, boardInfo, isP1Piece):
-		
-		boardSize = boardInfo['boardSize']
-		possibleMoves = []
+class Bishop(SlidingPiece):
+	""" Checks diagonal lines """
+	__slots__ = ()
+	directions = BISHOP_DIRECTIONS
 
-		right = [(self.position[0] + i, self.position[1]) for i in xrange(1, boardSize)]
-		possibleMoves.extend(self.setPossiblePositions(right, boardInfo, isP1Piece))
+	def __str__(self):
+		return 'B'
 
-		left = [(self.position[0] - i, self.position[1]) for i in xrange(1, boardSize)]
-		possibleMoves.extend(self.setPossiblePositions(left, boardInfo, isP1Piece))
+class Knight(JumpingPiece):
+	""" Checks all possible L moves """
+	__slots__ = ()
+	offsets = KNIGHT_OFFSETS
 
-		up = [(self.position[0], self.position[1] + i) for i in xrange(1, boardSize)]
-		possibleMoves.extend(self.setPossiblePositions(up, boardInfo, isP1Piece))
+	def __str__(self):
+		return 'N'
 
-		down = [(self.position[0], self.position[1] - i) for i in xrange(1, boardSize)]
-		possibleMoves.extend(self.setPossiblePositions(down, boardInfo, isP1Piece))
-		return possibleMoves
+class Rook(SlidingPiece):
+	""" Checks each horizontal/vertical line movement """
+	__slots__ = ()
+	directions = ROOK_DIRECTIONS
+
+	def __str__(self):
+		return 'R'
 
 class Pawn(Piece):
+	__slots__ = ()
+
 	def __str__(self):
 		return ''
 
 	""" Check forward movements and also diagonal attacking moves """
-	def getPossibleMoves(self, boardInfo, isP1Piece):
+	def getPossiblePositions(self, boardInfo, isP1Piece):
 		
 		# Determine if moving forward or "backwards" depending on player 1 or player 2
 		if (isP1Piece):
@@ -192,7 +567,7 @@ class Pawn(Piece):
 			forwardPositions.append((self.position[0], self.position[1] + (displacement * 2)))
 
 		#iterate through possibilities	
-		possibleMoves = self.setPossiblePositions(forwardPositions, boardInfo, isP1Piece)
+		possiblePositions = [move.position for move in self.setPossiblePositions(forwardPositions, boardInfo, isP1Piece)]
 
 		#add diagonal positions to check
 		diagonalPositions = [(self.position[0] + displacement, self.position[1] + displacement),
@@ -201,8 +576,26 @@ class Pawn(Piece):
 		#check if enemy piece is on diagonal position
 		for position in diagonalPositions:
 			if (self.hasCollision(position, boardInfo, not isP1Piece)):
-				possibleMoves.append(str(self) + str(position))
-		return possibleMoves
+				possiblePositions.append(position)
+		return possiblePositions
+
+	""" Same captures as getPossiblePositions, pushes capture too as they are only blocked by own pieces """
+	def getCapturePositions(self, boardInfo, isP1Piece):
+		own, enemy = _sides(boardInfo, isP1Piece)
+		x, y = self.position
+		displacement = 1 if isP1Piece else -1
+		capturePositions = []
+		forward = (x, y + displacement)
+		if forward not in own:
+			if forward in enemy:
+				capturePositions.append(forward)
+			doublePush = (x, y + 2 * displacement)
+			if self.startingPosition(isP1Piece, boardInfo) and doublePush in enemy:
+				capturePositions.append(doublePush)
+		for position in ((x + displacement, y + displacement), (x - displacement, y + displacement)):
+			if position in enemy:
+				capturePositions.append(position)
+		return capturePositions
 
 	""" Check if pawn is at starting position """
 	def startingPosition(self, isP1Piece, boardInfo):
@@ -227,8 +620,27 @@ class Pawn(Piece):
 				possibleMoves.append(Move(self, positions[i]))
 		return possibleMoves
 
-""" Iterate through all of players pieces and get all possible moves """
-def getAllPossibleMoves(boardInfo, isFirstPlayer):
+""" Optional move generation backends, module names are imported on first use """
+BACKENDS = {'bitboard': 'bitboard', 'numpy': 'vectorized'}
+
+""" Get a move generation backend module by name """
+def getBackend(name):
+	if name not in BACKENDS:
+		raise ValueError('Unknown move generation backend: %s' % name)
+	return __import__(BACKENDS[name])
+
+"""
+Iterate through all of players pieces and get all possible moves
+A backend name can be given to generate the moves with that backend instead
+If packed is set the moves are returned as a PackedMoves list
+"""
+def getAllPossibleMoves(boardInfo, isFirstPlayer, backend=None, packed=False):
+	if backend is not None:
+		if packed:
+			raise ValueError('Packed moves are only generated by the piece classes')
+		return getBackend(backend).getAllPossibleMoves(boardInfo, isFirstPlayer)
+	if packed:
+		return getAllPackedMoves(boardInfo, isFirstPlayer)
 	if isFirstPlayer:
 		pieces = boardInfo['P1']
 	else:
@@ -237,3 +649,329 @@ def getAllPossibleMoves(boardInfo, isFirstPlayer):
 	for piece in pieces:
 		moves.extend(piece.getPossibleMoves(boardInfo, isFirstPlayer))
 	return moves
+
+""" Get all possible moves of the pieces as a PackedMoves list without creating Move objects """
+def getAllPackedMoves(boardInfo, isFirstPlayer):
+	if isFirstPlayer:
+		pieces = boardInfo['P1']
+	else:
+		pieces = boardInfo['P2']
+	if boardInfo['boardSize'] > PACKED_MAX_BOARD_SIZE:
+		raise ValueError('Packed moves are limited to %dx%d boards' % (PACKED_MAX_BOARD_SIZE, PACKED_MAX_BOARD_SIZE))
+	moves = PackedMoves(pieces, boardInfo['boardSize'])
+	for i in xrange(len(pieces)):
+		for position in pieces[i].getPossiblePositions(boardInfo, isFirstPlayer):
+			moves.append(i, position)
+	return moves
+
+""" Yield all possible moves of a player lazily, piece by piece and ray by ray """
+def iterPossibleMoves(boardInfo, isFirstPlayer):
+	if isFirstPlayer:
+		pieces = boardInfo['P1']
+	else:
+		pieces = boardInfo['P2']
+	for piece in pieces:
+		for move in piece.iterPossibleMoves(boardInfo, isFirstPlayer):
+			yield move
+
+""" Count the possible moves of a player without creating Move objects """
+def countPossibleMoves(boardInfo, isFirstPlayer):
+	if isFirstPlayer:
+		pieces = boardInfo['P1']
+	else:
+		pieces = boardInfo['P2']
+	return sum(len(piece.getPossiblePositions(boardInfo, isFirstPlayer)) for piece in pieces)
+
+""" Check if a move lands on an enemy piece """
+def isCapture(move, boardInfo, isFirstPlayer):
+	return move.piece.hasCollision(move.position, boardInfo, not isFirstPlayer)
+
+""" Check if a player has any possible move, stops at the first one found """
+def hasAnyMove(boardInfo, isFirstPlayer):
+	for move in iterPossibleMoves(boardInfo, isFirstPlayer):
+		return True
+	return False
+
+""" Get the first possible capture of a player, None if there is none """
+def firstCapture(boardInfo, isFirstPlayer):
+	for move in iterPossibleMoves(boardInfo, isFirstPlayer):
+		if isCapture(move, boardInfo, isFirstPlayer):
+			return move
+	return None
+
+
+class MoveCache(object):
+	"""
+	Size bounded cache of the possible moves of positions, keyed by their position hash
+	Least recently used positions are dropped first
+	Cached moves are rebuilt with the pieces of the board they are asked for,
+	in the piece order of the board they were first generated for
+	"""
+	def __init__(self, maxSize=4096):
+		self.maxSize = maxSize
+		self.entries = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def __len__(self):
+		return len(self.entries)
+
+	""" Get all possible moves of a player, generated with getAllPossibleMoves on a cache miss """
+	def getAllPossibleMoves(self, boardInfo, isFirstPlayer, backend=None):
+		key = positionHash(boardInfo, isFirstPlayer)
+		entry = self.entries.pop(key, None)
+		if entry is None:
+			self.misses += 1
+			moves = getAllPossibleMoves(boardInfo, isFirstPlayer, backend)
+			entry = tuple((move.piece.position, move.position) for move in moves)
+			while len(self.entries) >= self.maxSize:
+				self.entries.popitem(last=False)
+			self.entries[key] = entry
+			return moves
+		self.hits += 1
+		self.entries[key] = entry
+		if isinstance(boardInfo, Board):
+			pieces = boardInfo.occupancy(isFirstPlayer)
+		else:
+			pieces = dict((piece.position, piece) for piece in boardInfo['P1' if isFirstPlayer else 'P2'])
+		return [Move(pieces[fromPosition], position) for fromPosition, position in entry]
+
+	def clear(self):
+		self.entries.clear()
+		self.hits = 0
+		self.misses = 0
+
+"""
+Apply a move to the board in place, an enemy piece on the target position is captured
+Returns the undo record (piece, fromPosition, capturedPiece, capturedIndex, isFirstPlayer) for unmakeMove
+"""
+def makeMove(boardInfo, move, isFirstPlayer):
+	piece = move.piece
+	fromPosition = piece.position
+	captured = None
+	capturedIndex = -1
+	if isinstance(boardInfo, Board):
+		captured = boardInfo.pieceAt(move.position, not isFirstPlayer)
+		if captured is not None:
+			capturedIndex = boardInfo.removePiece(captured, not isFirstPlayer)
+		boardInfo.movePiece(piece, move.position, isFirstPlayer)
+	else:
+		enemyPieces = boardInfo['P2' if isFirstPlayer else 'P1']
+		for i in xrange(len(enemyPieces)):
+			if enemyPieces[i].position == move.position:
+				captured = enemyPieces[i]
+				capturedIndex = i
+				del enemyPieces[i]
+				break
+		piece.position = move.position
+	return (piece, fromPosition, captured, capturedIndex, isFirstPlayer)
+
+""" Take back a move applied with makeMove, restoring any captured piece at its place in the list """
+def unmakeMove(boardInfo, undo):
+	piece, fromPosition, captured, capturedIndex, isFirstPlayer = undo
+	if isinstance(boardInfo, Board):
+		boardInfo.movePiece(piece, fromPosition, isFirstPlayer)
+		if captured is not None:
+			boardInfo.addPiece(captured, not isFirstPlayer, capturedIndex)
+	else:
+		piece.position = fromPosition
+		if captured is not None:
+			boardInfo['P2' if isFirstPlayer else 'P1'].insert(capturedIndex, captured)
+
+
+""" Attack patterns of a set of piece classes, cached by the set """
+_attackPatterns = {}
+
+"""
+Get the directions and offsets to scan from a square to find attackers of the given piece classes
+Returns (slider directions, jump offsets, has pawns, has pieces without a known pattern)
+"""
+def attackPatterns(pieceClasses):
+	pieceClasses = frozenset(pieceClasses)
+	patterns = _attackPatterns.get(pieceClasses)
+	if patterns is None:
+		directions = set()
+		offsets = set()
+		for pieceClass in pieceClasses:
+			if issubclass(pieceClass, SlidingPiece):
+				directions.update(pieceClass.directions)
+			elif issubclass(pieceClass, JumpingPiece):
+				offsets.update(pieceClass.offsets)
+		hasPawns = any(issubclass(pieceClass, Pawn) for pieceClass in pieceClasses)
+		hasOthers = any(not issubclass(pieceClass, (SlidingPiece, JumpingPiece, Pawn)) for pieceClass in pieceClasses)
+		directions = tuple(sorted(directions))
+		patterns = (directions, tuple((-dx, -dy) for dx, dy in directions), tuple(sorted(offsets)), hasPawns, hasOthers)
+		_attackPatterns[pieceClasses] = patterns
+	return patterns
+
+def _occupancies(boardInfo):
+	if isinstance(boardInfo, Board):
+		return boardInfo.p1Occupancy, boardInfo.p2Occupancy
+	return (dict((piece.position, piece) for piece in boardInfo['P1']),
+		dict((piece.position, piece) for piece in boardInfo['P2']))
+
+""" Get (own occupancy, enemy occupancy) of a player """
+def _sides(boardInfo, isP1Piece):
+	p1Occupancy, p2Occupancy = _occupancies(boardInfo)
+	if isP1Piece:
+		return p1Occupancy, p2Occupancy
+	return p2Occupancy, p1Occupancy
+
+"""
+Check if a player attacks a position, i.e. could move there if an enemy piece stood on it
+Scans outward from the position along slider rays and jump, king and pawn patterns
+instead of generating the player's moves
+"""
+def isSquareAttacked(boardInfo, position, byFirstPlayer):
+	p1Occupancy, p2Occupancy = _occupancies(boardInfo)
+	if byFirstPlayer:
+		attackers, pieces = p1Occupancy, boardInfo['P1']
+	else:
+		attackers, pieces = p2Occupancy, boardInfo['P2']
+	directions, reversedDirections, offsets, hasPawns, hasOthers = attackPatterns(set(map(type, pieces)))
+	x, y = position
+
+	if directions:
+		rays = getMoveTables(boardInfo['boardSize']).getRaySet(reversedDirections)[position]
+		for direction, ray in zip(directions, rays):
+			for rayPosition in ray:
+				piece = attackers.get(rayPosition)
+				if piece is not None:
+					if isinstance(piece, SlidingPiece) and direction in piece.directions:
+						return True
+					break
+				if rayPosition in p1Occupancy or rayPosition in p2Occupancy:
+					break
+
+	for dx, dy in offsets:
+		piece = attackers.get((x - dx, y - dy))
+		if isinstance(piece, JumpingPiece) and (dx, dy) in piece.offsets:
+			return True
+
+	if hasPawns:
+		if byFirstPlayer:
+			displacement, startingRow = 1, 1
+		else:
+			displacement, startingRow = -1, boardInfo['boardSize'] - 2
+		behind = y - displacement
+		for pawnPosition in ((x - displacement, behind), (x + displacement, behind), (x, behind)):
+			if isinstance(attackers.get(pawnPosition), Pawn):
+				return True
+		# double push, only blocked by own pieces on the way
+		pawn = attackers.get((x, behind - displacement))
+		if isinstance(pawn, Pawn) and behind - displacement == startingRow and (x, behind) not in attackers:
+			return True
+
+	if hasOthers:
+		for piece in pieces:
+			if not isinstance(piece, (SlidingPiece, JumpingPiece, Pawn)):
+				if position in piece.getPossiblePositions(boardInfo, byFirstPlayer):
+					return True
+	return False
+
+"""
+Get position -> number of the player's pieces attacking it, for every attacked position
+Attacked has the same meaning as in isSquareAttacked
+"""
+def attackMap(boardInfo, byFirstPlayer):
+	p1Occupancy, p2Occupancy = _occupancies(boardInfo)
+	boardSize = boardInfo['boardSize']
+	tables = getMoveTables(boardSize)
+	pieces = boardInfo['P1'] if byFirstPlayer else boardInfo['P2']
+	attackers = p1Occupancy if byFirstPlayer else p2Occupancy
+	attacked = {}
+	for piece in pieces:
+		if isinstance(piece, SlidingPiece):
+			targets = []
+			for ray in tables.getRaySet(piece.directions)[piece.position]:
+				for position in ray:
+					targets.append(position)
+					if position in p1Occupancy or position in p2Occupancy:
+						break
+		elif isinstance(piece, JumpingPiece):
+			targets = tables.getJumpSet(piece.offsets)[piece.position]
+		elif isinstance(piece, Pawn):
+			x, y = piece.position
+			displacement = 1 if byFirstPlayer else -1
+			forward = y + displacement
+			targets = [(x + displacement, forward), (x - displacement, forward), (x, forward)]
+			if piece.startingPosition(byFirstPlayer, boardInfo) and (x, forward) not in attackers:
+				targets.append((x, forward + displacement))
+			targets = [position for position in targets if not piece.outOfBounds(position, boardSize)]
+		else:
+			targets = piece.getPossiblePositions(boardInfo, byFirstPlayer)
+		for position in targets:
+			attacked[position] = attacked.get(position, 0) + 1
+	return attacked
+
+""" Check if any king of a player is attacked by the other player """
+def isInCheck(boardInfo, isFirstPlayer):
+	pieces = boardInfo['P1'] if isFirstPlayer else boardInfo['P2']
+	for piece in pieces:
+		if isinstance(piece, King) and isSquareAttacked(boardInfo, piece.position, not isFirstPlayer):
+			return True
+	return False
+
+"""
+Get the possible moves that do not leave any king of the player attacked
+When no king is in check, only king moves, moves of pieces pinned between a king and an attacker's slider
+and captures of an attacker's piece that blocks the double push of its pawn onto a king
+can uncover an attack, so only those moves are made and tested
+Each tested move is made and unmade on a Board, a plain dictionary is wrapped in a Board that shares its pieces
+"""
+def getLegalMoves(boardInfo, isFirstPlayer, backend=None):
+	moves = getAllPossibleMoves(boardInfo, isFirstPlayer, backend)
+	pieces = boardInfo['P1'] if isFirstPlayer else boardInfo['P2']
+	kings = [piece for piece in pieces if isinstance(piece, King)]
+	if not kings:
+		return moves
+	if not isinstance(boardInfo, Board):
+		boardInfo = Board.fromBoardInfo(boardInfo)
+
+	pinned = None
+	unblocking = set()
+	attackers = boardInfo.occupancy(not isFirstPlayer)
+	defenders = boardInfo.occupancy(isFirstPlayer)
+	directions, reversedDirections, offsets, hasPawns, hasOthers = attackPatterns(set(map(type, attackers.values())))
+	if not hasOthers and not any(isSquareAttacked(boardInfo, king.position, not isFirstPlayer) for king in kings):
+		# own pieces standing alone between a king and an attacker sliding towards it
+		rays = getMoveTables(boardInfo['boardSize']).getRaySet(reversedDirections)
+		pinned = set()
+		if hasPawns:
+			# pawn pushes are only blocked by own pieces, capturing the blocker frees the double push
+			if isFirstPlayer:
+				displacement, startingRow = -1, boardInfo['boardSize'] - 2
+			else:
+				displacement, startingRow = 1, 1
+			for king in kings:
+				x, y = king.position
+				blocker = (x, y - displacement)
+				if (y - 2 * displacement == startingRow and blocker in attackers
+						and isinstance(attackers.get((x, y - 2 * displacement)), Pawn)):
+					unblocking.add(blocker)
+		for king in kings:
+			for direction, ray in zip(directions, rays[king.position]):
+				shield = None
+				for position in ray:
+					attacker = attackers.get(position)
+					if attacker is not None:
+						if shield is not None and isinstance(attacker, SlidingPiece) and direction in attacker.directions:
+							pinned.add(shield)
+						break
+					if position in defenders:
+						if shield is not None:
+							break
+						shield = position
+
+	legalMoves = []
+	for move in moves:
+		piece = move.piece
+		if (pinned is not None and piece.position not in pinned and not isinstance(piece, King)
+				and move.position not in unblocking):
+			legalMoves.append(move)
+			continue
+		undo = makeMove(boardInfo, move, isFirstPlayer)
+		if not any(isSquareAttacked(boardInfo, king.position, not isFirstPlayer) for king in kings):
+			legalMoves.append(move)
+		unmakeMove(boardInfo, undo)
+	return legalMoves
@@ -0,0 +1,99 @@
+from timeit import default_timer
+START = default_timer()
+
+from chess import getAllPossibleMoves
+from fen import parseFen, formatMove
+import getopt
+import sys
+
+"""
+Command line move generation for short lived and persistent worker processes
+Reads FEN style positions, one per line, from files or stdin and writes one line of moves per position,
+in the move format of fen.formatMove, or 'error: ...' for a position that cannot be read
+
+Only chess and fen are imported, backends are imported and move tables built on first use,
+and the table entries of a position are only built when a piece stands on it,
+so a process that handles a single position only pays for that position
+
+Usage: python cli.py [-b BACKEND] [-w] [-t] [FILE ...]
+	-b, --backend NAME	generate the moves with a backend, e.g. bitboard
+	-w, --worker		answer each line of stdin as soon as it is read and flush the answer
+	-t, --timings		report startup time and the time of each position on stderr
+"""
+
+USAGE = 'usage: cli.py [-b BACKEND] [-w] [-t] [FILE ...]\n'
+
+""" Get the line of moves of a position, returns (ok, line) """
+def answer(text, backend=None):
+	try:
+		boardInfo, isFirstPlayer = parseFen(text)
+		return True, ' '.join([formatMove(move) for move in getAllPossibleMoves(boardInfo, isFirstPlayer, backend)])
+	except (ValueError, KeyError, ImportError) as error:
+		return False, 'error: %s' % error
+
+"""
+Answer every position of an iterable of lines, blank lines are skipped
+In worker mode every answer is flushed as soon as it is written
+If a timings file is given the time of each position is written to it
+Returns (positions answered, positions that failed)
+"""
+def run(lines, output, backend=None, worker=False, timings=None):
+	count = 0
+	failed = 0
+	for line in lines:
+		if not line.strip():
+			continue
+		start = default_timer()
+		ok, text = answer(line, backend)
+		output.write(text + '\n')
+		if worker:
+			output.flush()
+		count += 1
+		if not ok:
+			failed += 1
+		if timings is not None:
+			timings.write('position %d %.3fms\n' % (count, (default_timer() - start) * 1000))
+	return count, failed
+
+""" Read lines of a file one at a time, iterating over a pipe directly would wait to fill a read ahead buffer """
+def iterLines(inputFile):
+	return iter(inputFile.readline, '')
+
+def main(argv=None, stdin=None, stdout=None, stderr=None):
+	stdin = stdin or sys.stdin
+	stdout = stdout or sys.stdout
+	stderr = stderr or sys.stderr
+	try:
+		options, paths = getopt.getopt(sys.argv[1:] if argv is None else argv, 'b:wth', ['backend=', 'worker', 'timings', 'help'])
+	except getopt.GetoptError as error:
+		stderr.write('%s\n%s' % (error, USAGE))
+		return 2
+	backend = None
+	worker = False
+	timings = None
+	for option, value in options:
+		if option in ('-b', '--backend'):
+			backend = value
+		elif option in ('-w', '--worker'):
+			worker = True
+		elif option in ('-t', '--timings'):
+			timings = stderr
+		else:
+			stdout.write(USAGE)
+			return 0
+
+	if timings is not None:
+		timings.write('startup %.3fms\n' % ((default_timer() - START) * 1000))
+	failed = 0
+	for path in paths or ['-']:
+		if path == '-':
+			count, pathFailed = run(iterLines(stdin) if worker else stdin, stdout, backend, worker, timings)
+		else:
+			with open(path) as inputFile:
+				count, pathFailed = run(inputFile, stdout, backend, worker, timings)
+		failed += pathFailed
+	stdout.flush()
+	return 1 if failed else 0
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,146 @@
+from chess import Knight, Bishop, Queen, Pawn, makeMove, unmakeMove, xrange
+from search import MaterialEvaluation
+
+"""
+Material and piece-square evaluation kept up to date move by move
+
+A piece scores its material value plus the bonus of its square in the piece-square table of its class
+Tables are given from p1's side, p2 uses the same table mirrored top to bottom
+A table is either a function (x, y, boardSize) -> bonus, used for every board size,
+or a list of rows indexed [y][x] for one board size, which takes precedence for that size
+
+IncrementalEvaluation keeps the score of a board and updates it in makeMove and unmakeMove,
+so evaluating a position costs the same whatever the number of pieces
+It can be passed to search.Search as its evaluation
+"""
+
+""" Bonus for standing near the center, weight on the center squares down to 0 on the edge """
+def centralization(weight):
+	def table(x, y, boardSize):
+		if boardSize < 2:
+			return 0
+		center = (boardSize - 1) / 2.0
+		distance = max(abs(x - center), abs(y - center))
+		return int(round(weight * (1 - distance / center)))
+	return table
+
+""" Bonus for advancing, 0 on the starting row up to weight on the last row """
+def advancement(weight):
+	def table(x, y, boardSize):
+		if boardSize < 3:
+			return 0
+		return int(round(weight * max(y - 1, 0) / float(boardSize - 2)))
+	return table
+
+DEFAULT_TABLES = {
+	Knight: centralization(30),
+	Bishop: centralization(15),
+	Queen: centralization(10),
+	Pawn: advancement(60),
+}
+
+
+class PieceSquareTables(object):
+	"""
+	Piece-square tables of piece classes, built for each board size on first use
+	Custom pieces use the table of their closest base class, or no bonus
+	"""
+	def __init__(self, tables=None):
+		self.tables = dict(DEFAULT_TABLES)
+		self.sizeTables = {}
+		if tables:
+			for pieceClass, table in tables.items():
+				self.setTable(pieceClass, table)
+		self.built = {}
+
+	""" Set the table of a piece class, a list of rows only applies to its board size """
+	def setTable(self, pieceClass, table):
+		if callable(table):
+			self.tables[pieceClass] = table
+		else:
+			boardSize = len(table)
+			if any(len(row) != boardSize for row in table):
+				raise ValueError('Table of %s is not square' % pieceClass.__name__)
+			self.sizeTables[(pieceClass, boardSize)] = table
+		self.built = {}
+
+	"""
+	Get position -> bonus of a piece class for p1 or p2 on a board size
+	None if the class has no table
+	"""
+	def getTable(self, pieceClass, isP1Piece, boardSize):
+		key = (pieceClass, isP1Piece, boardSize)
+		if key in self.built:
+			return self.built[key]
+		table = None
+		for cls in pieceClass.__mro__:
+			rows = self.sizeTables.get((cls, boardSize))
+			if rows is not None:
+				table = lambda x, y, boardSize, rows=rows: rows[y][x]
+				break
+			if cls in self.tables:
+				table = self.tables[cls]
+				break
+		bonuses = None
+		if table is not None:
+			bonuses = {}
+			for x in xrange(boardSize):
+				for y in xrange(boardSize):
+					bonuses[(x, y)] = table(x, y if isP1Piece else boardSize - 1 - y, boardSize)
+		self.built[key] = bonuses
+		return bonuses
+
+
+class IncrementalEvaluation(object):
+	"""
+	Material and piece-square score of a board from the side to move's point of view
+	reset computes the score of a board, makeMove and unmakeMove apply moves to the board
+	and update the score, which is then read back in constant time by calling the evaluation
+	values maps piece classes to material values, tables piece classes to piece-square tables
+	"""
+	def __init__(self, values=None, tables=None):
+		self.material = MaterialEvaluation(values)
+		self.value = self.material.value
+		self.tables = PieceSquareTables(tables)
+		self.score = 0
+		self.history = []
+		self.boardSize = None
+
+	""" Score of one piece on a position """
+	def pieceScore(self, piece, isP1Piece, position):
+		bonuses = self.tables.getTable(type(piece), isP1Piece, self.boardSize)
+		if bonuses is None:
+			return self.value(piece)
+		return self.value(piece) + bonuses.get(position, 0)
+
+	""" Score of a board for p1, computed from every piece """
+	def boardScore(self, boardInfo):
+		self.boardSize = boardInfo['boardSize']
+		p1Score = sum(self.pieceScore(piece, True, piece.position) for piece in boardInfo['P1'])
+		p2Score = sum(self.pieceScore(piece, False, piece.position) for piece in boardInfo['P2'])
+		return p1Score - p2Score
+
+	""" Start keeping the score of a board """
+	def reset(self, boardInfo):
+		self.score = self.boardScore(boardInfo)
+		self.history = []
+
+	""" Apply a move with chess.makeMove and update the score, returns the undo record """
+	def makeMove(self, boardInfo, move, isFirstPlayer):
+		piece = move.piece
+		fromPosition = piece.position
+		undo = makeMove(boardInfo, move, isFirstPlayer)
+		change = self.pieceScore(piece, isFirstPlayer, move.position) - self.pieceScore(piece, isFirstPlayer, fromPosition)
+		if undo[2] is not None:
+			change += self.pieceScore(undo[2], not isFirstPlayer, move.position)
+		self.history.append(self.score)
+		self.score += change if isFirstPlayer else -change
+		return undo
+
+	def unmakeMove(self, boardInfo, undo):
+		unmakeMove(boardInfo, undo)
+		self.score = self.history.pop()
+
+	""" Score of the board the evaluation follows, for the side to move """
+	def __call__(self, boardInfo, isFirstPlayer):
+		return self.score if isFirstPlayer else -self.score
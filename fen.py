@@ -0,0 +1,130 @@
+from chess import Board, King, Queen, Bishop, Knight, Rook, Pawn, getAllPossibleMoves, xrange
+
+"""
+FEN style text positions for boards of any size, and bulk export of move lists
+
+The placement field lists the rows from the top (y = boardSize - 1) down to y = 0, separated by '/'
+Uppercase letters are p1 pieces, lowercase letters p2 pieces, numbers of any length are runs of empty squares
+The board size is the number of rows and every row must have that many squares
+An optional second field 'w' or 'b' gives the side to move, p1 by default, other fields are ignored
+
+e.g. the standard start position 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w'
+
+Moves are written as piece letter, from square and to square, e.g. 'N1,0-2,2', pawns use the letter 'P'
+"""
+
+""" Piece class of each uppercase letter """
+PIECE_CLASSES = {'K': King, 'Q': Queen, 'B': Bishop, 'N': Knight, 'R': Rook, 'P': Pawn}
+PIECE_LETTERS = dict((pieceClass, letter) for letter, pieceClass in PIECE_CLASSES.items())
+
+""" Give a custom piece class a letter so it can be read and written """
+def registerPieceClass(pieceClass, letter):
+	letter = letter.upper()
+	if len(letter) != 1 or not letter.isalpha() or PIECE_CLASSES.get(letter, pieceClass) is not pieceClass:
+		raise ValueError('Letter %r is not available' % letter)
+	PIECE_CLASSES[letter] = pieceClass
+	PIECE_LETTERS[pieceClass] = letter
+
+def _pieceLetter(piece):
+	letter = PIECE_LETTERS.get(type(piece))
+	if letter is None:
+		raise ValueError('Piece class %s has no letter' % type(piece).__name__)
+	return letter
+
+"""
+Parse a FEN style position
+Returns (Board, isFirstPlayer), pieces are listed in reading order
+"""
+def parseFen(text):
+	fields = text.split()
+	if not fields:
+		raise ValueError('Empty position')
+	rows = fields[0].split('/')
+	boardSize = len(rows)
+	p1Pieces = []
+	p2Pieces = []
+	pieceClasses = PIECE_CLASSES
+	for row, rowText in enumerate(rows):
+		y = boardSize - 1 - row
+		x = 0
+		run = 0
+		for char in rowText:
+			if char.isdigit():
+				run = run * 10 + int(char)
+				continue
+			x += run
+			run = 0
+			pieceClass = pieceClasses.get(char.upper())
+			if pieceClass is None:
+				raise ValueError('Unknown piece %r in %r' % (char, text))
+			if char.isupper():
+				p1Pieces.append(pieceClass((x, y)))
+			else:
+				p2Pieces.append(pieceClass((x, y)))
+			x += 1
+		x += run
+		if x != boardSize:
+			raise ValueError('Row %r has %d squares instead of %d' % (rowText, x, boardSize))
+
+	if len(fields) < 2 or fields[1] == 'w':
+		isFirstPlayer = True
+	elif fields[1] == 'b':
+		isFirstPlayer = False
+	else:
+		raise ValueError('Unknown side to move %r' % fields[1])
+	return Board(boardSize, p1Pieces, p2Pieces), isFirstPlayer
+
+""" Parse the positions of an iterable of lines, e.g. an open file, skipping blank lines """
+def iterFen(lines):
+	for line in lines:
+		if line.strip():
+			yield parseFen(line)
+
+""" Write a position as a FEN style string """
+def formatFen(boardInfo, isFirstPlayer):
+	boardSize = boardInfo['boardSize']
+	squares = {}
+	for piece in boardInfo['P1']:
+		squares[piece.position] = _pieceLetter(piece)
+	for piece in boardInfo['P2']:
+		squares[piece.position] = _pieceLetter(piece).lower()
+	rows = []
+	for y in xrange(boardSize - 1, -1, -1):
+		rowText = []
+		run = 0
+		for x in xrange(boardSize):
+			letter = squares.get((x, y))
+			if letter is None:
+				run += 1
+				continue
+			if run:
+				rowText.append(str(run))
+				run = 0
+			rowText.append(letter)
+		if run:
+			rowText.append(str(run))
+		rows.append(''.join(rowText))
+	return '/'.join(rows) + (' w' if isFirstPlayer else ' b')
+
+""" Write a move as piece letter, from square and to square """
+def formatMove(move):
+	return '%s%d,%d-%d,%d' % ((_pieceLetter(move.piece),) + move.piece.position + move.position)
+
+"""
+Write the possible moves of every (boardInfo, isFirstPlayer) position to an open file,
+one line of space separated moves per position in input order
+Lines are joined and written bufferLines at a time
+Returns the number of positions written
+"""
+def writeMoves(outputFile, positions, backend=None, bufferLines=1024):
+	lines = []
+	count = 0
+	for boardInfo, isFirstPlayer in positions:
+		lines.append(' '.join([formatMove(move) for move in getAllPossibleMoves(boardInfo, isFirstPlayer, backend)]))
+		lines.append('\n')
+		count += 1
+		if len(lines) >= 2 * bufferLines:
+			outputFile.write(''.join(lines))
+			del lines[:]
+	outputFile.write(''.join(lines))
+	return count
@@ -0,0 +1,163 @@
+from chess import Board, Move, SlidingPiece, JumpingPiece, Pawn, getMoveTables
+import chess
+
+"""
+Incremental move generation over a sequence of positions that differ by one move at a time
+The moves of every piece of both players are kept along with the squares they depend on,
+and a reverse index tells which pieces watch each square
+
+Watched squares are
+	sliders: each ray up to and including the first piece on it
+	jumpers: their jump targets
+	pawns: their push and diagonal squares
+Applying a move only changes the from and to squares, so only the moved piece, the captured piece
+and the pieces watching those two squares are regenerated
+Pieces that are not sliders, jumpers or pawns have no known pattern and are regenerated after every move
+
+Pieces are assumed to move like the base class they derive from, as in the bitboard backend
+"""
+
+class IncrementalMoveGenerator(object):
+	"""
+	Keeps the possible moves of the pieces of a Board up to date as moves are made and unmade
+	A board info dictionary is wrapped in a Board that shares its pieces
+	The board must only be changed through makeMove and unmakeMove of the generator, or reset after
+	"""
+	def __init__(self, boardInfo):
+		if not isinstance(boardInfo, Board):
+			boardInfo = Board.fromBoardInfo(boardInfo)
+		self.board = boardInfo
+		self.reset()
+
+	""" Regenerate the moves of every piece from scratch """
+	def reset(self):
+		self.tables = getMoveTables(self.board['boardSize'])
+		self.moves = {}
+		self.watched = {}
+		self.watchers = {}
+		self.sides = {}
+		self.others = set()
+		self.recomputed = 0
+		for isP1Piece in [True, False]:
+			for piece in self.board['P1' if isP1Piece else 'P2']:
+				self.sides[piece] = isP1Piece
+				self.update(piece)
+
+	""" Get all possible moves of a player, in the same order as chess.getAllPossibleMoves """
+	def getAllPossibleMoves(self, isFirstPlayer):
+		moves = []
+		for piece in self.board['P1' if isFirstPlayer else 'P2']:
+			moves.extend(self.moves[piece])
+		return moves
+
+	""" Get the possible moves of one piece of the board """
+	def getPossibleMoves(self, piece):
+		return list(self.moves[piece])
+
+	"""
+	Apply a move to the board and regenerate the affected pieces
+	Returns the undo record of chess.makeMove
+	"""
+	def makeMove(self, move, isFirstPlayer):
+		fromPosition = move.piece.position
+		undo = chess.makeMove(self.board, move, isFirstPlayer)
+		captured = undo[2]
+		if captured is not None:
+			self.discard(captured)
+		self.refresh(fromPosition, move.position, move.piece)
+		return undo
+
+	""" Take back a move applied with makeMove and regenerate the affected pieces """
+	def unmakeMove(self, undo):
+		piece, fromPosition, captured, capturedIndex, isFirstPlayer = undo
+		toPosition = piece.position
+		chess.unmakeMove(self.board, undo)
+		if captured is not None:
+			self.sides[captured] = not isFirstPlayer
+			self.update(captured)
+		self.refresh(fromPosition, toPosition, piece)
+
+	""" Regenerate a moved piece and the pieces watching the two changed squares """
+	def refresh(self, fromPosition, toPosition, piece):
+		affected = set(self.others)
+		affected.add(piece)
+		affected.update(self.watchers.get(fromPosition, ()))
+		affected.update(self.watchers.get(toPosition, ()))
+		self.recomputed = len(affected)
+		for affectedPiece in affected:
+			self.update(affectedPiece)
+
+	""" Forget the moves and watched squares of a piece that left the board """
+	def discard(self, piece):
+		self.unwatch(piece)
+		del self.moves[piece]
+		del self.sides[piece]
+		self.others.discard(piece)
+
+	def unwatch(self, piece):
+		for position in self.watched.pop(piece, ()):
+			watchers = self.watchers[position]
+			watchers.discard(piece)
+			if not watchers:
+				del self.watchers[position]
+
+	""" Regenerate the moves of a piece and the squares it watches """
+	def update(self, piece):
+		self.unwatch(piece)
+		isP1Piece = self.sides[piece]
+		own = self.board.occupancy(isP1Piece)
+		enemy = self.board.occupancy(not isP1Piece)
+		if isinstance(piece, SlidingPiece):
+			positions, watched = self.slidingPositions(piece, own, enemy)
+		elif isinstance(piece, JumpingPiece):
+			watched = self.tables.getJumpSet(piece.offsets)[piece.position]
+			positions = [position for position in watched if position not in own]
+		elif isinstance(piece, Pawn):
+			positions, watched = self.pawnPositions(piece, isP1Piece, own, enemy)
+		else:
+			self.others.add(piece)
+			self.moves[piece] = piece.getPossibleMoves(self.board, isP1Piece)
+			return
+		self.moves[piece] = [Move(piece, position) for position in positions]
+		self.watched[piece] = watched
+		for position in watched:
+			watchers = self.watchers.get(position)
+			if watchers is None:
+				watchers = self.watchers[position] = set()
+			watchers.add(piece)
+
+	""" Walk the rays of a slider, returning the positions it can move to and the squares it depends on """
+	def slidingPositions(self, piece, own, enemy):
+		positions = []
+		watched = []
+		for ray in self.tables.getRaySet(piece.directions)[piece.position]:
+			for position in ray:
+				watched.append(position)
+				if position in own:
+					break
+				positions.append(position)
+				if position in enemy:
+					break
+		return positions, watched
+
+	"""
+	Same moves as Pawn.getPossiblePositions, pushes are only blocked by own pieces
+	and diagonal moves need an enemy piece
+	"""
+	def pawnPositions(self, piece, isP1Piece, own, enemy):
+		x, y = piece.position
+		displacement = 1 if isP1Piece else -1
+		pushes = [(x, y + displacement)]
+		if piece.startingPosition(isP1Piece, self.board):
+			pushes.append((x, y + 2 * displacement))
+		diagonals = [(x + displacement, y + displacement), (x - displacement, y + displacement)]
+		positions = []
+		boardSize = self.board['boardSize']
+		for position in pushes:
+			if not (0 <= position[0] < boardSize and 0 <= position[1] < boardSize) or position in own:
+				break
+			positions.append(position)
+		for position in diagonals:
+			if position in enemy:
+				positions.append(position)
+		return positions, pushes + diagonals
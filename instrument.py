@@ -0,0 +1,211 @@
+from chess import Piece, SlidingPiece, JumpingPiece
+from contextlib import contextmanager
+from timeit import default_timer
+
+"""
+Opt in instrumentation of move generation by the piece classes
+
+While enabled, the collision, bounds and validity checks of the piece classes are counted,
+along with the squares looked up, the moves produced and the time spent per piece class
+Sliders and jumpers count the squares of their rays and jumps as they are walked,
+other pieces count the squares of their collision checks, a square checked for both players counts once
+Lazy generation with iterPossiblePositions is counted as its positions are taken
+Enabling swaps counting wrappers into the piece classes and disabling puts the original methods back,
+so nothing is added to move generation while it is disabled
+
+Backends that do not call the piece methods, e.g. bitboard, are only counted for the pieces they fall back on
+
+Usage:
+	with instrumented() as counters:
+		getAllPossibleMoves(boardInfo, True)
+	print(counters.snapshot())
+"""
+
+CHECK_METHODS = ('hasCollision', 'isValidMove', 'outOfBounds')
+GENERATION_METHODS = ('getPossibleMoves', 'getPossiblePositions')
+ITERATION_METHODS = ('iterPossiblePositions',)
+WALK_METHODS = ('walkRays', 'walkJumps', 'iterRays', 'iterJumps')
+
+
+class Counters(object):
+	"""
+	Counts gathered while instrumentation is enabled
+	calls: method name -> number of calls
+	squares: piece class name -> number of squares looked up while generating moves
+	moves: piece class name -> number of moves produced
+	seconds: piece class name -> time spent generating moves
+	"""
+	def __init__(self):
+		self.reset()
+
+	def reset(self):
+		self.calls = dict((name, 0) for name in CHECK_METHODS)
+		self.squares = {}
+		self.moves = {}
+		self.seconds = {}
+		self.depth = 0
+		self.lastSquare = None
+
+	""" Copy of the counts as plain dictionaries """
+	def snapshot(self):
+		return {
+			'calls': dict(self.calls),
+			'squares': dict(self.squares),
+			'moves': dict(self.moves),
+			'seconds': dict(self.seconds),
+			'totalMoves': sum(self.moves.values()),
+		}
+
+COUNTERS = Counters()
+
+_enabled = 0
+_originals = []
+
+
+def _countSquare(pieceName):
+	squares = COUNTERS.squares
+	squares[pieceName] = squares.get(pieceName, 0) + 1
+
+def _countingCheck(name, method):
+	if name == 'hasCollision':
+		def wrapper(self, checkPosition, *args):
+			COUNTERS.calls[name] += 1
+			# sliders and jumpers count their squares in the walk methods
+			if COUNTERS.depth and not isinstance(self, (SlidingPiece, JumpingPiece)):
+				square = (id(self), checkPosition)
+				if square != COUNTERS.lastSquare:
+					COUNTERS.lastSquare = square
+					_countSquare(type(self).__name__)
+			return method(self, checkPosition, *args)
+	else:
+		def wrapper(self, *args):
+			COUNTERS.calls[name] += 1
+			return method(self, *args)
+	return wrapper
+
+""" Time the outermost generation call of a piece, nested calls belong to it """
+def _timedGeneration(method):
+	def wrapper(self, boardInfo, isP1Piece):
+		if COUNTERS.depth:
+			return method(self, boardInfo, isP1Piece)
+		COUNTERS.depth += 1
+		COUNTERS.lastSquare = None
+		start = default_timer()
+		try:
+			result = method(self, boardInfo, isP1Piece)
+		finally:
+			COUNTERS.depth -= 1
+		pieceName = type(self).__name__
+		COUNTERS.seconds[pieceName] = COUNTERS.seconds.get(pieceName, 0.0) + default_timer() - start
+		COUNTERS.moves[pieceName] = COUNTERS.moves.get(pieceName, 0) + len(result)
+		return result
+	return wrapper
+
+_END = object()
+
+""" Time and count the positions of a lazy generation call as they are taken """
+def _timedIteration(method):
+	def wrapper(self, boardInfo, isP1Piece):
+		if COUNTERS.depth:
+			return method(self, boardInfo, isP1Piece)
+		return _timedPositions(self, method, boardInfo, isP1Piece)
+	return wrapper
+
+def _timedPositions(piece, method, boardInfo, isP1Piece):
+	pieceName = type(piece).__name__
+	positions = None
+	COUNTERS.lastSquare = None
+	while True:
+		COUNTERS.depth += 1
+		start = default_timer()
+		try:
+			if positions is None:
+				positions = iter(method(piece, boardInfo, isP1Piece))
+			position = next(positions, _END)
+		finally:
+			COUNTERS.depth -= 1
+			COUNTERS.seconds[pieceName] = COUNTERS.seconds.get(pieceName, 0.0) + default_timer() - start
+		if position is _END:
+			return
+		COUNTERS.moves[pieceName] = COUNTERS.moves.get(pieceName, 0) + 1
+		yield position
+
+""" Count the squares of rays or jumps as the walk methods take them """
+def _countingWalk(name, method):
+	if name.endswith('Rays'):
+		def wrapper(self, rays, boardInfo, isP1Piece):
+			pieceName = type(self).__name__
+			return method(self, [_countedSquares(ray, pieceName) for ray in rays], boardInfo, isP1Piece)
+	else:
+		def wrapper(self, positions, boardInfo, isP1Piece):
+			return method(self, _countedSquares(positions, type(self).__name__), boardInfo, isP1Piece)
+	return wrapper
+
+def _countedSquares(positions, pieceName):
+	for position in positions:
+		_countSquare(pieceName)
+		yield position
+
+def _pieceClasses(cls=Piece):
+	classes = [cls]
+	for subclass in cls.__subclasses__():
+		classes.extend(_pieceClasses(subclass))
+	return classes
+
+def _patch():
+	# wrap the methods where they are defined, so overrides such as Pawn.isValidMove are counted too
+	for cls in _pieceClasses():
+		for name in CHECK_METHODS + GENERATION_METHODS + ITERATION_METHODS + WALK_METHODS:
+			method = cls.__dict__.get(name)
+			if method is None:
+				continue
+			_originals.append((cls, name, method))
+			if name in CHECK_METHODS:
+				setattr(cls, name, _countingCheck(name, method))
+			elif name in GENERATION_METHODS:
+				setattr(cls, name, _timedGeneration(method))
+			elif name in ITERATION_METHODS:
+				setattr(cls, name, _timedIteration(method))
+			else:
+				setattr(cls, name, _countingWalk(name, method))
+
+def _restore():
+	while _originals:
+		cls, name, method = _originals.pop()
+		setattr(cls, name, method)
+
+""" Start counting, calls can be nested and counting stops at the matching disable """
+def enable():
+	global _enabled
+	if not _enabled:
+		_patch()
+	_enabled += 1
+
+def disable():
+	global _enabled
+	if not _enabled:
+		return
+	_enabled -= 1
+	if not _enabled:
+		_restore()
+
+def isEnabled():
+	return bool(_enabled)
+
+""" Get a copy of the current counts """
+def snapshot():
+	return COUNTERS.snapshot()
+
+def reset():
+	COUNTERS.reset()
+
+""" Enable instrumentation for a block, the counts are reset first unless reset is False """
+@contextmanager
+def instrumented(reset=True):
+	if reset:
+		COUNTERS.reset()
+	enable()
+	try:
+		yield COUNTERS
+	finally:
+		disable()
@@ -0,0 +1,153 @@
+from chess import Board, Move, isPawnClass
+from collections import OrderedDict
+
+"""
+Cache of pawn moves keyed by the pawn structure of both players and the board size
+
+Pawn moves only depend on the squares in front of and diagonal to each pawn
+An entry holds, for each player, the moves every pawn has with only the pawns on the board
+and the squares each pawn watches: its push squares and its two diagonals
+Another piece only changes the moves of the pawns watching its square, so those pawns are
+generated again on the actual board and the other pawns are served from the entry
+The key changes when a pawn moves or is captured, other moves reuse the entry
+On a Board the key is its pawn hash, kept up to date move by move, so finding the entry of a position
+does not go through the pieces, board info dictionaries are keyed by the sets of pawn positions
+
+Pawns are assumed to move like Pawn, as in the bitboard backend
+"""
+
+class PawnCache(object):
+	"""
+	Size bounded cache of pawn moves, least recently used pawn structures are dropped first
+	maxEntries bounds the number of pawn structures kept
+	maxSize, if given, bounds the total number of target and watched squares stored in the entries
+	"""
+	def __init__(self, maxEntries=1024, maxSize=None):
+		self.maxEntries = maxEntries
+		self.maxSize = maxSize
+		self.entries = OrderedDict()
+		self.size = 0
+		self.hits = 0
+		self.misses = 0
+		self.fallbacks = 0
+
+	def __len__(self):
+		return len(self.entries)
+
+	def clear(self):
+		self.entries.clear()
+		self.size = 0
+		self.hits = 0
+		self.misses = 0
+		self.fallbacks = 0
+
+	"""
+	Get pawn position -> target positions for the pawns of a player
+	The returned dictionary can be shared with the cache and must not be changed
+	"""
+	def pawnPositions(self, boardInfo, isFirstPlayer):
+		if isinstance(boardInfo, Board):
+			key = boardInfo.pawnHash()
+			structure = None
+		else:
+			# one pass over the pieces gives the key, the pawns and the squares of the other pieces
+			pawns = ({}, {})
+			others = []
+			for isP1Piece in [True, False]:
+				for piece in boardInfo['P1' if isP1Piece else 'P2']:
+					if isPawnClass(type(piece)):
+						pawns[not isP1Piece][piece.position] = piece
+					else:
+						others.append(piece.position)
+			key = structure = (boardInfo['boardSize'], frozenset(pawns[0]), frozenset(pawns[1]))
+
+		entry = self.entries.pop(key, None)
+		if entry is None:
+			self.misses += 1
+			if structure is None:
+				structure = self.pawnStructure(boardInfo)
+			entry = (self.buildEntry(structure, True), self.buildEntry(structure, False))
+			entrySize = sum(len(targets) + len(watchers) for targets, watchers in entry)
+			self.size += entrySize
+			self.entries[key] = entry + (entrySize,)
+			self.evict()
+		else:
+			self.hits += 1
+			self.entries[key] = entry
+		targets, watchers = entry[not isFirstPlayer]
+
+		# pawns watching a square another piece stands on are generated on the board
+		affected = set()
+		if isinstance(boardInfo, Board):
+			ownPawns = boardInfo.occupancy(isFirstPlayer)
+			p1Occupancy, p2Occupancy = boardInfo.p1Occupancy, boardInfo.p2Occupancy
+			for square, watching in watchers.items():
+				piece = p1Occupancy.get(square) or p2Occupancy.get(square)
+				if piece is not None and not isPawnClass(type(piece)):
+					affected.update(watching)
+		else:
+			ownPawns = pawns[not isFirstPlayer]
+			for position in others:
+				watching = watchers.get(position)
+				if watching is not None:
+					affected.update(watching)
+		if not affected:
+			return targets
+		self.fallbacks += 1
+		targets = dict(targets)
+		for position in affected:
+			targets[position] = tuple(ownPawns[position].getPossiblePositions(boardInfo, isFirstPlayer))
+		return targets
+
+	""" Get (board size, p1 pawn positions, p2 pawn positions) of a board """
+	def pawnStructure(self, boardInfo):
+		return (boardInfo['boardSize'],
+			frozenset(piece.position for piece in boardInfo['P1'] if isPawnClass(type(piece))),
+			frozenset(piece.position for piece in boardInfo['P2'] if isPawnClass(type(piece))))
+
+	""" Drop least recently used entries until the cache is within its limits """
+	def evict(self):
+		while self.entries and (len(self.entries) > self.maxEntries or (self.maxSize is not None and self.size > self.maxSize)):
+			key, entry = self.entries.popitem(last=False)
+			self.size -= entry[2]
+
+	"""
+	Moves of the pawns of one player with only the pawns of a pawn structure on the board
+	Returns (pawn position -> target positions, square -> positions of the pawns watching it)
+	"""
+	def buildEntry(self, structure, isP1Piece):
+		boardSize, p1Pawns, p2Pawns = structure
+		own, enemy = (p1Pawns, p2Pawns) if isP1Piece else (p2Pawns, p1Pawns)
+		displacement = 1 if isP1Piece else -1
+		startingRow = 1 if isP1Piece else boardSize - 2
+		targets = {}
+		watchers = {}
+		for x, y in own:
+			pushes = [(x, y + displacement)]
+			if y == startingRow:
+				pushes.append((x, y + 2 * displacement))
+			diagonals = [(x + displacement, y + displacement), (x - displacement, y + displacement)]
+			positions = []
+			# pushes are only blocked by own pieces, diagonal moves need an enemy piece
+			for position in pushes:
+				if not (0 <= position[0] < boardSize and 0 <= position[1] < boardSize) or position in own:
+					break
+				positions.append(position)
+			for position in diagonals:
+				if position in enemy:
+					positions.append(position)
+			targets[(x, y)] = tuple(positions)
+			for position in pushes + diagonals:
+				watchers[position] = watchers.get(position, ()) + ((x, y),)
+		return targets, watchers
+
+	""" Get all possible moves of a player like chess.getAllPossibleMoves, with the pawn moves from the cache """
+	def getAllPossibleMoves(self, boardInfo, isFirstPlayer):
+		targets = self.pawnPositions(boardInfo, isFirstPlayer)
+		moves = []
+		for piece in boardInfo['P1' if isFirstPlayer else 'P2']:
+			if isPawnClass(type(piece)):
+				moves.extend([Move(piece, position) for position in targets[piece.position]])
+			else:
+				moves.extend(piece.getPossibleMoves(boardInfo, isFirstPlayer))
+		return moves
@@ -0,0 +1,290 @@
+from chess import *
+from batch import encodeBoard, decodeBoard
+from collections import OrderedDict
+from timeit import default_timer
+import argparse
+import json
+import multiprocessing
+import sys
+
+"""
+Perft style benchmark and correctness suite of the move generator
+Counts the leaf nodes of the move tree to a given depth from a set of positions
+and compares them to stored reference counts
+
+Moves are pseudo-legal like the rest of the module, kings can be captured and play goes on
+
+parallelPerft and parallelDivide split the tree a few plies down into subtrees counted on a pool of processes
+
+Usage: python perft.py [--depth N] [--positions name,...] [--backend name] [--breakdown]
+	[--baseline FILE] [--save-baseline FILE] [--tolerance FRACTION] [--workers N] [--split-depth N]
+"""
+
+BACK_RANK = (Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook)
+
+""" Board with the standard back rank and pawns repeated across the width of the board """
+def standardBoardInfo(boardSize=8):
+	boardInfo = dict()
+	boardInfo['boardSize'] = boardSize
+	boardInfo['P1'] = [Pawn((x, 1)) for x in xrange(boardSize)] + [BACK_RANK[x % 8]((x, 0)) for x in xrange(boardSize)]
+	boardInfo['P2'] = [Pawn((x, boardSize - 2)) for x in xrange(boardSize)] + [BACK_RANK[x % 8]((x, boardSize - 1)) for x in xrange(boardSize)]
+	return boardInfo
+
+""" Open 8x8 position with captures available for both players """
+def middlegameBoardInfo():
+	boardInfo = dict()
+	boardInfo['boardSize'] = 8
+	boardInfo['P1'] = [Pawn((0, 1)), Pawn((1, 1)), Pawn((2, 2)), Pawn((3, 3)), Pawn((5, 1)), Pawn((6, 1)),
+		Rook((0, 0)), Knight((5, 2)), Bishop((2, 3)), Queen((4, 1)), King((6, 0)), Rook((5, 0))]
+	boardInfo['P2'] = [Pawn((0, 6)), Pawn((1, 5)), Pawn((2, 6)), Pawn((4, 4)), Pawn((5, 6)), Pawn((6, 6)),
+		Rook((0, 7)), Knight((2, 5)), Bishop((6, 4)), Queen((3, 6)), King((4, 7)), Rook((7, 7))]
+	return boardInfo
+
+""" Few pieces spread over a large board, dominated by long slider rays """
+def sparseBoardInfo(boardSize=32):
+	boardInfo = dict()
+	boardInfo['boardSize'] = boardSize
+	boardInfo['P1'] = [King((16, 0)), Queen((10, 4)), Rook((0, 0)), Bishop((20, 3)), Knight((5, 2)), Pawn((12, 1)), Pawn((13, 1))]
+	boardInfo['P2'] = [King((16, boardSize - 1)), Queen((21, 27)), Rook((31, 31)), Bishop((9, 28)), Knight((26, 29)),
+		Pawn((12, boardSize - 2)), Pawn((18, boardSize - 2))]
+	return boardInfo
+
+"""
+Positions of the suite: name -> (board builder, depth used by default)
+Reference counts are the leaf node counts for depth 1, 2, ...
+"""
+POSITIONS = OrderedDict([
+	('start8', (lambda: standardBoardInfo(8), 3)),
+	('middlegame8', (middlegameBoardInfo, 3)),
+	('start16', (lambda: standardBoardInfo(16), 3)),
+	('sparse32', (lambda: sparseBoardInfo(32), 2)),
+])
+
+REFERENCE_COUNTS = {
+	'start8': [20, 400, 8910, 198769],
+	'middlegame8': [39, 1849, 73596, 3400685],
+	'start16': [40, 1600, 71756],
+	'sparse32': [199, 39277, 7844789],
+}
+
+
+""" Get all possible moves piece by piece and add the time spent to each piece class """
+def timedPossibleMoves(boardInfo, isFirstPlayer, timings):
+	if isFirstPlayer:
+		pieces = boardInfo['P1']
+	else:
+		pieces = boardInfo['P2']
+	moves = []
+	for piece in pieces:
+		start = default_timer()
+		moves.extend(piece.getPossibleMoves(boardInfo, isFirstPlayer))
+		name = type(piece).__name__
+		timings[name] = timings.get(name, 0.0) + default_timer() - start
+	return moves
+
+"""
+Count the leaf nodes of the move tree to a depth
+Moves are made and unmade on the board in place, so it is left as it was
+If a timings dictionary is given, move generation time is added to it per piece class
+"""
+def perft(boardInfo, isFirstPlayer, depth, backend=None, timings=None):
+	if depth == 0:
+		return 1
+	if timings is not None:
+		moves = timedPossibleMoves(boardInfo, isFirstPlayer, timings)
+	else:
+		moves = getAllPossibleMoves(boardInfo, isFirstPlayer, backend)
+	if depth == 1:
+		return len(moves)
+	nodes = 0
+	for move in moves:
+		undo = makeMove(boardInfo, move, isFirstPlayer)
+		nodes += perft(boardInfo, not isFirstPlayer, depth - 1, backend, timings)
+		unmakeMove(boardInfo, undo)
+	return nodes
+
+""" Count the leaf nodes below each of the first player's moves """
+def divide(boardInfo, isFirstPlayer, depth, backend=None):
+	counts = []
+	for move in getAllPossibleMoves(boardInfo, isFirstPlayer, backend):
+		undo = makeMove(boardInfo, move, isFirstPlayer)
+		counts.append((str(move), perft(boardInfo, not isFirstPlayer, depth - 1, backend)))
+		unmakeMove(boardInfo, undo)
+	return counts
+
+
+"""
+Count the leaf nodes of the subtree at the end of a path of (from position, to position) moves in a worker
+Returns (task index, nodes)
+"""
+def _perftTask(task):
+	index, encoded, isFirstPlayer, path, depth, backend = task
+	board = decodeBoard(encoded)
+	for fromPosition, toPosition in path:
+		makeMove(board, Move(board.pieceAt(fromPosition, isFirstPlayer), toPosition), isFirstPlayer)
+		isFirstPlayer = not isFirstPlayer
+	return index, perft(board, isFirstPlayer, depth, backend)
+
+""" Get the paths of splitDepth moves below a position, as (root move index, path) pairs """
+def splitPaths(boardInfo, isFirstPlayer, splitDepth, backend=None):
+	board = Board.fromBoardInfo(boardInfo)
+	paths = []
+	def expand(isFirstPlayer, path, rootIndex, depth):
+		if depth == 0:
+			paths.append((rootIndex, tuple(path)))
+			return
+		for i, move in enumerate(getAllPossibleMoves(board, isFirstPlayer, backend)):
+			path.append((move.piece.position, move.position))
+			undo = makeMove(board, move, isFirstPlayer)
+			expand(not isFirstPlayer, path, i if rootIndex is None else rootIndex, depth - 1)
+			unmakeMove(board, undo)
+			path.pop()
+	expand(isFirstPlayer, [], None, splitDepth)
+	return paths
+
+"""
+Count the leaf nodes below each root move like divide, with the subtrees splitDepth plies down
+counted on a pool of workers processes, all cores by default
+Subtrees are handed out one at a time as workers become free, so large subtrees do not hold up the others
+"""
+def parallelDivide(boardInfo, isFirstPlayer, depth, workers=None, splitDepth=1, backend=None):
+	rootMoves = getAllPossibleMoves(boardInfo, isFirstPlayer, backend)
+	counts = [0] * len(rootMoves)
+	splitDepth = max(1, min(splitDepth, depth - 1))
+	if depth <= 1:
+		counts = [1] * len(rootMoves)
+	else:
+		encoded = encodeBoard(boardInfo)
+		paths = splitPaths(boardInfo, isFirstPlayer, splitDepth, backend)
+		tasks = [(i, encoded, isFirstPlayer, path, depth - splitDepth, backend) for i, (rootIndex, path) in enumerate(paths)]
+		if workers is None:
+			workers = multiprocessing.cpu_count()
+		if workers <= 1:
+			results = map(_perftTask, tasks)
+		else:
+			pool = multiprocessing.Pool(workers)
+			try:
+				results = list(pool.imap_unordered(_perftTask, tasks, 1))
+				pool.close()
+			finally:
+				pool.terminate()
+				pool.join()
+		for index, nodes in results:
+			counts[paths[index][0]] += nodes
+	return [(str(move), count) for move, count in zip(rootMoves, counts)]
+
+""" Count the leaf nodes of the move tree to a depth on a pool of processes, see parallelDivide """
+def parallelPerft(boardInfo, isFirstPlayer, depth, workers=None, splitDepth=1, backend=None):
+	if depth == 0:
+		return 1
+	return sum(count for move, count in parallelDivide(boardInfo, isFirstPlayer, depth, workers, splitDepth, backend))
+
+
+"""
+Run perft on positions of the suite and check the counts against the references
+With more than one worker the positions are counted with parallelPerft
+Returns one result dictionary per position
+"""
+def runSuite(names=None, depth=None, backend=None, breakdown=False, workers=1, splitDepth=1):
+	results = []
+	for name in (names or POSITIONS.keys()):
+		build, defaultDepth = POSITIONS[name]
+		positionDepth = depth or defaultDepth
+		start = default_timer()
+		if workers > 1:
+			nodes = parallelPerft(build(), True, positionDepth, workers, splitDepth, backend)
+		else:
+			nodes = perft(Board.fromBoardInfo(build()), True, positionDepth, backend)
+		seconds = default_timer() - start
+		references = REFERENCE_COUNTS.get(name, [])
+		expected = references[positionDepth - 1] if positionDepth <= len(references) else None
+		result = {
+			'name': name,
+			'depth': positionDepth,
+			'nodes': nodes,
+			'expected': expected,
+			'seconds': seconds,
+			'nps': nodes / seconds if seconds > 0 else float('inf'),
+		}
+		if breakdown:
+			timings = {}
+			perft(Board.fromBoardInfo(build()), True, positionDepth, timings=timings)
+			result['timings'] = timings
+		results.append(result)
+	return results
+
+""" Get the results whose node count does not match the reference count """
+def countMismatches(results):
+	return [result for result in results if result['expected'] is not None and result['nodes'] != result['expected']]
+
+""" Key of a result in a baseline file """
+def baselineKey(result, backend=None):
+	return '%s/%d/%s' % (result['name'], result['depth'], backend or 'pieces')
+
+""" Store the nodes per second of each result as the baseline """
+def saveBaseline(path, results, backend=None):
+	baseline = dict((baselineKey(result, backend), result['nps']) for result in results)
+	with open(path, 'w') as baselineFile:
+		json.dump(baseline, baselineFile, indent=1, sort_keys=True)
+
+"""
+Get the results that are slower than the baseline by more than the tolerance
+Tolerance is the allowed fraction of lost nodes per second
+"""
+def baselineRegressions(path, results, tolerance, backend=None):
+	with open(path) as baselineFile:
+		baseline = json.load(baselineFile)
+	regressions = []
+	for result in results:
+		reference = baseline.get(baselineKey(result, backend))
+		if reference is not None and result['nps'] < reference * (1 - tolerance):
+			regressions.append((result, reference))
+	return regressions
+
+def formatResult(result):
+	if result['expected'] is None:
+		status = 'no reference'
+	elif result['nodes'] == result['expected']:
+		status = 'ok'
+	else:
+		status = 'MISMATCH expected %d' % result['expected']
+	return '%-12s depth %d  %10d nodes  %8.3fs  %10.0f nodes/s  %s' % (
+		result['name'], result['depth'], result['nodes'], result['seconds'], result['nps'], status)
+
+def formatTimings(timings):
+	total = sum(timings.values()) or 1.0
+	return '  '.join('%s %.3fs (%.0f%%)' % (name, seconds, 100 * seconds / total)
+		for name, seconds in sorted(timings.items(), key=lambda item: -item[1]))
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Perft benchmark and correctness suite of the move generator')
+	parser.add_argument('--depth', type=int, help='depth of every position instead of its default depth')
+	parser.add_argument('--positions', help='comma separated position names, one of ' + ', '.join(POSITIONS.keys()))
+	parser.add_argument('--backend', help='move generation backend, e.g. bitboard')
+	parser.add_argument('--breakdown', action='store_true', help='report move generation time per piece class')
+	parser.add_argument('--baseline', help='fail if slower than the nodes per second stored in this file')
+	parser.add_argument('--save-baseline', help='store the nodes per second of this run in this file')
+	parser.add_argument('--tolerance', type=float, default=0.25, help='allowed fraction of lost nodes per second')
+	parser.add_argument('--workers', type=int, default=1, help='count subtrees on this many processes')
+	parser.add_argument('--split-depth', type=int, default=1, help='plies below the root where the tree is split between workers')
+	args = parser.parse_args(argv)
+
+	names = args.positions.split(',') if args.positions else None
+	results = runSuite(names, args.depth, args.backend, args.breakdown, args.workers, args.split_depth)
+	for result in results:
+		print(formatResult(result))
+		if 'timings' in result:
+			print('    ' + formatTimings(result['timings']))
+
+	failed = bool(countMismatches(results))
+	if args.baseline:
+		for result, reference in baselineRegressions(args.baseline, results, args.tolerance, args.backend):
+			print('REGRESSION %s depth %d: %.0f nodes/s, baseline %.0f nodes/s' % (
+				result['name'], result['depth'], result['nps'], reference))
+			failed = True
+	if args.save_baseline:
+		saveBaseline(args.save_baseline, results, args.backend)
+	return 1 if failed else 0
+
+if __name__ == '__main__':
+	sys.exit(main())
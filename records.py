@@ -0,0 +1,223 @@
+from chess import Board, King, Queen, Bishop, Knight, Rook, Pawn, xrange
+import mmap
+import os
+import struct
+
+"""
+Fixed width binary records of boards and memory mapped files of records
+
+A file starts with a header (magic, version, maxPieces), followed by records of the same size
+A record is the board size, the side to move, the number of pieces of each player
+and maxPieces (type code, square index) slots for each player, unused slots are zero
+Square index is x + boardSize * y as in chess.squareIndex
+
+PositionDatabase maps a file and hands out BoardViews, boards that only read
+the pieces out of the mapped file when they are first used
+"""
+
+MAGIC = b'CHBR'
+VERSION = 1
+HEADER = struct.Struct('<4sBH')
+RECORD_HEADER = struct.Struct('<HBHH')
+PIECE = struct.Struct('<BH')
+
+""" Type code of each piece class, 0 marks an unused slot """
+PIECE_CODES = {King: 1, Queen: 2, Bishop: 3, Knight: 4, Rook: 5, Pawn: 6}
+PIECE_CLASSES = dict((code, pieceClass) for pieceClass, code in PIECE_CODES.items())
+
+""" Give a custom piece class a type code so boards holding it can be stored """
+def registerPieceClass(pieceClass, code):
+	if not 0 < code < 256 or PIECE_CLASSES.get(code, pieceClass) is not pieceClass:
+		raise ValueError('Type code %d is not available' % code)
+	PIECE_CODES[pieceClass] = code
+	PIECE_CLASSES[code] = pieceClass
+
+""" Size in bytes of a record holding up to maxPieces pieces per player """
+def recordSize(maxPieces):
+	return RECORD_HEADER.size + 2 * maxPieces * PIECE.size
+
+def _encodePieces(pieces, boardSize, maxPieces):
+	if len(pieces) > maxPieces:
+		raise ValueError('%d pieces do not fit in a record of %d pieces' % (len(pieces), maxPieces))
+	slots = []
+	for piece in pieces:
+		x, y = piece.position
+		if not (0 <= x < boardSize and 0 <= y < boardSize):
+			raise ValueError('Piece %s is off the board at %s' % (type(piece).__name__, piece.position))
+		code = PIECE_CODES.get(type(piece))
+		if code is None:
+			raise ValueError('Piece class %s has no type code' % type(piece).__name__)
+		slots.append(PIECE.pack(code, x + boardSize * y))
+	slots.append(b'\0' * (PIECE.size * (maxPieces - len(pieces))))
+	return b''.join(slots)
+
+""" Encode a board and the side to move as a record """
+def encodeBoard(boardInfo, isFirstPlayer, maxPieces):
+	boardSize = boardInfo['boardSize']
+	if not 0 < boardSize <= 256:
+		raise ValueError('Board size %d does not fit in a record' % boardSize)
+	return (RECORD_HEADER.pack(boardSize, bool(isFirstPlayer), len(boardInfo['P1']), len(boardInfo['P2']))
+		+ _encodePieces(boardInfo['P1'], boardSize, maxPieces)
+		+ _encodePieces(boardInfo['P2'], boardSize, maxPieces))
+
+""" Structs unpacking the slots of a number of pieces at once, by number of pieces """
+_pieceStructs = {}
+
+def _decodePieces(data, offset, count, boardSize):
+	pieceStruct = _pieceStructs.get(count)
+	if pieceStruct is None:
+		pieceStruct = _pieceStructs[count] = struct.Struct('<' + 'BH' * count)
+	slots = pieceStruct.unpack_from(data, offset)
+	pieceClasses = PIECE_CLASSES
+	return [pieceClasses[slots[i]]((slots[i + 1] % boardSize, slots[i + 1] // boardSize)) for i in xrange(0, 2 * count, 2)]
+
+""" Decode the record at an offset of a buffer, returns (Board, isFirstPlayer) """
+def decodeBoard(data, maxPieces, offset=0):
+	board = BoardView(data, offset, maxPieces)
+	return Board(board['boardSize'], board['P1'], board['P2']), board.isFirstPlayer
+
+
+class BoardView(Board):
+	"""
+	Board read from a record of a buffer, e.g. a memory mapped file
+	The board size and side to move are read on first use, the pieces are only built
+	when a piece list, occupancy map or hash is first asked for
+	The buffer must stay open as long as the view has not built its pieces
+	Membership, length, iteration and the other dict views build the pieces first,
+	so the view reads like the board it was written from, except that dict(view) on Python 2
+	only copies what is built already, view.copy() copies the whole board on both
+	"""
+	def __init__(self, data, offset, maxPieces):
+		dict.__init__(self)
+		self.data = data
+		self.offset = offset
+		self.maxPieces = maxPieces
+
+	@property
+	def isFirstPlayer(self):
+		return bool(RECORD_HEADER.unpack_from(self.data, self.offset)[1])
+
+	""" Read missing keys out of the record, dict calls this when a key is not set yet """
+	def __missing__(self, key):
+		if key == 'boardSize':
+			boardSize = RECORD_HEADER.unpack_from(self.data, self.offset)[0]
+			dict.__setitem__(self, 'boardSize', boardSize)
+			return boardSize
+		if key in ('P1', 'P2'):
+			self.load()
+			return dict.__getitem__(self, key)
+		raise KeyError(key)
+
+	""" Occupancy maps and hashes are built with the pieces """
+	def __getattr__(self, name):
+		if name in ('p1Occupancy', 'p2Occupancy', 'p1Hash', 'p2Hash', 'p1PawnHash', 'p2PawnHash'):
+			self.load()
+			return object.__getattribute__(self, name)
+		raise AttributeError(name)
+
+	""" Build the pieces unless they are built already """
+	def loaded(self):
+		if not dict.__contains__(self, 'P1'):
+			self.load()
+		return self
+
+	def __contains__(self, key):
+		return dict.__contains__(self.loaded(), key)
+
+	def __len__(self):
+		return dict.__len__(self.loaded())
+
+	def __iter__(self):
+		return dict.__iter__(self.loaded())
+
+	def get(self, key, default=None):
+		return dict.get(self.loaded(), key, default)
+
+	def keys(self):
+		return dict.keys(self.loaded())
+
+	def values(self):
+		return dict.values(self.loaded())
+
+	def items(self):
+		return dict.items(self.loaded())
+
+	def copy(self):
+		return dict(self.loaded().items())
+
+	""" Build the pieces of both players """
+	def load(self):
+		boardSize, isFirstPlayer, p1Count, p2Count = RECORD_HEADER.unpack_from(self.data, self.offset)
+		p1Offset = self.offset + RECORD_HEADER.size
+		p2Offset = p1Offset + self.maxPieces * PIECE.size
+		dict.__setitem__(self, 'boardSize', boardSize)
+		self['P1'] = _decodePieces(self.data, p1Offset, p1Count, boardSize)
+		self['P2'] = _decodePieces(self.data, p2Offset, p2Count, boardSize)
+
+
+"""
+Write (boardInfo, isFirstPlayer) positions to a file of records in one buffered pass
+maxPieces is the number of piece slots per player, by default the most pieces a player has
+in the positions, which then have to be read into a list first
+Returns the number of records written
+"""
+def writeDatabase(path, positions, maxPieces=None):
+	if maxPieces is None:
+		positions = list(positions)
+		maxPieces = max([max(len(boardInfo['P1']), len(boardInfo['P2'])) for boardInfo, isFirstPlayer in positions] or [0])
+	count = 0
+	with open(path, 'wb') as databaseFile:
+		databaseFile.write(HEADER.pack(MAGIC, VERSION, maxPieces))
+		for boardInfo, isFirstPlayer in positions:
+			databaseFile.write(encodeBoard(boardInfo, isFirstPlayer, maxPieces))
+			count += 1
+	return count
+
+
+class PositionDatabase(object):
+	"""
+	Read only, memory mapped file of board records
+	Indexing gives a BoardView, iterating gives (BoardView, isFirstPlayer) positions
+	that can be passed to chess.getAllPossibleMoves or batch.iterBatchMoves
+	"""
+	def __init__(self, path):
+		self.file = open(path, 'rb')
+		if os.fstat(self.file.fileno()).st_size < HEADER.size:
+			self.file.close()
+			raise ValueError('%s is not a board record file' % path)
+		try:
+			self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+		except Exception:
+			self.file.close()
+			raise
+		magic, version, self.maxPieces = HEADER.unpack_from(self.data, 0)
+		if magic != MAGIC or version != VERSION:
+			self.close()
+			raise ValueError('%s is not a board record file' % path)
+		self.recordSize = recordSize(self.maxPieces)
+		self.count = (len(self.data) - HEADER.size) // self.recordSize
+
+	def __len__(self):
+		return self.count
+
+	def __getitem__(self, index):
+		if index < 0:
+			index += self.count
+		if not 0 <= index < self.count:
+			raise IndexError('record index out of range')
+		return BoardView(self.data, HEADER.size + index * self.recordSize, self.maxPieces)
+
+	def __iter__(self):
+		for index in xrange(self.count):
+			board = self[index]
+			yield board, board.isFirstPlayer
+
+	def close(self):
+		self.data.close()
+		self.file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *excInfo):
+		self.close()
@@ -0,0 +1,256 @@
+from chess import Board, Move, King, Queen, Bishop, Knight, Rook, Pawn, makeMove, unmakeMove, xrange
+from collections import OrderedDict
+from timeit import default_timer
+
+"""
+Alpha-beta search on top of the piece move generation
+
+Iterative deepening negamax with alpha-beta pruning and a capture only quiescence search at the leaves
+Moves of a node are tried best first: the best move found for the position by the previous iteration,
+then captures by most valuable victim and least valuable attacker (MVV-LVA), then the other moves
+The best move is checked and tried before any move is generated, captures are generated on their own
+with getCapturePositions, and the quiet moves are generated piece by piece as they are searched,
+so a cutoff never generates the rest of the node and the quiescence search never generates quiet moves
+
+Moves are pseudo-legal like the rest of the module, capturing a king wins and ends the line
+The evaluation is pluggable, by default the material balance of the piece classes
+"""
+
+""" Score of capturing a king, lowered by the number of plies it takes """
+MATE = 1000000
+
+""" Material value of each piece class, custom pieces use the value of their closest base class """
+DEFAULT_VALUES = {King: 0, Queen: 900, Rook: 500, Bishop: 330, Knight: 320, Pawn: 100}
+
+""" Value of piece classes without a value of their own or of a base class """
+DEFAULT_VALUE = 300
+
+""" Number of nodes between checks of the time budget """
+CHECK_INTERVAL = 1024
+
+""" Number of positions whose best move is kept between searches by default """
+BEST_MOVES_SIZE = 1 << 16
+
+
+class MaterialEvaluation(object):
+	"""
+	Material balance from the side to move's point of view
+	values maps piece classes to values, on top of DEFAULT_VALUES
+	"""
+	def __init__(self, values=None):
+		self.values = dict(DEFAULT_VALUES)
+		if values:
+			self.values.update(values)
+		self.classValues = {}
+
+	""" Get the value of a piece, looked up through the base classes of its class """
+	def value(self, piece):
+		pieceClass = type(piece)
+		value = self.classValues.get(pieceClass)
+		if value is None:
+			value = DEFAULT_VALUE
+			for cls in pieceClass.__mro__:
+				if cls in self.values:
+					value = self.values[cls]
+					break
+			self.classValues[pieceClass] = value
+		return value
+
+	def __call__(self, boardInfo, isFirstPlayer):
+		value = self.value
+		score = sum(value(piece) for piece in boardInfo['P1']) - sum(value(piece) for piece in boardInfo['P2'])
+		return score if isFirstPlayer else -score
+
+
+class SearchResult(object):
+	""" Best move found, its score for the side to move, the last completed depth and the nodes searched """
+	def __init__(self, move, score, depth, nodes, seconds):
+		self.move = move
+		self.score = score
+		self.depth = depth
+		self.nodes = nodes
+		self.seconds = seconds
+
+	def __str__(self):
+		return '%s score %d depth %d nodes %d %.3fs' % (self.move, self.score, self.depth, self.nodes, self.seconds)
+
+
+class SearchStopped(Exception):
+	""" Raised inside the search when the time or node budget is spent """
+
+
+class Search(object):
+	"""
+	Iterative deepening alpha-beta search
+	evaluate is called with (board, isFirstPlayer) and scores the position for the side to move,
+	its value method, if it has one, gives the piece values used to order captures
+	An evaluation with reset, makeMove and unmakeMove methods, e.g. evaluation.IncrementalEvaluation,
+	is reset with the board of each search and applies the moves of the search itself to keep its scores
+	The best moves of the last maxBestMoves searched positions are kept between searches to order the moves,
+	least recently used positions are dropped first
+	"""
+	def __init__(self, evaluate=None, quiescenceDepth=8, maxBestMoves=BEST_MOVES_SIZE):
+		if evaluate is None:
+			evaluate = MaterialEvaluation()
+		self.evaluate = evaluate
+		self.quiescenceDepth = quiescenceDepth
+		self.pieceValue = getattr(evaluate, 'value', None) or MaterialEvaluation().value
+		self.makeMove = getattr(evaluate, 'makeMove', makeMove)
+		self.unmakeMove = getattr(evaluate, 'unmakeMove', unmakeMove)
+		self.maxBestMoves = maxBestMoves
+		self.bestMoves = OrderedDict()
+		self.nodes = 0
+
+	"""
+	Search a position to maxDepth plies or until the budget is spent
+	timeLimit is in seconds, nodeLimit in nodes, the result is the one of the last completed depth
+	"""
+	def search(self, boardInfo, isFirstPlayer, maxDepth=64, timeLimit=None, nodeLimit=None):
+		if not isinstance(boardInfo, Board):
+			boardInfo = Board.fromBoardInfo(boardInfo)
+		if hasattr(self.evaluate, 'reset'):
+			self.evaluate.reset(boardInfo)
+		start = default_timer()
+		self.nodes = 0
+		self.deadline = start + timeLimit if timeLimit is not None else None
+		self.nodeLimit = nodeLimit
+		result = SearchResult(None, self.evaluate(boardInfo, isFirstPlayer), 0, 0, 0.0)
+		for depth in xrange(1, maxDepth + 1):
+			try:
+				score, move = self.searchRoot(boardInfo, isFirstPlayer, depth)
+			except SearchStopped:
+				break
+			result = SearchResult(move, score, depth, self.nodes, default_timer() - start)
+			if move is None or abs(score) >= MATE - maxDepth - self.quiescenceDepth:
+				break
+		result.nodes = self.nodes
+		result.seconds = default_timer() - start
+		return result
+
+	def checkBudget(self):
+		if self.nodeLimit is not None and self.nodes >= self.nodeLimit:
+			raise SearchStopped()
+		if self.deadline is not None and default_timer() >= self.deadline:
+			raise SearchStopped()
+
+	def searchRoot(self, board, isFirstPlayer, depth):
+		alpha = -MATE - 1
+		bestMove = None
+		for piece, position, captured in self.orderedMoves(board, isFirstPlayer, False):
+			score = self.searchMove(board, isFirstPlayer, piece, position, captured, depth, alpha, MATE + 1, 0)
+			if bestMove is None or score > alpha:
+				alpha = score
+				bestMove = Move(piece, position)
+		if bestMove is None:
+			return self.evaluate(board, isFirstPlayer), None
+		self.storeBestMove(board.positionHash(isFirstPlayer), (bestMove.piece.position, bestMove.position))
+		return alpha, bestMove
+
+	""" Score of a move for the side making it """
+	def searchMove(self, board, isFirstPlayer, piece, position, captured, depth, alpha, beta, ply):
+		if isinstance(captured, King):
+			return MATE - ply
+		undo = self.makeMove(board, Move(piece, position), isFirstPlayer)
+		try:
+			if depth > 1:
+				return -self.alphaBeta(board, not isFirstPlayer, depth - 1, -beta, -alpha, ply + 1)
+			return -self.quiescence(board, not isFirstPlayer, -beta, -alpha, ply + 1, self.quiescenceDepth)
+		finally:
+			self.unmakeMove(board, undo)
+
+	def alphaBeta(self, board, isFirstPlayer, depth, alpha, beta, ply):
+		self.nodes += 1
+		if self.nodes % CHECK_INTERVAL == 0:
+			self.checkBudget()
+		best = None
+		bestMove = None
+		for piece, position, captured in self.orderedMoves(board, isFirstPlayer, False):
+			score = self.searchMove(board, isFirstPlayer, piece, position, captured, depth, alpha, beta, ply)
+			if best is None or score > best:
+				best = score
+				bestMove = (piece.position, position)
+				if score > alpha:
+					alpha = score
+					if alpha >= beta:
+						break
+		if best is None:
+			return self.evaluate(board, isFirstPlayer)
+		self.storeBestMove(board.positionHash(isFirstPlayer), bestMove)
+		return best
+
+	""" Search captures only until the position is quiet, the side to move can stand on the evaluation """
+	def quiescence(self, board, isFirstPlayer, alpha, beta, ply, depth):
+		self.nodes += 1
+		if self.nodes % CHECK_INTERVAL == 0:
+			self.checkBudget()
+		best = self.evaluate(board, isFirstPlayer)
+		if best >= beta or depth == 0:
+			return best
+		alpha = max(alpha, best)
+		for piece, position, captured in self.orderedMoves(board, isFirstPlayer, True):
+			if isinstance(captured, King):
+				return MATE - ply
+			undo = self.makeMove(board, Move(piece, position), isFirstPlayer)
+			try:
+				score = -self.quiescence(board, not isFirstPlayer, -beta, -alpha, ply + 1, depth - 1)
+			finally:
+				self.unmakeMove(board, undo)
+			if score > best:
+				best = score
+				if score > alpha:
+					alpha = score
+					if alpha >= beta:
+						break
+		return best
+
+	""" Keep the (from position, to position) best move of a position, dropping the least recently used one when full """
+	def storeBestMove(self, key, bestMove):
+		bestMoves = self.bestMoves
+		bestMoves.pop(key, None)
+		while len(bestMoves) >= self.maxBestMoves:
+			bestMoves.popitem(last=False)
+		bestMoves[key] = bestMove
+
+	def getBestMove(self, key):
+		bestMove = self.bestMoves.pop(key, None)
+		if bestMove is not None:
+			self.bestMoves[key] = bestMove
+		return bestMove
+
+	"""
+	Yield (piece, position, captured piece or None) best first
+	the best move found before for the position if it is still possible, captures by MVV-LVA, then the quiet moves
+	"""
+	def orderedMoves(self, board, isFirstPlayer, capturesOnly):
+		enemy = board.occupancy(not isFirstPlayer)
+		best = None
+		if not capturesOnly:
+			stored = self.getBestMove(board.positionHash(isFirstPlayer))
+			if stored is not None:
+				piece = board.pieceAt(stored[0], isFirstPlayer)
+				if piece is not None and stored[1] in piece.iterPossiblePositions(board, isFirstPlayer):
+					best = (piece, stored[1])
+					yield piece, stored[1], enemy.get(stored[1])
+
+		value = self.pieceValue
+		captures = []
+		pieces = board['P1' if isFirstPlayer else 'P2']
+		for piece in pieces:
+			for position in piece.getCapturePositions(board, isFirstPlayer):
+				if best is not None and piece is best[0] and position == best[1]:
+					continue
+				captured = enemy[position]
+				# kings are taken first, then the most valuable victim with the least valuable attacker
+				victimValue = MATE if isinstance(captured, King) else value(captured)
+				captures.append((-victimValue, value(piece), len(captures), piece, position, captured))
+		captures.sort()
+		for capture in captures:
+			yield capture[3], capture[4], capture[5]
+		if capturesOnly:
+			return
+
+		for piece in pieces:
+			for position in piece.iterPossiblePositions(board, isFirstPlayer):
+				if position in enemy or (best is not None and piece is best[0] and position == best[1]):
+					continue
+				yield piece, position, None
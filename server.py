@@ -0,0 +1,245 @@
+from chess import getAllPossibleMoves
+from fen import parseFen, formatMove
+from collections import deque
+import argparse
+import json
+import sys
+
+try:
+	import asyncio
+	import concurrent.futures
+except ImportError:
+	asyncio = None
+
+"""
+Move generation service over TCP or a Unix socket, requires Python 3 and asyncio
+
+Clients send one JSON object per line, e.g. {"id": 1, "fen": "8/8/8/8/8/8/8/K6k w", "backend": "bitboard"}
+and get one JSON object per line back, in the order the requests were sent on the connection
+	{"id": 1, "moves": ["K0,0-0,1", "K0,0-1,0", "K0,0-1,1"]}
+	{"id": 2, "error": "..."}
+Positions are in the FEN style of fen.py, moves are written with fen.formatMove
+
+Requests of all connections are grouped into micro batches of up to batchSize positions,
+a batch is sent when it is full or batchDelay seconds after its first request
+Parsing, move generation and encoding run on a process pool so the event loop only moves bytes
+When more than maxPending requests are waiting for their moves, reading from every connection
+is paused until half of them are answered, lines already read are kept and handled on resume
+A connection whose client does not read its answers fast enough is not served until its writes drain
+
+Usage: python3 server.py [--port N | --unix PATH] [--workers N] [--batch-size N] [--batch-delay SECONDS]
+"""
+
+""" Longest request line accepted, longer lines close the connection """
+MAX_LINE_LENGTH = 1 << 16
+
+
+""" Parse and generate the moves of a batch of (fen, backend) requests in a worker, returns encoded results """
+def generateBatch(requests):
+	results = []
+	for text, backend in requests:
+		try:
+			boardInfo, isFirstPlayer = parseFen(text)
+			moves = getAllPossibleMoves(boardInfo, isFirstPlayer, backend)
+			results.append((True, json.dumps([formatMove(move) for move in moves])))
+		except Exception as error:
+			results.append((False, json.dumps(str(error))))
+	return results
+
+
+class MoveService(object):
+	"""
+	Groups requests into micro batches and runs them on an executor
+	submit gives a future of (ok, encoded moves or error) for each request
+	"""
+	def __init__(self, loop, executor, batchSize=64, batchDelay=0.002, maxPending=4096):
+		self.loop = loop
+		self.executor = executor
+		self.batchSize = batchSize
+		self.batchDelay = batchDelay
+		self.maxPending = maxPending
+		self.batch = []
+		self.timer = None
+		self.pending = 0
+		self.paused = False
+		self.protocols = set()
+		self.batches = 0
+
+	def submit(self, text, backend=None):
+		future = self.loop.create_future()
+		self.batch.append((text, backend, future))
+		self.pending += 1
+		if len(self.batch) >= self.batchSize:
+			self.flush()
+		elif self.timer is None:
+			self.timer = self.loop.call_later(self.batchDelay, self.flush)
+		if self.pending >= self.maxPending and not self.paused:
+			self.paused = True
+			for protocol in self.protocols:
+				protocol.pauseReading()
+		return future
+
+	""" Send the waiting requests to the executor as one batch """
+	def flush(self):
+		if self.timer is not None:
+			self.timer.cancel()
+			self.timer = None
+		if not self.batch:
+			return
+		batch = self.batch
+		self.batch = []
+		self.batches += 1
+		work = self.loop.run_in_executor(self.executor, generateBatch, [(text, backend) for text, backend, future in batch])
+		work.add_done_callback(lambda work: self.finish(batch, work))
+
+	def finish(self, batch, work):
+		if work.cancelled():
+			results = [(False, json.dumps('Move generation was cancelled'))] * len(batch)
+		elif work.exception() is not None:
+			results = [(False, json.dumps(str(work.exception())))] * len(batch)
+		else:
+			results = work.result()
+		for (text, backend, future), result in zip(batch, results):
+			if not future.done():
+				future.set_result(result)
+		self.pending -= len(batch)
+		if self.paused and self.pending <= self.maxPending // 2:
+			self.paused = False
+			for protocol in self.protocols:
+				protocol.resumeReading()
+
+
+if asyncio is not None:
+
+	class MoveProtocol(asyncio.Protocol):
+		""" One client connection, answers are written in request order """
+		def __init__(self, service):
+			self.service = service
+			self.buffer = b''
+			self.lines = deque()
+			self.answers = deque()
+			self.transport = None
+			self.readingPaused = False
+			self.writingPaused = False
+
+		def connection_made(self, transport):
+			self.transport = transport
+			self.service.protocols.add(self)
+			if self.service.paused:
+				self.pauseReading()
+
+		def connection_lost(self, error):
+			self.service.protocols.discard(self)
+			self.transport = None
+			self.lines.clear()
+
+		def pauseReading(self):
+			if self.transport is not None and not self.readingPaused:
+				self.readingPaused = True
+				self.transport.pause_reading()
+
+		""" Handle the lines kept while paused, then read again unless the connection is still held up """
+		def resumeReading(self):
+			self.process()
+			if self.transport is not None and self.readingPaused and not self.blocked():
+				self.readingPaused = False
+				self.transport.resume_reading()
+
+		""" Check if no request can be handled now, because the service or this connection's writes are paused """
+		def blocked(self):
+			return self.service.paused or self.writingPaused or bool(self.lines)
+
+		def pause_writing(self):
+			self.writingPaused = True
+			self.pauseReading()
+
+		def resume_writing(self):
+			self.writingPaused = False
+			self.resumeReading()
+
+		def data_received(self, data):
+			lines = (self.buffer + data).split(b'\n')
+			self.buffer = lines.pop()
+			if len(self.buffer) > MAX_LINE_LENGTH or any(len(line) > MAX_LINE_LENGTH for line in lines):
+				self.transport.close()
+				return
+			self.lines.extend(lines)
+			self.process()
+
+		""" Hand the complete lines to the service, stopping as soon as it or this connection's writes are paused """
+		def process(self):
+			lines = self.lines
+			while lines and self.transport is not None and not self.service.paused and not self.writingPaused:
+				line = lines.popleft()
+				if line.strip():
+					self.request(line)
+			if lines:
+				self.pauseReading()
+
+		def request(self, line):
+			requestId = None
+			try:
+				message = json.loads(line.decode('utf-8'))
+				requestId = message.get('id')
+				future = self.service.submit(message['fen'], message.get('backend'))
+			except Exception as error:
+				future = self.service.loop.create_future()
+				future.set_result((False, json.dumps('Bad request: %s' % error)))
+			self.answers.append((requestId, future))
+			future.add_done_callback(self.answer)
+
+		""" Write the answers that are ready, stopping at the first one still waiting """
+		def answer(self, future=None):
+			lines = []
+			while self.answers and self.answers[0][1].done():
+				requestId, future = self.answers.popleft()
+				ok, encoded = future.result()
+				lines.append('{"id": %s, "%s": %s}\n' % (json.dumps(requestId), 'moves' if ok else 'error', encoded))
+			if lines and self.transport is not None:
+				self.transport.write(''.join(lines).encode('utf-8'))
+
+
+"""
+Start the service on a TCP port, or a Unix socket if a path is given
+Returns (server, service), workers is the number of processes, all cores by default
+"""
+def startServer(loop, host='127.0.0.1', port=0, path=None, workers=None, executor=None,
+		batchSize=64, batchDelay=0.002, maxPending=4096):
+	if asyncio is None:
+		raise RuntimeError('The move service requires Python 3 and asyncio')
+	if executor is None:
+		executor = concurrent.futures.ProcessPoolExecutor(workers)
+	service = MoveService(loop, executor, batchSize, batchDelay, maxPending)
+	if path is not None:
+		create = loop.create_unix_server(lambda: MoveProtocol(service), path)
+	else:
+		create = loop.create_server(lambda: MoveProtocol(service), host, port)
+	server = loop.run_until_complete(create)
+	return server, service
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Move generation service, one JSON request per line')
+	parser.add_argument('--host', default='127.0.0.1')
+	parser.add_argument('--port', type=int, default=8765)
+	parser.add_argument('--unix', help='listen on a Unix socket at this path instead of a TCP port')
+	parser.add_argument('--workers', type=int, help='number of worker processes, all cores by default')
+	parser.add_argument('--batch-size', type=int, default=64, help='most positions sent to a worker at a time')
+	parser.add_argument('--batch-delay', type=float, default=0.002, help='longest wait in seconds for a batch to fill')
+	parser.add_argument('--max-pending', type=int, default=4096, help='requests waiting for moves before reading pauses')
+	args = parser.parse_args(argv)
+
+	loop = asyncio.new_event_loop()
+	server, service = startServer(loop, args.host, args.port, args.unix, args.workers,
+		batchSize=args.batch_size, batchDelay=args.batch_delay, maxPending=args.max_pending)
+	try:
+		loop.run_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.close()
+		service.executor.shutdown()
+		loop.close()
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,59 @@
+from chess import *
+from batch import *
+from test_bitboard import randomBoardInfo
+import random
+import unittest
+
+def randomPositions(count):
+	rand = random.Random(3)
+	return [(randomBoardInfo(rand, rand.randint(1, 16)), rand.random() < 0.5) for i in xrange(count)]
+
+class EncodeBoardTest(unittest.TestCase):
+
+	def test(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 4
+		boardInfo['P1'] = [King((0, 0)), Pawn((1, 1))]
+		boardInfo['P2'] = [Rook((3, 3))]
+		board = decodeBoard(encodeBoard(boardInfo))
+		self.assertTrue(isinstance(board, Board))
+		self.assertEqual(board['boardSize'], 4)
+		self.assertEqual([(str(piece), piece.position) for piece in board['P1']], [('K', (0, 0)), ('', (1, 1))])
+		self.assertEqual([(str(piece), piece.position) for piece in board['P2']], [('R', (3, 3))])
+
+class BatchMovesTest(unittest.TestCase):
+
+	def assertSameMoves(self, positions, results, backend=None):
+		self.assertEqual(len(results), len(positions))
+		for (boardInfo, isFirstPlayer), moves in zip(positions, results):
+			expected = getAllPossibleMoves(boardInfo, isFirstPlayer, backend)
+			self.assertEqual(list(map(str, moves)), list(map(str, expected)))
+			self.assertEqual([id(move.piece) for move in moves], [id(move.piece) for move in expected])
+
+	def test_InProcess(self):
+		positions = randomPositions(20)
+		self.assertSameMoves(positions, getBatchMoves(positions, workers=1))
+
+	def test_Pool(self):
+		positions = randomPositions(150)
+		self.assertSameMoves(positions, getBatchMoves(iter(positions), workers=2, chunkSize=4))
+		self.assertSameMoves(positions, getBatchMoves(positions, workers=2, chunkSize=8, backend='bitboard'), 'bitboard')
+		packed = getBatchMoves(positions, workers=2, chunkSize=8, packed=True)
+		self.assertTrue(isinstance(packed[0], PackedMoves))
+		self.assertSameMoves(positions, [list(moves) for moves in packed])
+
+	def test_LargeBoard(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 300
+		boardInfo['P1'] = [Rook((299, 299)), Knight((0, 0))]
+		boardInfo['P2'] = [Queen((150, 299))]
+		positions = [(boardInfo, True), (boardInfo, False)]
+		self.assertSameMoves(positions, getBatchMoves(positions, workers=2, chunkSize=1))
+		self.assertRaises(ValueError, getBatchMoves, positions, 2, 1, None, True)
+
+	def test_Errors(self):
+		self.assertRaises(ValueError, getBatchMoves, randomPositions(1), 2, 8, 'bitboard', True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+from chess import *
+from benchmark import *
+from perft import REFERENCE_COUNTS
+import sys
+import unittest
+
+class BenchmarkTest(unittest.TestCase):
+
+	def test_BatchPositions(self):
+		positions = batchPositions(['start8'], 2)
+		self.assertEqual(len(positions), REFERENCE_COUNTS['start8'][1])
+		self.assertTrue(all(isFirstPlayer for board, isFirstPlayer in positions))
+		self.assertEqual(len(batchPositions(['middlegame8'], 2, 100)), 100)
+		result = runBatch(positions)
+		self.assertEqual(result['positions'], len(positions))
+		self.assertEqual(result['moves'], REFERENCE_COUNTS['start8'][2])
+
+	def test_Compare(self):
+		arguments = ['--positions', 'middlegame8', '--depth', '2', '--plies', '1']
+		runs = [runInterpreter(sys.executable, arguments), runBenchmark(['middlegame8'], 2, plies=1)]
+		rows, failures = compareResults(runs)
+		self.assertEqual(failures, [])
+		self.assertEqual([(name, count) for name, count, rates in rows], [('middlegame8', 1849), ('batch', 1849)])
+		runs[1]['batch']['moves'] += 1
+		self.assertEqual(compareResults(runs)[1], ['batch'])
+		self.assertEqual(len(formatComparison(runs, rows).splitlines()), 3)
+
+if __name__ == '__main__':
+	unittest.main()
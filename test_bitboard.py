@@ -0,0 +1,88 @@
+from chess import *
+import bitboard
+import random
+import unittest
+
+def startingBoardInfo():
+	boardInfo = dict()
+	boardInfo['boardSize'] = 8
+	boardInfo['P1'] = [Pawn((i, 1)) for i in range(8)] + [Rook((0, 0)), Knight((1, 0)), Bishop((2, 0)), Queen((3, 0)),
+		King((4, 0)), Bishop((5, 0)), Knight((6, 0)), Rook((7, 0))]
+	boardInfo['P2'] = [Pawn((i, 6)) for i in range(8)] + [Rook((0, 7)), Knight((1, 7)), Bishop((2, 7)), Queen((3, 7)),
+		King((4, 7)), Bishop((5, 7)), Knight((6, 7)), Rook((7, 7))]
+	return boardInfo
+
+def randomBoardInfo(rand, pieceCount):
+	squares = rand.sample([(x, y) for x in range(8) for y in range(8)], pieceCount * 2)
+	pieceTypes = [King, Queen, Bishop, Knight, Rook, Pawn]
+	boardInfo = dict()
+	boardInfo['boardSize'] = 8
+	boardInfo['P1'] = [rand.choice(pieceTypes)(position) for position in squares[:pieceCount]]
+	boardInfo['P2'] = [rand.choice(pieceTypes)(position) for position in squares[pieceCount:]]
+	return boardInfo
+
+class BitboardTablesTest(unittest.TestCase):
+
+	def test_Jumps(self):
+		self.assertEqual(bin(bitboard.KNIGHT_ATTACKS[0]).count('1'), 2)
+		self.assertEqual(bin(bitboard.KNIGHT_ATTACKS[27]).count('1'), 8)
+		self.assertEqual(bin(bitboard.KING_ATTACKS[0]).count('1'), 3)
+		self.assertEqual(bin(bitboard.KING_ATTACKS[63]).count('1'), 3)
+
+	def test_SlidingAttacks(self):
+		self.assertEqual(bin(bitboard.slidingAttacks(0, bitboard.ROOK_DIRECTIONS, 0)).count('1'), 14)
+		# blocked on (0, 2) going up and (3, 0) going right
+		attacks = bitboard.slidingAttacks(0, bitboard.ROOK_DIRECTIONS, (1 << 16) | (1 << 3))
+		self.assertEqual(sorted(bitboard.POSITIONS[i] for i in range(64) if (attacks >> i) & 1),
+			[(0, 1), (0, 2), (1, 0), (2, 0), (3, 0)])
+
+class BitboardMovesTest(unittest.TestCase):
+
+	def assertSameMoves(self, boardInfo, isFirstPlayer):
+		self.assertEqual(sorted(map(str, getAllPossibleMoves(boardInfo, isFirstPlayer, backend='bitboard'))),
+			sorted(map(str, getAllPossibleMoves(boardInfo, isFirstPlayer))))
+
+	def test_StartingPosition(self):
+		boardInfo = startingBoardInfo()
+		self.assertEqual(len(getAllPossibleMoves(boardInfo, True, backend='bitboard')), 20)
+		self.assertSameMoves(boardInfo, True)
+		self.assertSameMoves(boardInfo, False)
+
+	def test_Pawns(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 8
+		boardInfo['P1'] = [Pawn((2, 1)), Pawn((5, 1)), Knight((5, 2))]
+		boardInfo['P2'] = [Pawn((2, 2)), Pawn((3, 2)), Pawn((6, 7)), Pawn((4, 0))]
+		self.assertSameMoves(boardInfo, True)
+		self.assertSameMoves(boardInfo, False)
+
+	def test_RandomPositions(self):
+		rand = random.Random(7)
+		for i in range(200):
+			boardInfo = randomBoardInfo(rand, rand.randint(1, 16))
+			self.assertSameMoves(boardInfo, True)
+			self.assertSameMoves(boardInfo, False)
+
+	def test_CustomPieces(self):
+		from test_chess import Nightrider, Wazir
+		boardInfo = dict()
+		boardInfo['boardSize'] = 8
+		boardInfo['P1'] = [Nightrider((0, 0)), Wazir((5, 5)), Pawn((4, 2))]
+		boardInfo['P2'] = [Nightrider((3, 6)), Wazir((7, 0)), Pawn((5, 4))]
+		self.assertSameMoves(boardInfo, True)
+		self.assertSameMoves(boardInfo, False)
+
+	def test_Errors(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 4
+		boardInfo['P1'] = [King((0, 0))]
+		boardInfo['P2'] = []
+		self.assertRaises(ValueError, getAllPossibleMoves, boardInfo, True, backend='bitboard')
+		boardInfo['boardSize'] = 8
+		boardInfo['P2'] = [King((8, 0))]
+		self.assertRaises(ValueError, getAllPossibleMoves, boardInfo, True, backend='bitboard')
+		self.assertRaises(ValueError, getAllPossibleMoves, boardInfo, True, backend='unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
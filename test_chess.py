@@ -1,4 +1,5 @@
 from chess import *
+import random
 import unittest
 
 """
@@ -102,7 +103,7 @@ class PieceSetPossiblePosition(unittest.TestCase):
 		boardInfo['P1'] = [p]
 		boardInfo['P2'] = []
 		possibles = [(1, 0)]
-		self.assertEqual(map(str, p.setPossiblePositions(possibles, boardInfo, True)), ['(1, 0)'])
+		self.assertEqual(list(map(str, p.setPossiblePositions(possibles, boardInfo, True))), ['(1, 0)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
@@ -110,7 +111,7 @@ class PieceSetPossiblePosition(unittest.TestCase):
 		boardInfo['P1'] = [p]
 		boardInfo['P2'] = []
 		possibles = [(4, 0)]
-		self.assertEqual(map(str, p.setPossiblePositions(possibles, boardInfo, True)), [])
+		self.assertEqual(list(map(str, p.setPossiblePositions(possibles, boardInfo, True))), [])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
@@ -120,7 +121,7 @@ class PieceSetPossiblePosition(unittest.TestCase):
 		boardInfo['P1'] = [k, q]
 		boardInfo['P2'] = [b]
 		possibles = [(1, 1), (2, 2), (3, 3)]
-		self.assertEqual(map(str, b.setPossiblePositions(possibles, boardInfo, False)), ['B(1, 1)', 'B(2, 2)', 'B(3, 3)'])
+		self.assertEqual(list(map(str, b.setPossiblePositions(possibles, boardInfo, False))), ['B(1, 1)', 'B(2, 2)', 'B(3, 3)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
@@ -130,7 +131,7 @@ class PieceSetPossiblePosition(unittest.TestCase):
 		boardInfo['P1'] = [k, q]
 		boardInfo['P2'] = [b]
 		possibles = [(2, 2), (3, 3), (4, 4)]
-		self.assertEqual(map(str, b.setPossiblePositions(possibles, boardInfo, False)), ['B(2, 2)', 'B(3, 3)'])
+		self.assertEqual(list(map(str, b.setPossiblePositions(possibles, boardInfo, False))), ['B(2, 2)', 'B(3, 3)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
@@ -140,7 +141,7 @@ class PieceSetPossiblePosition(unittest.TestCase):
 		boardInfo['P1'] = [k, q]
 		boardInfo['P2'] = [b]
 		possibles = [(2, 2), (3, 3), (4, 4)]
-		self.assertEqual(map(str, b.setPossiblePositions(possibles, boardInfo, False)), ['B(2, 2)'])
+		self.assertEqual(list(map(str, b.setPossiblePositions(possibles, boardInfo, False))), ['B(2, 2)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
@@ -150,7 +151,399 @@ class PieceSetPossiblePosition(unittest.TestCase):
 		boardInfo['P1'] = [k]
 		boardInfo['P2'] = [b, q]
 		possibles = [(2, 2), (3, 3), (4, 4)]
-		self.assertEqual(map(str, b.setPossiblePositions(possibles, boardInfo, False)), [])
+		self.assertEqual(list(map(str, b.setPossiblePositions(possibles, boardInfo, False))), [])
+
+class BoardTest(unittest.TestCase):
+
+	def test_Occupancy(self):
+		k = King((0, 0))
+		q = Queen((1, 0))
+		b = Bishop((2, 1))
+		board = Board(4, [k, q], [b])
+		self.assertEqual(board['boardSize'], 4)
+		self.assertEqual(board['P1'], [k, q])
+		self.assertTrue(board.pieceAt((1, 0), True) is q)
+		self.assertEqual(board.pieceAt((1, 0), False), None)
+		self.assertTrue(k.hasCollision((1, 0), board, True))
+		self.assertFalse(k.hasCollision((1, 0), board, False))
+		self.assertTrue(b.hasCollision((2, 1), board, False))
+
+	def test_MovePiece(self):
+		k = King((0, 0))
+		b = Bishop((2, 1))
+		board = Board(4, [k], [b])
+		board.movePiece(k, (0, 1), True)
+		self.assertEqual(k.position, (0, 1))
+		self.assertFalse(k.hasCollision((0, 0), board, True))
+		self.assertTrue(k.hasCollision((0, 1), board, True))
+
+		board.removePiece(b, False)
+		self.assertEqual(board['P2'], [])
+		self.assertFalse(k.hasCollision((2, 1), board, False))
+		board.addPiece(b, False)
+		self.assertTrue(k.hasCollision((2, 1), board, False))
+
+		board['P1'] = [Rook((3, 3))]
+		self.assertTrue(k.hasCollision((3, 3), board, True))
+		self.assertFalse(k.hasCollision((0, 1), board, True))
+
+	def test_SameMovesAsDict(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 8
+		boardInfo['P1'] = [Pawn((1, 1)), Rook((0, 0)), Knight((1, 0)), Bishop((2, 0)), Queen((3, 0)), King((4, 0))]
+		boardInfo['P2'] = [Pawn((1, 2)), Rook((0, 5)), Bishop((6, 3))]
+		board = Board.fromBoardInfo(boardInfo)
+		self.assertEqual(list(map(str, getAllPossibleMoves(board, True))), list(map(str, getAllPossibleMoves(boardInfo, True))))
+		self.assertEqual(list(map(str, getAllPossibleMoves(board, False))), list(map(str, getAllPossibleMoves(boardInfo, False))))
+
+class MoveTablesTest(unittest.TestCase):
+
+	def test_Rays(self):
+		tables = MoveTables(4)
+		rays = tables.getRaySet(ROOK_DIRECTIONS)
+		self.assertEqual(rays[(0, 0)], (((1, 0), (2, 0), (3, 0)), (), ((0, 1), (0, 2), (0, 3)), ()))
+		self.assertEqual(rays[(2, 1)][1], ((1, 1), (0, 1)))
+		self.assertTrue(tables.getRaySet(ROOK_DIRECTIONS) is rays)
+
+	def test_Jumps(self):
+		tables = MoveTables(4)
+		self.assertEqual(tables.getJumpSet(KNIGHT_OFFSETS)[(0, 0)], ((1, 2), (2, 1)))
+		self.assertEqual(tables.getJumpSet(KING_OFFSETS)[(3, 3)], ((2, 2), (2, 3), (3, 2)))
+
+	def test_Cache(self):
+		tables = getMoveTables(5)
+		self.assertTrue(getMoveTables(5) is tables)
+		self.assertEqual(tables.boardSize, 5)
+		for boardSize in xrange(100, 100 + TABLE_CACHE_SIZE):
+			getMoveTables(boardSize)
+		self.assertFalse(getMoveTables(5) is tables)
+		self.assertTrue(getMoveTables(100 + TABLE_CACHE_SIZE - 1) is getMoveTables(100 + TABLE_CACHE_SIZE - 1))
+
+class Nightrider(SlidingPiece):
+	directions = KNIGHT_OFFSETS
+
+	def __str__(self):
+		return 'NR'
+
+class Wazir(JumpingPiece):
+	offsets = ROOK_DIRECTIONS
+
+	def __str__(self):
+		return 'W'
+
+class Unfinished(Piece):
+
+	def __str__(self):
+		return 'U'
+
+class CustomPieceTest(unittest.TestCase):
+
+	def test_Unfinished(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 4
+		boardInfo['P1'] = [Unfinished((1, 1))]
+		boardInfo['P2'] = []
+		self.assertRaises(NotImplementedError, boardInfo['P1'][0].getPossibleMoves, boardInfo, True)
+		self.assertRaises(NotImplementedError, boardInfo['P1'][0].getPossiblePositions, boardInfo, True)
+		self.assertRaises(NotImplementedError, getAllPossibleMoves, boardInfo, True)
+
+	def test_Nightrider(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 8
+		boardInfo['P1'] = [Nightrider((0, 0)), Pawn((4, 2))]
+		boardInfo['P2'] = [Pawn((3, 6))]
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['NR(1, 2)', 'NR(2, 4)', 'NR(3, 6)', 'NR(2, 1)'])
+
+	def test_Wazir(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 4
+		boardInfo['P1'] = [Wazir((1, 1)), Pawn((1, 2))]
+		boardInfo['P2'] = [Pawn((0, 1))]
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['W(2, 1)', 'W(0, 1)', 'W(1, 0)'])
+
+class PackedMovesTest(unittest.TestCase):
+
+	def test_SquareIndex(self):
+		self.assertEqual(squareIndex((3, 2), 8), 19)
+		self.assertEqual(squarePosition(19, 8), (3, 2))
+		self.assertEqual(squarePosition(squareIndex((31, 30), 32), 32), (31, 30))
+
+	def test_SameMoves(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 8
+		boardInfo['P1'] = [Pawn((1, 1)), Rook((0, 0)), Knight((1, 0)), Bishop((2, 0)), Queen((3, 0)), King((4, 0))]
+		boardInfo['P2'] = [Pawn((2, 2)), Rook((0, 5))]
+		moves = getAllPossibleMoves(boardInfo, True, packed=True)
+		self.assertTrue(isinstance(moves, PackedMoves))
+		self.assertEqual(len(moves.data), 2 * len(moves))
+		self.assertEqual(list(map(str, moves)), list(map(str, getAllPossibleMoves(boardInfo, True))))
+		self.assertTrue(moves[0].piece is boardInfo['P1'][0])
+		self.assertEqual(str(moves[-1]), 'K(5, 1)')
+		self.assertRaises(IndexError, moves.__getitem__, len(moves))
+
+	def test_LargeBoard(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = PACKED_MAX_BOARD_SIZE + 1
+		boardInfo['P1'] = [Rook((PACKED_MAX_BOARD_SIZE, PACKED_MAX_BOARD_SIZE))]
+		boardInfo['P2'] = []
+		self.assertRaises(ValueError, getAllPossibleMoves, boardInfo, True, packed=True)
+
+	def test_Slots(self):
+		self.assertFalse(hasattr(King((0, 0)), '__dict__'))
+		self.assertFalse(hasattr(Pawn((0, 0)), '__dict__'))
+		self.assertFalse(hasattr(Move(King((0, 0)), (0, 1)), '__dict__'))
+
+class IterPossibleMovesTest(unittest.TestCase):
+
+	def test_SameMoves(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 8
+		boardInfo['P1'] = [Pawn((1, 1)), Rook((0, 0)), Knight((1, 0)), Bishop((2, 0)), Queen((3, 0)), King((4, 0))]
+		boardInfo['P2'] = [Pawn((2, 2)), Rook((0, 5))]
+		moves = iterPossibleMoves(boardInfo, True)
+		self.assertEqual(str(next(moves)), '(1, 2)')
+		self.assertEqual(['(1, 2)'] + list(map(str, moves)), list(map(str, getAllPossibleMoves(boardInfo, True))))
+		self.assertEqual(countPossibleMoves(boardInfo, True), len(getAllPossibleMoves(boardInfo, True)))
+		self.assertEqual(list(map(str, iterPossibleMoves(boardInfo, False))), list(map(str, getAllPossibleMoves(boardInfo, False))))
+
+	def test_HasAnyMove(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 4
+		boardInfo['P1'] = [Knight((0, 0)), Pawn((1, 2)), Queen((2, 1))]
+		boardInfo['P2'] = []
+		self.assertTrue(hasAnyMove(boardInfo, True))
+		self.assertFalse(hasAnyMove(boardInfo, False))
+		boardInfo['boardSize'] = 2
+		boardInfo['P1'] = [King((0, 0)), King((0, 1)), King((1, 0)), King((1, 1))]
+		self.assertFalse(hasAnyMove(boardInfo, True))
+
+	def test_FirstCapture(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 8
+		boardInfo['P1'] = [Pawn((1, 1)), Rook((0, 0))]
+		boardInfo['P2'] = [Bishop((0, 5))]
+		capture = firstCapture(boardInfo, True)
+		self.assertTrue(capture.piece is boardInfo['P1'][1])
+		self.assertEqual(capture.position, (0, 5))
+		self.assertTrue(isCapture(capture, boardInfo, True))
+		self.assertEqual(firstCapture(boardInfo, False), None)
+
+class PositionHashTest(unittest.TestCase):
+
+	def test_Hash(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 8
+		boardInfo['P1'] = [King((4, 0)), Rook((0, 0))]
+		boardInfo['P2'] = [King((4, 7))]
+		other = dict(boardInfo)
+		other['P1'] = [Rook((0, 0)), King((4, 0))]
+		self.assertEqual(positionHash(boardInfo, True), positionHash(other, True))
+		self.assertNotEqual(positionHash(boardInfo, True), positionHash(boardInfo, False))
+		other['P1'] = [Rook((0, 0)), Queen((4, 0))]
+		self.assertNotEqual(positionHash(boardInfo, True), positionHash(other, True))
+		other = dict(boardInfo)
+		other['boardSize'] = 9
+		self.assertNotEqual(positionHash(boardInfo, True), positionHash(other, True))
+		other = dict(boardInfo)
+		other['P1'], other['P2'] = boardInfo['P2'], boardInfo['P1']
+		self.assertNotEqual(positionHash(boardInfo, True), positionHash(other, True))
+
+	def test_Incremental(self):
+		k = King((4, 0))
+		r = Rook((0, 0))
+		b = Bishop((2, 2))
+		board = Board(8, [k, r], [King((4, 7)), b])
+		self.assertEqual(board.positionHash(True), positionHash(dict(board), True))
+		board.movePiece(r, (0, 5), True)
+		board.removePiece(b, False)
+		self.assertEqual(board.positionHash(False), positionHash(dict(board), False))
+		board.addPiece(b, False)
+		board.movePiece(r, (0, 0), True)
+		self.assertEqual(positionHash(board, True), positionHash(Board(8, [k, r], [King((4, 7)), b]), True))
+
+	def test_PawnHash(self):
+		p = Pawn((1, 1))
+		q = Pawn((2, 6))
+		r = Rook((0, 0))
+		board = Board(8, [p, r], [King((4, 7)), q])
+		pawnHash = board.pawnHash()
+		board.movePiece(r, (0, 5), True)
+		self.assertEqual(board.pawnHash(), pawnHash)
+		board.movePiece(p, (1, 3), True)
+		board.removePiece(q, False)
+		self.assertNotEqual(board.pawnHash(), pawnHash)
+		self.assertEqual(board.pawnHash(), Board(8, [p], []).pawnHash())
+		board.addPiece(q, False)
+		board.movePiece(p, (1, 1), True)
+		self.assertEqual(board.pawnHash(), pawnHash)
+		self.assertNotEqual(Board(16, [p], [q]).pawnHash(), pawnHash)
+
+class MoveCacheTest(unittest.TestCase):
+
+	def test_Cache(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 8
+		boardInfo['P1'] = [Pawn((1, 1)), Rook((0, 0)), Knight((1, 0))]
+		boardInfo['P2'] = [King((4, 7))]
+		cache = MoveCache(2)
+		expected = list(map(str, getAllPossibleMoves(boardInfo, True)))
+		self.assertEqual(list(map(str, cache.getAllPossibleMoves(boardInfo, True))), expected)
+		self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+		other = Board(8, [Pawn((1, 1)), Rook((0, 0)), Knight((1, 0))], [King((4, 7))])
+		moves = cache.getAllPossibleMoves(other, True)
+		self.assertEqual(list(map(str, moves)), expected)
+		self.assertTrue(moves[0].piece is other['P1'][0])
+		self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+		cache.getAllPossibleMoves(boardInfo, False)
+		cache.getAllPossibleMoves(Board(8, [Pawn((i, 1)) for i in xrange(8)], []), True)
+		self.assertEqual(len(cache), 2)
+		cache.getAllPossibleMoves(boardInfo, True)
+		self.assertEqual((cache.hits, cache.misses), (1, 4))
+		cache.clear()
+		self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+
+class MakeMoveTest(unittest.TestCase):
+
+	def checkMakeUnmake(self, boardInfo):
+		rook, king = boardInfo['P1']
+		bishop = boardInfo['P2'][1]
+		undo = makeMove(boardInfo, Move(rook, (0, 3)), True)
+		self.assertEqual(rook.position, (0, 3))
+		self.assertEqual(len(boardInfo['P2']), 2)
+		self.assertEqual(undo, (rook, (0, 0), None, -1, True))
+
+		undo = makeMove(boardInfo, Move(bishop, (0, 3)), False)
+		self.assertEqual(undo, (bishop, (2, 1), rook, 0, False))
+		self.assertEqual(boardInfo['P1'], [king])
+		self.assertFalse(bishop.hasCollision((0, 3), boardInfo, True))
+		self.assertTrue(bishop.hasCollision((0, 3), boardInfo, False))
+
+		unmakeMove(boardInfo, undo)
+		self.assertEqual(boardInfo['P1'], [rook, king])
+		self.assertEqual(bishop.position, (2, 1))
+		self.assertTrue(bishop.hasCollision((0, 3), boardInfo, True))
+
+	def test_Dict(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 4
+		boardInfo['P1'] = [Rook((0, 0)), King((3, 0))]
+		boardInfo['P2'] = [King((3, 3)), Bishop((2, 1))]
+		self.checkMakeUnmake(boardInfo)
+
+	def test_Board(self):
+		board = Board(4, [Rook((0, 0)), King((3, 0))], [King((3, 3)), Bishop((2, 1))])
+		boardHash = board.positionHash(True)
+		self.checkMakeUnmake(board)
+		unmakeMove(board, (board['P1'][0], (0, 0), None, -1, True))
+		self.assertEqual(board.positionHash(True), boardHash)
+		self.assertEqual(board.pieceAt((0, 0), True), board['P1'][0])
+
+class AttackTest(unittest.TestCase):
+
+	""" Attacked positions found by placing an enemy piece on every position and generating moves """
+	def bruteForceAttacks(self, boardInfo, byFirstPlayer):
+		attacked = set()
+		attackerKey, defenderKey = ('P1', 'P2') if byFirstPlayer else ('P2', 'P1')
+		for x in xrange(boardInfo['boardSize']):
+			for y in xrange(boardInfo['boardSize']):
+				trial = dict()
+				trial['boardSize'] = boardInfo['boardSize']
+				trial[attackerKey] = [piece for piece in boardInfo[attackerKey] if piece.position != (x, y)]
+				trial[defenderKey] = [piece for piece in boardInfo[defenderKey] if piece.position != (x, y)] + [King((x, y))]
+				if (x, y) in [move.position for move in getAllPossibleMoves(trial, byFirstPlayer)]:
+					attacked.add((x, y))
+		return attacked
+
+	def test_AgainstMoveGeneration(self):
+		rand = random.Random(13)
+		pieceTypes = [King, Queen, Bishop, Knight, Rook, Pawn, Nightrider, Wazir]
+		for i in xrange(40):
+			boardSize = rand.choice([4, 6, 8])
+			squares = rand.sample([(x, y) for x in xrange(boardSize) for y in xrange(boardSize)], boardSize * 2)
+			boardInfo = dict()
+			boardInfo['boardSize'] = boardSize
+			boardInfo['P1'] = [rand.choice(pieceTypes)(position) for position in squares[:boardSize]]
+			boardInfo['P2'] = [rand.choice(pieceTypes)(position) for position in squares[boardSize:]]
+			for byFirstPlayer in [True, False]:
+				expected = self.bruteForceAttacks(boardInfo, byFirstPlayer)
+				self.assertEqual(set(attackMap(boardInfo, byFirstPlayer)), expected)
+				board = Board.fromBoardInfo(boardInfo)
+				for x in xrange(boardSize):
+					for y in xrange(boardSize):
+						self.assertEqual(isSquareAttacked(board, (x, y), byFirstPlayer), (x, y) in expected)
+
+	def test_Captures(self):
+		rand = random.Random(17)
+		pieceTypes = [King, Queen, Bishop, Knight, Rook, Pawn, Nightrider, Wazir]
+		for i in xrange(40):
+			boardSize = rand.choice([4, 6, 8])
+			squares = rand.sample([(x, y) for x in xrange(boardSize) for y in xrange(boardSize)], boardSize * 2)
+			boardInfo = dict()
+			boardInfo['boardSize'] = boardSize
+			boardInfo['P1'] = [rand.choice(pieceTypes)(position) for position in squares[:boardSize]]
+			boardInfo['P2'] = [rand.choice(pieceTypes)(position) for position in squares[boardSize:]]
+			for isFirstPlayer in [True, False]:
+				enemy = set(piece.position for piece in boardInfo['P2' if isFirstPlayer else 'P1'])
+				for board in [boardInfo, Board.fromBoardInfo(boardInfo)]:
+					for piece in board['P1' if isFirstPlayer else 'P2']:
+						self.assertEqual(piece.getCapturePositions(board, isFirstPlayer),
+							[position for position in piece.getPossiblePositions(board, isFirstPlayer) if position in enemy])
+
+	def test_LegalMovesPawnBlocker(self):
+		# taking the knight in front of the pawn frees its double push onto the king
+		board = Board(6, [Pawn((0, 1)), Knight((0, 2))], [King((0, 3)), Rook((1, 2))])
+		self.assertFalse(isInCheck(board, False))
+		moves = getLegalMoves(board, False)
+		self.assertFalse(((1, 2), (0, 2)) in [(move.piece.position, move.position) for move in moves])
+		for move in moves:
+			undo = makeMove(board, move, False)
+			self.assertFalse(isInCheck(board, False))
+			unmakeMove(board, undo)
+
+	def test_AttackMapCounts(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 4
+		boardInfo['P1'] = [Rook((0, 0)), Knight((2, 0))]
+		boardInfo['P2'] = [King((3, 3))]
+		attacked = attackMap(boardInfo, True)
+		self.assertEqual(attacked[(0, 1)], 2)
+		self.assertEqual(attacked[(2, 0)], 1)
+		self.assertFalse((3, 0) in attacked)
+
+	def test_LegalMoves(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 8
+		boardInfo['P1'] = [King((4, 0)), Bishop((4, 1))]
+		boardInfo['P2'] = [Rook((4, 7)), King((0, 7))]
+		self.assertFalse(isInCheck(boardInfo, True))
+		moves = getLegalMoves(boardInfo, True)
+		self.assertEqual(list(map(str, moves)), ['K(3, 0)', 'K(3, 1)', 'K(5, 0)', 'K(5, 1)'])
+		self.assertEqual([piece.position for piece in boardInfo['P1']], [(4, 0), (4, 1)])
+
+		boardInfo['P1'] = [King((4, 0)), Rook((0, 1))]
+		self.assertTrue(isInCheck(boardInfo, True))
+		self.assertEqual(list(map(str, getLegalMoves(Board.fromBoardInfo(boardInfo), True))), ['K(3, 0)', 'K(3, 1)', 'K(5, 0)', 'K(5, 1)', 'R(4, 1)'])
+
+		boardInfo['P1'] = [Rook((0, 1))]
+		self.assertEqual(len(getLegalMoves(boardInfo, True)), len(getAllPossibleMoves(boardInfo, True)))
+
+	def test_LegalMovesAgainstCheckTest(self):
+		rand = random.Random(17)
+		pieceTypes = [Queen, Bishop, Knight, Rook, Pawn, Nightrider]
+		for i in xrange(100):
+			squares = rand.sample([(x, y) for x in xrange(8) for y in xrange(8)], 14)
+			board = Board(8, [King(squares[0])] + [rand.choice(pieceTypes)(position) for position in squares[2:8]],
+				[King(squares[1])] + [rand.choice(pieceTypes)(position) for position in squares[8:]])
+			for isFirstPlayer in [True, False]:
+				expected = []
+				for move in getAllPossibleMoves(board, isFirstPlayer):
+					undo = makeMove(board, move, isFirstPlayer)
+					if not isInCheck(board, isFirstPlayer):
+						expected.append((move.piece, move.position))
+					unmakeMove(board, undo)
+				self.assertEqual([(move.piece, move.position) for move in getLegalMoves(board, isFirstPlayer)], expected)
 
 class PossibleMovesTest(unittest.TestCase):
 
@@ -159,25 +552,25 @@ class PossibleMovesTest(unittest.TestCase):
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [King((0, 0))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['K(0, 1)', 'K(1, 0)', 'K(1, 1)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['K(0, 1)', 'K(1, 0)', 'K(1, 1)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [King((1, 1))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['K(0, 0)', 'K(0, 1)', 'K(0, 2)', 'K(1, 0)', 'K(1, 2)', 'K(2, 0)', 'K(2, 1)', 'K(2, 2)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['K(0, 0)', 'K(0, 1)', 'K(0, 2)', 'K(1, 0)', 'K(1, 2)', 'K(2, 0)', 'K(2, 1)', 'K(2, 2)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [King((1, 1)), Queen((1, 2))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['K(0, 0)', 'K(0, 1)', 'K(0, 2)', 'K(1, 0)', 'K(2, 0)', 'K(2, 1)', 'K(2, 2)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['K(0, 0)', 'K(0, 1)', 'K(0, 2)', 'K(1, 0)', 'K(2, 0)', 'K(2, 1)', 'K(2, 2)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [King((1, 1))]
 		boardInfo['P2'] = [Queen((1, 2))]
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['K(0, 0)', 'K(0, 1)', 'K(0, 2)', 'K(1, 0)', 'K(1, 2)', 'K(2, 0)', 'K(2, 1)', 'K(2, 2)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['K(0, 0)', 'K(0, 1)', 'K(0, 2)', 'K(1, 0)', 'K(1, 2)', 'K(2, 0)', 'K(2, 1)', 'K(2, 2)'])
 
 
 	def test_Bishop(self):
@@ -185,143 +578,144 @@ class PossibleMovesTest(unittest.TestCase):
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Bishop((0, 0))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['B(1, 1)', 'B(2, 2)', 'B(3, 3)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['B(1, 1)', 'B(2, 2)', 'B(3, 3)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 8
 		boardInfo['P1'] = [Bishop((4, 4))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['B(5, 5)', 'B(6, 6)', 'B(7, 7)', 'B(3, 5)', 'B(2, 6)', 'B(1, 7)', 'B(5, 3)', 'B(6, 2)', 'B(7, 1)', 'B(3, 3)', 'B(2, 2)', 'B(1, 1)', 'B(0, 0)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['B(5, 5)', 'B(6, 6)', 'B(7, 7)', 'B(3, 5)', 'B(2, 6)', 'B(1, 7)', 'B(5, 3)', 'B(6, 2)', 'B(7, 1)', 'B(3, 3)', 'B(2, 2)', 'B(1, 1)', 'B(0, 0)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 8
 		boardInfo['P1'] = [Queen((3, 3))]
 		boardInfo['P2'] = [Bishop((4, 4)), Pawn((6, 2))]
-		self.assertEqual(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False)), ['B(5, 5)', 'B(6, 6)', 'B(7, 7)', 'B(3, 5)', 'B(2, 6)', 'B(1, 7)', 'B(5, 3)', 'B(3, 3)'])
+		self.assertEqual(list(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False))), ['B(5, 5)', 'B(6, 6)', 'B(7, 7)', 'B(3, 5)', 'B(2, 6)', 'B(1, 7)', 'B(5, 3)', 'B(3, 3)'])
 
 	def test_Rook(self):
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Rook((0, 0))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['R(1, 0)', 'R(2, 0)', 'R(3, 0)', 'R(0, 1)', 'R(0, 2)', 'R(0, 3)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['R(1, 0)', 'R(2, 0)', 'R(3, 0)', 'R(0, 1)', 'R(0, 2)', 'R(0, 3)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Rook((0, 0))]
 		boardInfo['P2'] = [King((0, 1))]
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['R(1, 0)', 'R(2, 0)', 'R(3, 0)', 'R(0, 1)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['R(1, 0)', 'R(2, 0)', 'R(3, 0)', 'R(0, 1)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 8
 		boardInfo['P1'] = [Rook((4, 4))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['R(5, 4)', 'R(6, 4)', 'R(7, 4)', 'R(3, 4)', 'R(2, 4)', 'R(1, 4)', 'R(0, 4)', 'R(4, 5)', 'R(4, 6)', 'R(4, 7)', 'R(4, 3)', 'R(4, 2)', 'R(4, 1)', 'R(4, 0)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['R(5, 4)', 'R(6, 4)', 'R(7, 4)', 'R(3, 4)', 'R(2, 4)', 'R(1, 4)', 'R(0, 4)', 'R(4, 5)', 'R(4, 6)', 'R(4, 7)', 'R(4, 3)', 'R(4, 2)', 'R(4, 1)', 'R(4, 0)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 8
 		boardInfo['P1'] = [Rook((5, 4))]
 		boardInfo['P2'] = [Rook((4, 4)), Rook((4, 3))]
-		self.assertEqual(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False)), ['R(5, 4)', 'R(3, 4)', 'R(2, 4)', 'R(1, 4)', 'R(0, 4)', 'R(4, 5)', 'R(4, 6)', 'R(4, 7)'])
+		self.assertEqual(list(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False))), ['R(5, 4)', 'R(3, 4)', 'R(2, 4)', 'R(1, 4)', 'R(0, 4)', 'R(4, 5)', 'R(4, 6)', 'R(4, 7)'])
 
 	def test_Queen(self):
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Queen((0, 0))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['Q(1, 1)', 'Q(2, 2)', 'Q(3, 3)', 'Q(1, 0)', 'Q(2, 0)', 'Q(3, 0)', 'Q(0, 1)', 'Q(0, 2)', 'Q(0, 3)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['Q(1, 1)', 'Q(2, 2)', 'Q(3, 3)', 'Q(1, 0)', 'Q(2, 0)', 'Q(3, 0)', 'Q(0, 1)', 'Q(0, 2)', 'Q(0, 3)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Queen((0, 0)), King((1, 1))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['Q(1, 0)', 'Q(2, 0)', 'Q(3, 0)', 'Q(0, 1)', 'Q(0, 2)', 'Q(0, 3)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['Q(1, 0)', 'Q(2, 0)', 'Q(3, 0)', 'Q(0, 1)', 'Q(0, 2)', 'Q(0, 3)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [King((1, 1))]
 		boardInfo['P2'] = [Queen((0, 0))]
-		self.assertEqual(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False)), ['Q(1, 1)', 'Q(1, 0)', 'Q(2, 0)', 'Q(3, 0)', 'Q(0, 1)', 'Q(0, 2)', 'Q(0, 3)'])
+		self.assertEqual(list(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False))), ['Q(1, 1)', 'Q(1, 0)', 'Q(2, 0)', 'Q(3, 0)', 'Q(0, 1)', 'Q(0, 2)', 'Q(0, 3)'])
 
 	def test_Knight(self):
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Knight((0, 0))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['N(1, 2)', 'N(2, 1)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['N(1, 2)', 'N(2, 1)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Knight((0, 0)), Pawn((1, 2))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['N(2, 1)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['N(2, 1)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Knight((0, 0)), Pawn((1, 2)), Queen((2, 1))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), [])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), [])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Pawn((1, 2)), Queen((2, 1))]
 		boardInfo['P2'] = [Knight((0, 0))]
-		self.assertEqual(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False)), ['N(1, 2)', 'N(2, 1)'])
+		self.assertEqual(list(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False))), ['N(1, 2)', 'N(2, 1)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 16
 		boardInfo['P1'] = [Knight((4, 4))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['N(5, 6)', 'N(6, 5)', 'N(5, 2)', 'N(6, 3)', 'N(3, 6)', 'N(2, 5)', 'N(3, 2)', 'N(2, 3)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['N(5, 6)', 'N(6, 5)', 'N(5, 2)', 'N(6, 3)', 'N(3, 6)', 'N(2, 5)', 'N(3, 2)', 'N(2, 3)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 16
 		boardInfo['P1'] = [Knight((4, 4)), Pawn((3, 2)), Queen((2, 3))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['N(5, 6)', 'N(6, 5)', 'N(5, 2)', 'N(6, 3)', 'N(3, 6)', 'N(2, 5)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['N(5, 6)', 'N(6, 5)', 'N(5, 2)', 'N(6, 3)', 'N(3, 6)', 'N(2, 5)'])
 
 	def test_Pawn(self):
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Pawn((0, 0))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['(0, 1)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['(0, 1)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Pawn((0, 1))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['(0, 2)', '(0, 3)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['(0, 2)', '(0, 3)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = []
 		boardInfo['P2'] = [Pawn((3, 3))]
-		self.assertEqual(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False)), ['(3, 2)'])	
+		self.assertEqual(list(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False))), ['(3, 2)'])	
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Pawn((2, 2))]
 		boardInfo['P2'] = [Pawn((3, 3))]
-		self.assertEqual(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False)), ['(3, 2)', '(2, 2)'])
+		self.assertEqual(list(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False))), ['(3, 2)', '(2, 2)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Pawn((4, 2))]
 		boardInfo['P2'] = [Pawn((3, 3))]
-		self.assertEqual(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False)), ['(3, 2)', '(4, 2)'])
+		self.assertEqual(list(map(str, boardInfo['P2'][0].getPossibleMoves(boardInfo, False))), ['(3, 2)', '(4, 2)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Pawn((2, 2))]
 		boardInfo['P2'] = [Pawn((3, 3))]
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['(2, 3)', '(3, 3)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['(2, 3)', '(3, 3)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Pawn((2, 2))]
 		boardInfo['P2'] = [Pawn((1, 3)), Pawn((3, 3))]
-		self.assertEqual(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True)), ['(2, 3)', '(3, 3)', '(1, 3)'])
+		self.assertEqual(list(map(str, boardInfo['P1'][0].getPossibleMoves(boardInfo, True))), ['(2, 3)', '(3, 3)', '(1, 3)'])
+		self.assertTrue(all(isinstance(move, Move) for move in boardInfo['P1'][0].getPossibleMoves(boardInfo, True)))
 
 class AllPossibleMovesTest(unittest.TestCase):
 	def test(self):
@@ -329,26 +723,26 @@ class AllPossibleMovesTest(unittest.TestCase):
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Pawn((0, 0))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, getAllPossibleMoves(boardInfo, True)), ['(0, 1)'])
+		self.assertEqual(list(map(str, getAllPossibleMoves(boardInfo, True))), ['(0, 1)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 4
 		boardInfo['P1'] = [Pawn((0, 1)), Knight((0, 0))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, getAllPossibleMoves(boardInfo, True)), ['(0, 2)', '(0, 3)', 'N(1, 2)', 'N(2, 1)'])
+		self.assertEqual(list(map(str, getAllPossibleMoves(boardInfo, True))), ['(0, 2)', '(0, 3)', 'N(1, 2)', 'N(2, 1)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 8
 		boardInfo['P1'] = [Pawn((1, 1)), Rook((0, 0)), Knight((1, 0)), Bishop((2, 0)), Queen((3, 0)), King((4, 0))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, getAllPossibleMoves(boardInfo, True)), ['(1, 2)', '(1, 3)', 'R(0, 1)', 'R(0, 2)', 'R(0, 3)', 'R(0, 4)', 'R(0, 5)', 'R(0, 6)', 'R(0, 7)', 'N(2, 2)', 'N(3, 1)', 'N(0, 2)', 'B(3, 1)', 'B(4, 2)', 'B(5, 3)', 'B(6, 4)', 'B(7, 5)', 'Q(4, 1)', 'Q(5, 2)', 'Q(6, 3)', 'Q(7, 4)', 'Q(2, 1)', 'Q(1, 2)', 'Q(0, 3)', 'Q(3, 1)', 'Q(3, 2)', 'Q(3, 3)', 'Q(3, 4)', 'Q(3, 5)', 'Q(3, 6)', 'Q(3, 7)', 'K(3, 1)', 'K(4, 1)', 'K(5, 0)', 'K(5, 1)'])
+		self.assertEqual(list(map(str, getAllPossibleMoves(boardInfo, True))), ['(1, 2)', '(1, 3)', 'R(0, 1)', 'R(0, 2)', 'R(0, 3)', 'R(0, 4)', 'R(0, 5)', 'R(0, 6)', 'R(0, 7)', 'N(2, 2)', 'N(3, 1)', 'N(0, 2)', 'B(3, 1)', 'B(4, 2)', 'B(5, 3)', 'B(6, 4)', 'B(7, 5)', 'Q(4, 1)', 'Q(5, 2)', 'Q(6, 3)', 'Q(7, 4)', 'Q(2, 1)', 'Q(1, 2)', 'Q(0, 3)', 'Q(3, 1)', 'Q(3, 2)', 'Q(3, 3)', 'Q(3, 4)', 'Q(3, 5)', 'Q(3, 6)', 'Q(3, 7)', 'K(3, 1)', 'K(4, 1)', 'K(5, 0)', 'K(5, 1)'])
 
 		boardInfo = dict()
 		boardInfo['boardSize'] = 8
 		boardInfo['P1'] = [Pawn((0, 1)), Pawn((1, 1)), Pawn((2, 1)), Pawn((3, 1)), Pawn((4, 1)), Pawn((5, 1)), Pawn((6, 1)), Pawn((7, 1)),
 							Rook((0, 0)), Knight((1, 0)), Bishop((2, 0)), Queen((3, 0)), King((4, 0)), Bishop((5, 0)), Knight((6, 0)), Rook((7, 0))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, getAllPossibleMoves(boardInfo, True)), ['(0, 2)', '(0, 3)', '(1, 2)', '(1, 3)', '(2, 2)', '(2, 3)', '(3, 2)', '(3, 3)', '(4, 2)', '(4, 3)',
+		self.assertEqual(list(map(str, getAllPossibleMoves(boardInfo, True))), ['(0, 2)', '(0, 3)', '(1, 2)', '(1, 3)', '(2, 2)', '(2, 3)', '(3, 2)', '(3, 3)', '(4, 2)', '(4, 3)',
 			'(5, 2)', '(5, 3)', '(6, 2)', '(6, 3)', '(7, 2)', '(7, 3)', 'N(2, 2)', 'N(0, 2)', 'N(7, 2)', 'N(5, 2)'])
 
 		boardInfo = dict()
@@ -356,7 +750,7 @@ class AllPossibleMovesTest(unittest.TestCase):
 		boardInfo['P1'] = [Pawn((0, 1)), Pawn((1, 1)), Pawn((2, 1)), Pawn((3, 1)), Pawn((4, 1)), Pawn((5, 1)), Pawn((6, 1)), Pawn((7, 1)),
 							Rook((0, 0)), Knight((1, 0)), Bishop((2, 0)), Queen((3, 0)), King((4, 0)), Bishop((5, 0)), Knight((6, 0)), Rook((7, 0))]
 		boardInfo['P2'] = []
-		self.assertEqual(map(str, getAllPossibleMoves(boardInfo, False)), [])
+		self.assertEqual(list(map(str, getAllPossibleMoves(boardInfo, False))), [])
 
 
 
@@ -0,0 +1,68 @@
+from cli import *
+try:
+	from StringIO import StringIO
+except ImportError:
+	from io import StringIO
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+START = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w'
+CORNER = '8/8/8/8/8/8/8/K6k w'
+
+class RunTest(unittest.TestCase):
+
+	def test_Lines(self):
+		output = StringIO()
+		timings = StringIO()
+		self.assertEqual(run([START + '\n', '\n', '3/3/2\n', CORNER], output, timings=timings), (3, 1))
+		lines = output.getvalue().split('\n')
+		self.assertEqual(len(lines[0].split(' ')), 20)
+		self.assertTrue(lines[1].startswith('error: '))
+		self.assertEqual(sorted(lines[2].split(' ')), ['K0,0-0,1', 'K0,0-1,0', 'K0,0-1,1'])
+		self.assertEqual(len(timings.getvalue().split('\n')), 4)
+
+	def test_Backend(self):
+		self.assertEqual(answer(START, 'bitboard')[1].count(' '), 19)
+		self.assertFalse(answer(START, 'unknown')[0])
+
+class MainTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def test_Files(self):
+		path = os.path.join(self.directory, 'positions.fen')
+		with open(path, 'w') as positionFile:
+			positionFile.write(START + '\n' + CORNER + '\n')
+		stdout = StringIO()
+		stderr = StringIO()
+		self.assertEqual(main(['-t', '--backend', 'bitboard', path, '-'], StringIO(CORNER + '\n'), stdout, stderr), 0)
+		self.assertEqual(len(stdout.getvalue().split('\n')), 4)
+		self.assertTrue(stderr.getvalue().startswith('startup '))
+		self.assertEqual(main(['-x'], StringIO(), StringIO(), stderr), 2)
+		self.assertEqual(main([], StringIO('x\n'), StringIO(), StringIO()), 1)
+
+	def test_Worker(self):
+		# each answer has to come back before the next position is sent
+		worker = subprocess.Popen([sys.executable, 'cli.py', '--worker'], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+			cwd=os.path.dirname(os.path.abspath(__file__)))
+		try:
+			for text, count in [(START, 20), (CORNER, 3), (START, 20)]:
+				worker.stdin.write((text + '\n').encode('ascii'))
+				worker.stdin.flush()
+				self.assertEqual(len(worker.stdout.readline().split()), count)
+		finally:
+			worker.stdin.close()
+			self.assertEqual(worker.wait(), 0)
+			worker.stdout.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
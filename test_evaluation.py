@@ -0,0 +1,66 @@
+from chess import *
+from evaluation import *
+from search import Search
+from perft import middlegameBoardInfo, standardBoardInfo
+from test_chess import Wazir
+import random
+import unittest
+
+class PieceSquareTablesTest(unittest.TestCase):
+
+	def test_Default(self):
+		tables = PieceSquareTables()
+		knight = tables.getTable(Knight, True, 8)
+		self.assertEqual(knight[(0, 0)], 0)
+		self.assertEqual(knight[(3, 3)], knight[(4, 4)])
+		self.assertTrue(knight[(3, 3)] > knight[(1, 1)] > 0)
+		pawn = tables.getTable(Pawn, True, 8)
+		self.assertEqual(pawn[(2, 1)], 0)
+		self.assertEqual(pawn[(2, 7)], 60)
+		self.assertEqual(tables.getTable(Pawn, False, 8)[(2, 0)], 60)
+		self.assertTrue(tables.getTable(Rook, True, 8) is None)
+
+	def test_Custom(self):
+		tables = PieceSquareTables({Rook: lambda x, y, boardSize: x, Wazir: [[1, 2], [3, 4]]})
+		self.assertEqual(tables.getTable(Rook, True, 8)[(5, 0)], 5)
+		self.assertEqual(tables.getTable(Wazir, True, 2)[(1, 0)], 2)
+		self.assertEqual(tables.getTable(Wazir, False, 2)[(1, 0)], 4)
+		self.assertTrue(tables.getTable(Wazir, True, 3) is None)
+		self.assertRaises(ValueError, tables.setTable, Wazir, [[1, 2], [3]])
+
+class IncrementalEvaluationTest(unittest.TestCase):
+
+	def test_RandomGames(self):
+		rand = random.Random(4)
+		evaluation = IncrementalEvaluation()
+		for boardInfo in [standardBoardInfo(8), middlegameBoardInfo(), standardBoardInfo(12)]:
+			board = Board.fromBoardInfo(boardInfo)
+			evaluation.reset(board)
+			start = evaluation(board, True)
+			undos = []
+			isFirstPlayer = True
+			for i in xrange(60):
+				moves = getAllPossibleMoves(board, isFirstPlayer)
+				if not moves:
+					break
+				undos.append(evaluation.makeMove(board, rand.choice(moves), isFirstPlayer))
+				isFirstPlayer = not isFirstPlayer
+				self.assertEqual(evaluation(board, True), evaluation.boardScore(board))
+				self.assertEqual(evaluation(board, False), -evaluation.boardScore(board))
+			while undos:
+				evaluation.unmakeMove(board, undos.pop())
+			self.assertEqual(evaluation(board, True), start)
+
+	def test_Search(self):
+		class FullEvaluation(IncrementalEvaluation):
+			""" Same scores computed from every piece at each call """
+			def __call__(self, boardInfo, isFirstPlayer):
+				score = self.boardScore(boardInfo)
+				return score if isFirstPlayer else -score
+		full = Search(FullEvaluation()).search(middlegameBoardInfo(), True, maxDepth=2)
+		incremental = Search(IncrementalEvaluation()).search(middlegameBoardInfo(), True, maxDepth=2)
+		self.assertEqual((str(incremental.move), incremental.score, incremental.nodes), (str(full.move), full.score, full.nodes))
+
+
+if __name__ == '__main__':
+    unittest.main()
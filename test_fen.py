@@ -0,0 +1,83 @@
+from chess import *
+from fen import *
+from perft import middlegameBoardInfo, standardBoardInfo
+from test_chess import Wazir
+try:
+	from StringIO import StringIO
+except ImportError:
+	from io import StringIO
+import unittest
+
+START = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+class ParseFenTest(unittest.TestCase):
+
+	def test_Start(self):
+		board, isFirstPlayer = parseFen(START)
+		self.assertTrue(isFirstPlayer)
+		self.assertEqual(board['boardSize'], 8)
+		expected = standardBoardInfo(8)
+		for key in ['P1', 'P2']:
+			self.assertEqual(sorted((piece.position, str(piece)) for piece in board[key]),
+				sorted((piece.position, str(piece)) for piece in expected[key]))
+		self.assertEqual(len(getAllPossibleMoves(board, True)), 20)
+
+	def test_LargeBoard(self):
+		board, isFirstPlayer = parseFen('k11/12/12/12/12/12/12/12/12/12/12/11K b')
+		self.assertFalse(isFirstPlayer)
+		self.assertEqual(board['boardSize'], 12)
+		self.assertEqual([(str(piece), piece.position) for piece in board['P1']], [('K', (11, 0))])
+		self.assertEqual([(str(piece), piece.position) for piece in board['P2']], [('K', (0, 11))])
+
+	def test_Errors(self):
+		self.assertRaises(ValueError, parseFen, '')
+		self.assertRaises(ValueError, parseFen, '3/3/2')
+		self.assertRaises(ValueError, parseFen, '3/3/2x')
+		self.assertRaises(ValueError, parseFen, '3/3/3 x')
+
+	def test_RoundTrip(self):
+		for boardInfo in [middlegameBoardInfo(), standardBoardInfo(16)]:
+			text = formatFen(boardInfo, False)
+			board, isFirstPlayer = parseFen(text)
+			self.assertFalse(isFirstPlayer)
+			self.assertEqual(positionHash(board, False), positionHash(boardInfo, False))
+			self.assertEqual(formatFen(board, False), text)
+		self.assertEqual(formatFen(parseFen(START)[0], True), START.split(' ')[0] + ' w')
+
+	def test_Stream(self):
+		positions = list(iterFen(StringIO(START + '\n\n8/8/8/8/8/8/8/K6k b\n')))
+		self.assertEqual([isFirstPlayer for board, isFirstPlayer in positions], [True, False])
+
+	def restoreRegistry(self, pieceClasses, pieceLetters):
+		PIECE_CLASSES.clear()
+		PIECE_CLASSES.update(pieceClasses)
+		PIECE_LETTERS.clear()
+		PIECE_LETTERS.update(pieceLetters)
+
+	def test_CustomPieces(self):
+		self.addCleanup(self.restoreRegistry, dict(PIECE_CLASSES), dict(PIECE_LETTERS))
+		registerPieceClass(Wazir, 'W')
+		board, isFirstPlayer = parseFen('w3/4/4/3W')
+		self.assertEqual(type(board['P1'][0]), Wazir)
+		self.assertEqual(formatFen(board, True), 'w3/4/4/3W w')
+		self.assertRaises(ValueError, registerPieceClass, Wazir, 'K')
+
+	def test_UnknownPieces(self):
+		self.assertRaises(ValueError, parseFen, 'w3/4/4/3W')
+		self.assertRaises(ValueError, formatFen, Board(4, [Wazir((0, 0))], []), True)
+
+class WriteMovesTest(unittest.TestCase):
+
+	def test(self):
+		output = StringIO()
+		positions = [parseFen(START), parseFen('8/8/8/8/8/8/1p6/K7 w')]
+		self.assertEqual(writeMoves(output, positions, bufferLines=1), 2)
+		lines = output.getvalue().split('\n')
+		self.assertEqual(len(lines), 3)
+		self.assertEqual(len(lines[0].split(' ')), 20)
+		self.assertTrue('P0,1-0,3' in lines[0].split(' '))
+		self.assertEqual(sorted(lines[1].split(' ')), ['K0,0-0,1', 'K0,0-1,0', 'K0,0-1,1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+from chess import *
+from incremental import *
+from perft import middlegameBoardInfo, standardBoardInfo
+from test_bitboard import randomBoardInfo
+from test_chess import Nightrider, Wazir
+import random
+import unittest
+
+class Hopper(Piece):
+	""" Custom piece without a known pattern, moves two squares straight ahead """
+	__slots__ = ()
+
+	def __str__(self):
+		return 'H'
+
+	def getPossiblePositions(self, boardInfo, isP1Piece):
+		position = (self.position[0], self.position[1] + (2 if isP1Piece else -2))
+		return [position] if self.isValidMove(position, boardInfo, isP1Piece) else []
+
+class IncrementalMoveGeneratorTest(unittest.TestCase):
+
+	def assertSameMoves(self, generator, isFirstPlayer):
+		moves = generator.getAllPossibleMoves(isFirstPlayer)
+		expected = getAllPossibleMoves(generator.board, isFirstPlayer)
+		self.assertEqual([(move.piece, move.position) for move in moves], [(move.piece, move.position) for move in expected])
+
+	""" Play random moves and take them all back, checking the moves of both players after every step """
+	def checkRandomGame(self, boardInfo, rand, length):
+		generator = IncrementalMoveGenerator(boardInfo)
+		undos = []
+		isFirstPlayer = True
+		for i in xrange(length):
+			moves = generator.getAllPossibleMoves(isFirstPlayer)
+			if not moves:
+				break
+			undos.append(generator.makeMove(rand.choice(moves), isFirstPlayer))
+			isFirstPlayer = not isFirstPlayer
+			self.assertSameMoves(generator, True)
+			self.assertSameMoves(generator, False)
+		while undos:
+			generator.unmakeMove(undos.pop())
+			self.assertSameMoves(generator, True)
+			self.assertSameMoves(generator, False)
+
+	def test_StandardGames(self):
+		rand = random.Random(5)
+		for i in xrange(5):
+			self.checkRandomGame(standardBoardInfo(8), rand, 40)
+		self.checkRandomGame(middlegameBoardInfo(), rand, 40)
+		self.checkRandomGame(standardBoardInfo(16), rand, 20)
+
+	def test_RandomGames(self):
+		rand = random.Random(11)
+		for i in xrange(30):
+			self.checkRandomGame(randomBoardInfo(rand, rand.randint(1, 16)), rand, 20)
+
+	def test_CustomPieces(self):
+		board = Board(8, [Nightrider((0, 0)), Wazir((5, 5)), Hopper((3, 1)), Pawn((4, 1))],
+			[Nightrider((3, 6)), Wazir((7, 0)), Hopper((4, 6)), Pawn((5, 4))])
+		self.checkRandomGame(board, random.Random(2), 30)
+
+	def test_RecomputesOnlyAffectedPieces(self):
+		board = Board.fromBoardInfo(standardBoardInfo(16))
+		generator = IncrementalMoveGenerator(board)
+		# a knight move only touches the knight and the pieces next to its from and to squares
+		knight = board.pieceAt((1, 0), True)
+		undo = generator.makeMove(Move(knight, (2, 2)), True)
+		self.assertTrue(generator.recomputed < 8)
+		generator.unmakeMove(undo)
+		self.assertTrue(generator.recomputed < 8)
+		self.assertSameMoves(generator, True)
+
+	def test_BoardInfoDictionary(self):
+		boardInfo = middlegameBoardInfo()
+		generator = IncrementalMoveGenerator(boardInfo)
+		self.assertTrue(isinstance(generator.board, Board))
+		self.assertEqual(len(generator.getAllPossibleMoves(True)), len(getAllPossibleMoves(boardInfo, True)))
+		pawn = boardInfo['P1'][0]
+		self.assertEqual(list(map(str, generator.getPossibleMoves(pawn))), list(map(str, pawn.getPossibleMoves(boardInfo, True))))
+
+
+if __name__ == '__main__':
+    unittest.main()
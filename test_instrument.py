@@ -0,0 +1,62 @@
+from chess import *
+from perft import middlegameBoardInfo
+import instrument
+import unittest
+
+class InstrumentTest(unittest.TestCase):
+
+	def test_Counts(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 4
+		boardInfo['P1'] = [Rook((0, 0)), Pawn((1, 1))]
+		boardInfo['P2'] = [King((0, 2))]
+		with instrument.instrumented() as counters:
+			moves = getAllPossibleMoves(boardInfo, True)
+		counts = counters.snapshot()
+		self.assertEqual(counts['totalMoves'], len(moves))
+		self.assertEqual(counts['moves'], {'Rook': 5, 'Pawn': 3})
+		# rook: (0, 1) and (0, 2) up, (1, 0) (2, 0) (3, 0) right, pawn: two pushes and two diagonals
+		self.assertEqual(counts['squares'], {'Rook': 5, 'Pawn': 4})
+		# pawn: two pushes checked through isValidMove, and a capture of the king on a diagonal
+		self.assertEqual(counts['calls']['isValidMove'], 2)
+		self.assertEqual(counts['calls']['outOfBounds'], 2)
+		self.assertEqual(sorted(counts['seconds'].keys()), ['Pawn', 'Rook'])
+
+	def test_Lazy(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 4
+		boardInfo['P1'] = [Rook((0, 0)), Pawn((1, 1))]
+		boardInfo['P2'] = [King((0, 2))]
+		with instrument.instrumented() as counters:
+			self.assertTrue(hasAnyMove(boardInfo, True))
+		counts = counters.snapshot()
+		self.assertEqual(counts['moves'], {'Rook': 1})
+		self.assertEqual(counts['squares'], {'Rook': 1})
+		with instrument.instrumented() as counters:
+			self.assertEqual(str(firstCapture(boardInfo, True)), 'R(0, 2)')
+			moves = list(iterPossibleMoves(boardInfo, False))
+		counts = counters.snapshot()
+		self.assertEqual(counts['moves'], {'Rook': 5, 'King': len(moves)})
+		self.assertEqual(sorted(counts['seconds'].keys()), ['King', 'Rook'])
+
+	def test_Disabled(self):
+		hasCollision = Piece.__dict__['hasCollision']
+		with instrument.instrumented():
+			self.assertTrue(instrument.isEnabled())
+			self.assertFalse(Piece.__dict__['hasCollision'] is hasCollision)
+			with instrument.instrumented(reset=False):
+				pass
+			self.assertTrue(instrument.isEnabled())
+			getAllPossibleMoves(middlegameBoardInfo(), True)
+		self.assertFalse(instrument.isEnabled())
+		self.assertTrue(Piece.__dict__['hasCollision'] is hasCollision)
+		counts = instrument.snapshot()
+		getAllPossibleMoves(middlegameBoardInfo(), True)
+		self.assertEqual(instrument.snapshot(), counts)
+		self.assertEqual(counts['totalMoves'], 39)
+		instrument.reset()
+		self.assertEqual(instrument.snapshot()['totalMoves'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+from chess import *
+from pawncache import *
+from perft import standardBoardInfo
+from test_bitboard import randomBoardInfo
+import random
+import unittest
+
+class PawnCacheTest(unittest.TestCase):
+
+	def assertSameMoves(self, cache, boardInfo, isFirstPlayer):
+		moves = cache.getAllPossibleMoves(boardInfo, isFirstPlayer)
+		expected = getAllPossibleMoves(boardInfo, isFirstPlayer)
+		self.assertEqual([(move.piece, move.position) for move in moves], [(move.piece, move.position) for move in expected])
+
+	def test_RandomPositions(self):
+		rand = random.Random(21)
+		cache = PawnCache()
+		for i in xrange(300):
+			boardInfo = randomBoardInfo(rand, rand.randint(1, 16))
+			self.assertSameMoves(cache, boardInfo, True)
+			self.assertSameMoves(cache, Board.fromBoardInfo(boardInfo), False)
+
+	def test_Games(self):
+		rand = random.Random(8)
+		cache = PawnCache()
+		for boardSize in [8, 12]:
+			board = Board.fromBoardInfo(standardBoardInfo(boardSize))
+			isFirstPlayer = True
+			for i in xrange(80):
+				self.assertSameMoves(cache, board, isFirstPlayer)
+				moves = getAllPossibleMoves(board, isFirstPlayer)
+				if not moves:
+					break
+				makeMove(board, rand.choice(moves), isFirstPlayer)
+				isFirstPlayer = not isFirstPlayer
+		self.assertTrue(cache.hits > 0)
+		self.assertTrue(cache.fallbacks > 0)
+
+	def test_Reuse(self):
+		board = Board(8, [Pawn((0, 1)), Pawn((3, 1)), Knight((6, 0))], [Pawn((4, 6)), King((4, 7))])
+		cache = PawnCache()
+		self.assertEqual(sorted(cache.pawnPositions(board, True).items()), [((0, 1), ((0, 2), (0, 3))), ((3, 1), ((3, 2), (3, 3)))])
+		makeMove(board, Move(board['P1'][2], (5, 2)), True)
+		cache.pawnPositions(board, True)
+		self.assertEqual((cache.hits, cache.misses, cache.fallbacks), (1, 1, 0))
+		# a knight in front of a pawn blocks it, only that pawn is generated again
+		makeMove(board, Move(board['P1'][2], (3, 3)), True)
+		self.assertEqual(cache.pawnPositions(board, True)[(3, 1)], ((3, 2),))
+		self.assertEqual(cache.fallbacks, 1)
+		makeMove(board, Move(board['P1'][0], (0, 3)), True)
+		cache.pawnPositions(board, True)
+		self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+	def test_Limits(self):
+		cache = PawnCache(maxEntries=2)
+		for x in xrange(4):
+			cache.pawnPositions(Board(8, [Pawn((x, 1))], []), True)
+		self.assertEqual(len(cache), 2)
+		cache = PawnCache(maxSize=30)
+		for x in xrange(8):
+			cache.pawnPositions(Board(8, [Pawn((x, 1)), Pawn((x, 3))], [Pawn((x, 6))]), True)
+		self.assertTrue(0 < cache.size <= 30)
+		self.assertTrue(len(cache) < 8)
+		cache.clear()
+		self.assertEqual((len(cache), cache.size, cache.misses), (0, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+from chess import *
+from perft import *
+import os
+import shutil
+import tempfile
+import unittest
+
+class PerftTest(unittest.TestCase):
+
+	def test_ReferenceCounts(self):
+		for name, (build, depth) in POSITIONS.items():
+			for depth in xrange(1, 3):
+				self.assertEqual(perft(build(), True, depth), REFERENCE_COUNTS[name][depth - 1])
+		self.assertEqual(perft(standardBoardInfo(8), True, 3), REFERENCE_COUNTS['start8'][2])
+
+	def test_Bitboard(self):
+		self.assertEqual(perft(middlegameBoardInfo(), True, 2, 'bitboard'), REFERENCE_COUNTS['middlegame8'][1])
+
+	def test_Divide(self):
+		counts = divide(middlegameBoardInfo(), True, 2)
+		self.assertEqual(len(counts), REFERENCE_COUNTS['middlegame8'][0])
+		self.assertEqual(sum(count for move, count in counts), REFERENCE_COUNTS['middlegame8'][1])
+
+	def test_Parallel(self):
+		for workers, splitDepth in [(1, 1), (2, 1), (2, 2)]:
+			self.assertEqual(parallelPerft(middlegameBoardInfo(), True, 3, workers, splitDepth), REFERENCE_COUNTS['middlegame8'][2])
+		self.assertEqual(parallelDivide(middlegameBoardInfo(), True, 3, 2, 2), divide(middlegameBoardInfo(), True, 3))
+		self.assertEqual(parallelDivide(standardBoardInfo(8), False, 1, 2), divide(standardBoardInfo(8), False, 1))
+		self.assertEqual(parallelPerft(sparseBoardInfo(32), True, 2, 2, 3), REFERENCE_COUNTS['sparse32'][1])
+		self.assertEqual(len(splitPaths(standardBoardInfo(8), True, 2)), REFERENCE_COUNTS['start8'][1])
+
+	def test_BoardUnchanged(self):
+		boardInfo = middlegameBoardInfo()
+		board = Board.fromBoardInfo(middlegameBoardInfo())
+		positions = [piece.position for piece in board['P1'] + board['P2']]
+		boardHash = positionHash(board, True)
+		self.assertEqual(perft(board, True, 2), perft(boardInfo, True, 2))
+		self.assertEqual([piece.position for piece in board['P1'] + board['P2']], positions)
+		self.assertEqual(positionHash(board, True), boardHash)
+
+	def test_Breakdown(self):
+		timings = {}
+		self.assertEqual(perft(standardBoardInfo(8), True, 2, timings=timings), 400)
+		self.assertEqual(sorted(timings.keys()), ['Bishop', 'King', 'Knight', 'Pawn', 'Queen', 'Rook'])
+
+class PerftSuiteTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, 'baseline.json')
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def test_Baseline(self):
+		results = runSuite(['start8'], 2)
+		self.assertEqual(countMismatches(results), [])
+		saveBaseline(self.path, results)
+		self.assertEqual(baselineRegressions(self.path, results, 0.25), [])
+
+		slower = [dict(results[0], nps=results[0]['nps'] / 2)]
+		self.assertEqual(len(baselineRegressions(self.path, slower, 0.25)), 1)
+		self.assertEqual(baselineRegressions(self.path, slower, 0.25, 'bitboard'), [])
+
+	def test_Workers(self):
+		results = runSuite(['middlegame8'], 2, workers=2, splitDepth=1)
+		self.assertEqual(countMismatches(results), [])
+		self.assertEqual(results[0]['nodes'], REFERENCE_COUNTS['middlegame8'][1])
+
+	def test_Mismatch(self):
+		results = runSuite(['start8'], 1)
+		self.assertEqual(countMismatches(results), [])
+		results[0]['nodes'] += 1
+		self.assertEqual(countMismatches(results), results)
+
+
+if __name__ == '__main__':
+    unittest.main()
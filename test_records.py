@@ -0,0 +1,82 @@
+from chess import *
+from records import *
+from perft import middlegameBoardInfo, standardBoardInfo
+from test_bitboard import randomBoardInfo
+from test_chess import Wazir
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+class RecordTest(unittest.TestCase):
+
+	def test_EncodeDecode(self):
+		boardInfo = middlegameBoardInfo()
+		data = encodeBoard(boardInfo, False, 16)
+		self.assertEqual(len(data), recordSize(16))
+		board, isFirstPlayer = decodeBoard(data, 16)
+		self.assertFalse(isFirstPlayer)
+		self.assertTrue(isinstance(board, Board))
+		self.assertEqual(board['boardSize'], 8)
+		for key in ['P1', 'P2']:
+			self.assertEqual([(type(piece), piece.position) for piece in board[key]],
+				[(type(piece), piece.position) for piece in boardInfo[key]])
+
+	def test_Errors(self):
+		boardInfo = middlegameBoardInfo()
+		self.assertRaises(ValueError, encodeBoard, boardInfo, True, 4)
+		boardInfo['P1'].append(Wazir((7, 7)))
+		self.assertRaises(ValueError, encodeBoard, boardInfo, True, 16)
+		boardInfo['P1'][-1] = King((8, 0))
+		self.assertRaises(ValueError, encodeBoard, boardInfo, True, 16)
+		self.assertRaises(ValueError, registerPieceClass, Wazir, PIECE_CODES[King])
+
+class PositionDatabaseTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, 'positions.bin')
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def test_Views(self):
+		rand = random.Random(9)
+		positions = [(randomBoardInfo(rand, rand.randint(0, 16)), rand.random() < 0.5) for i in xrange(50)]
+		positions.append((standardBoardInfo(16), True))
+		self.assertEqual(writeDatabase(self.path, iter(positions), 32), len(positions))
+		with PositionDatabase(self.path) as database:
+			self.assertEqual(len(database), len(positions))
+			for (boardInfo, isFirstPlayer), (view, viewFirstPlayer) in zip(positions, database):
+				self.assertEqual(viewFirstPlayer, isFirstPlayer)
+				self.assertEqual(list(map(str, getAllPossibleMoves(view, isFirstPlayer))), list(map(str, getAllPossibleMoves(boardInfo, isFirstPlayer))))
+				self.assertEqual(view.positionHash(isFirstPlayer), positionHash(boardInfo, isFirstPlayer))
+			self.assertEqual(database[-1]['boardSize'], 16)
+			self.assertRaises(IndexError, database.__getitem__, len(positions))
+
+	def test_LazyView(self):
+		writeDatabase(self.path, [(middlegameBoardInfo(), True)])
+		with PositionDatabase(self.path) as database:
+			self.assertEqual(database.maxPieces, 12)
+			view = database[0]
+			self.assertEqual(view['boardSize'], 8)
+			self.assertTrue(view.pieceAt((6, 0), True) is view['P1'][10])
+			self.assertTrue('P1' in database[0])
+			self.assertEqual(len(database[0]), 3)
+			self.assertEqual(len(database[0].get('P2')), len(middlegameBoardInfo()['P2']))
+			self.assertEqual(sorted(database[0].keys()), ['P1', 'P2', 'boardSize'])
+			self.assertEqual(len(database[0].copy()['P1']), len(middlegameBoardInfo()['P1']))
+
+	def test_NotADatabase(self):
+		with open(self.path, 'wb') as databaseFile:
+			databaseFile.write(b'not a record file')
+		self.assertRaises(ValueError, PositionDatabase, self.path)
+		for data in (b'', b'CHB'):
+			with open(self.path, 'wb') as databaseFile:
+				databaseFile.write(data)
+			self.assertRaises(ValueError, PositionDatabase, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+from chess import *
+from search import *
+from fen import parseFen
+from perft import middlegameBoardInfo
+from test_chess import Wazir
+import unittest
+
+class MaterialEvaluationTest(unittest.TestCase):
+
+	def test(self):
+		board, isFirstPlayer = parseFen('k7/8/8/8/8/8/1q6/KR6 w')
+		evaluate = MaterialEvaluation()
+		self.assertEqual(evaluate(board, True), -400)
+		self.assertEqual(evaluate(board, False), 400)
+		self.assertEqual(evaluate.value(Wazir((0, 0))), DEFAULT_VALUE)
+		evaluate = MaterialEvaluation({Wazir: 150, Rook: 450})
+		self.assertEqual(evaluate.value(Wazir((0, 0))), 150)
+		self.assertEqual(evaluate(board, True), -450)
+
+class SearchTest(unittest.TestCase):
+
+	def test_CapturesKing(self):
+		board, isFirstPlayer = parseFen('k7/8/8/8/8/8/8/R6K w')
+		result = Search().search(board, isFirstPlayer, maxDepth=6)
+		self.assertEqual((result.move.piece.position, result.move.position), ((0, 0), (0, 7)))
+		self.assertEqual(result.score, MATE)
+		self.assertEqual(result.depth, 1)
+
+	def test_WinsMaterial(self):
+		board, isFirstPlayer = parseFen('k7/8/8/8/3q4/8/8/K2R4 w')
+		result = Search().search(board, isFirstPlayer, maxDepth=3)
+		self.assertEqual((str(result.move.piece), result.move.position), ('R', (3, 3)))
+		self.assertEqual(result.score, 500)
+
+	def test_AvoidsLosingKing(self):
+		# the king is attacked by the rook and has to step off the file
+		board, isFirstPlayer = parseFen('r6k/8/8/8/8/8/8/K7 w')
+		result = Search().search(board, isFirstPlayer, maxDepth=2)
+		self.assertEqual(result.move.position[0], 1)
+		self.assertTrue(abs(result.score) < MATE - 10)
+
+	def test_Budget(self):
+		board = Board.fromBoardInfo(middlegameBoardInfo())
+		positions = [piece.position for piece in board['P1'] + board['P2']]
+		boardHash = board.positionHash(True)
+		search = Search()
+		result = search.search(board, True, nodeLimit=3000)
+		self.assertTrue(result.depth >= 1)
+		self.assertTrue(result.nodes <= 3000 + CHECK_INTERVAL)
+		self.assertTrue(result.move is not None)
+		self.assertEqual([piece.position for piece in board['P1'] + board['P2']], positions)
+		self.assertEqual(board.positionHash(True), boardHash)
+		result = search.search(middlegameBoardInfo(), True, timeLimit=0.2)
+		self.assertTrue(result.seconds < 1.0)
+
+	def test_BestMoves(self):
+		board, isFirstPlayer = parseFen('k7/8/8/8/3q4/8/8/K2R4 w')
+		search = Search(maxBestMoves=4)
+		# a stored move that is not possible in the position is skipped
+		search.storeBestMove(board.positionHash(True), ((0, 0), (5, 5)))
+		result = search.search(board, isFirstPlayer, maxDepth=3)
+		self.assertEqual((str(result.move.piece), result.move.position), ('R', (3, 3)))
+		self.assertEqual(len(search.bestMoves), 4)
+		result = search.search(board, isFirstPlayer, maxDepth=3)
+		self.assertEqual(search.getBestMove(board.positionHash(True)), ((3, 0), (3, 3)))
+
+	def test_NoMoves(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 2
+		boardInfo['P1'] = [King((0, 0)), King((1, 0)), King((0, 1)), King((1, 1))]
+		boardInfo['P2'] = []
+		result = Search().search(boardInfo, True, maxDepth=3)
+		self.assertTrue(result.move is None)
+		self.assertEqual(result.score, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+from server import *
+import json
+import socket
+import threading
+import time
+import unittest
+
+START = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w'
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class MoveServiceTest(unittest.TestCase):
+
+	def startServer(self, **options):
+		self.loop = asyncio.new_event_loop()
+		self.server, self.service = startServer(self.loop, **options)
+		self.thread = threading.Thread(target=self.loop.run_forever)
+		self.thread.start()
+		port = self.server.sockets[0].getsockname()[1]
+		self.connection = socket.create_connection(('127.0.0.1', port))
+		self.reader = self.connection.makefile('rb')
+
+	def tearDown(self):
+		self.reader.close()
+		self.connection.close()
+		self.loop.call_soon_threadsafe(self.loop.stop)
+		self.thread.join()
+		self.server.close()
+		self.service.executor.shutdown()
+		self.loop.close()
+
+	def request(self, messages):
+		self.connection.sendall(''.join(json.dumps(message) + '\n' for message in messages).encode('utf-8'))
+		return [json.loads(self.reader.readline().decode('utf-8')) for message in messages]
+
+	def test_Requests(self):
+		self.startServer(executor=concurrent.futures.ThreadPoolExecutor(2), batchSize=8)
+		answers = self.request([{'id': 1, 'fen': START}, {'id': 'two', 'fen': '8/8/8/8/8/8/8/K6k b', 'backend': 'bitboard'},
+			{'id': 3, 'fen': '3/3/2'}, {'id': 4}])
+		self.assertEqual([answer['id'] for answer in answers], [1, 'two', 3, 4])
+		self.assertEqual(len(answers[0]['moves']), 20)
+		self.assertEqual(sorted(answers[1]['moves']), ['K7,0-6,0', 'K7,0-6,1', 'K7,0-7,1'])
+		self.assertTrue('error' in answers[2])
+		self.assertTrue('error' in answers[3])
+		self.connection.sendall(b'not json\n')
+		self.assertTrue('error' in json.loads(self.reader.readline().decode('utf-8')))
+
+	def test_Backpressure(self):
+		self.startServer(executor=concurrent.futures.ThreadPoolExecutor(1), batchSize=4, maxPending=8)
+		answers = self.request([{'id': i, 'fen': START} for i in range(200)])
+		self.assertEqual([answer['id'] for answer in answers], list(range(200)))
+		self.assertTrue(all(len(answer['moves']) == 20 for answer in answers))
+		self.assertTrue(self.service.batches >= 50)
+		self.assertEqual(self.service.pending, 0)
+		self.assertFalse(self.service.paused)
+
+	def test_LargeChunk(self):
+		self.startServer(executor=concurrent.futures.ThreadPoolExecutor(1), batchSize=4, maxPending=8)
+		submit = self.service.submit
+		pending = []
+		def countingSubmit(text, backend=None):
+			future = submit(text, backend)
+			pending.append(self.service.pending)
+			return future
+		self.service.submit = countingSubmit
+		answers = self.request([{'id': i, 'fen': START} for i in range(500)])
+		self.assertEqual([answer['id'] for answer in answers], list(range(500)))
+		self.assertEqual(len(pending), 500)
+		self.assertTrue(max(pending) <= 8)
+
+	def test_SlowReader(self):
+		self.startServer(executor=concurrent.futures.ThreadPoolExecutor(1), batchSize=64)
+		while not self.service.protocols:
+			time.sleep(0.01)
+		protocol, = self.service.protocols
+		self.loop.call_soon_threadsafe(protocol.transport.set_write_buffer_limits, 4096)
+		count = 20000
+		data = ''.join(json.dumps({'id': i, 'fen': START}) + '\n' for i in range(count)).encode('utf-8')
+		sender = threading.Thread(target=self.connection.sendall, args=(data,))
+		sender.start()
+		for i in range(500):
+			if protocol.writingPaused:
+				break
+			time.sleep(0.01)
+		self.assertTrue(protocol.writingPaused)
+		self.assertTrue(protocol.readingPaused)
+		answers = [json.loads(self.reader.readline().decode('utf-8')) for i in range(count)]
+		sender.join()
+		self.assertEqual([answer['id'] for answer in answers], list(range(count)))
+		self.assertFalse(protocol.writingPaused)
+
+	def test_LongLine(self):
+		self.startServer(executor=concurrent.futures.ThreadPoolExecutor(1))
+		self.connection.sendall(b'x' * (MAX_LINE_LENGTH + 1) + b'\n')
+		self.assertEqual(self.reader.readline(), b'')
+
+	def test_Cancelled(self):
+		class CancellingExecutor(concurrent.futures.ThreadPoolExecutor):
+			def submit(self, *args):
+				future = concurrent.futures.Future()
+				future.cancel()
+				return future
+		self.startServer(executor=CancellingExecutor(1), batchSize=4, maxPending=4)
+		answers = self.request([{'id': i, 'fen': START} for i in range(10)])
+		self.assertEqual([answer['id'] for answer in answers], list(range(10)))
+		self.assertTrue(all('error' in answer for answer in answers))
+		self.assertEqual(self.service.pending, 0)
+		self.assertFalse(self.service.paused)
+
+	def test_ProcessPool(self):
+		self.startServer(workers=2)
+		answers = self.request([{'id': i, 'fen': START if i % 2 else '8/8/8/8/8/8/8/K6k b'} for i in range(20)])
+		self.assertEqual([len(answer['moves']) for answer in answers], [3, 20] * 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
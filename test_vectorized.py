@@ -0,0 +1,92 @@
+from chess import *
+from perft import standardBoardInfo, sparseBoardInfo
+from test_bitboard import randomBoardInfo
+from test_chess import Nightrider, Wazir
+import random
+import unittest
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+def randomLargeBoardInfo(rand, boardSize, pieceCount):
+	squares = rand.sample([(x, y) for x in xrange(boardSize) for y in xrange(boardSize)], pieceCount * 2)
+	pieceTypes = [King, Queen, Bishop, Knight, Rook, Pawn, Nightrider, Wazir]
+	boardInfo = dict()
+	boardInfo['boardSize'] = boardSize
+	boardInfo['P1'] = [rand.choice(pieceTypes)(position) for position in squares[:pieceCount]]
+	boardInfo['P2'] = [rand.choice(pieceTypes)(position) for position in squares[pieceCount:]]
+	return boardInfo
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class VectorizedMovesTest(unittest.TestCase):
+
+	def assertSameMoves(self, boardInfo, isFirstPlayer):
+		self.assertEqual(list(map(str, getAllPossibleMoves(boardInfo, isFirstPlayer, backend='numpy'))),
+			list(map(str, getAllPossibleMoves(boardInfo, isFirstPlayer))))
+
+	def test_StandardPositions(self):
+		for boardInfo in [standardBoardInfo(8), standardBoardInfo(16), sparseBoardInfo(32)]:
+			self.assertSameMoves(boardInfo, True)
+			self.assertSameMoves(boardInfo, False)
+
+	def test_RandomPositions(self):
+		rand = random.Random(11)
+		for i in xrange(50):
+			boardInfo = randomBoardInfo(rand, rand.randint(1, 16))
+			self.assertSameMoves(boardInfo, True)
+			self.assertSameMoves(boardInfo, False)
+		for boardSize in [3, 12, 32]:
+			boardInfo = randomLargeBoardInfo(rand, boardSize, boardSize * boardSize // 5)
+			self.assertSameMoves(boardInfo, True)
+			self.assertSameMoves(boardInfo, False)
+
+	def test_Empty(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 8
+		boardInfo['P1'] = []
+		boardInfo['P2'] = [King((0, 0))]
+		self.assertEqual(getAllPossibleMoves(boardInfo, True, backend='numpy'), [])
+		self.assertSameMoves(boardInfo, False)
+
+	def test_OffBoard(self):
+		boardInfo = dict()
+		boardInfo['boardSize'] = 4
+		boardInfo['P1'] = [Pawn((4, 2))]
+		boardInfo['P2'] = [Pawn((3, 3))]
+		self.assertRaises(ValueError, getAllPossibleMoves, boardInfo, False, backend='numpy')
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class EvaluateBatchTest(unittest.TestCase):
+
+	def assertSameEvaluation(self, positions):
+		from vectorized import evaluateBatch
+		evaluation = evaluateBatch(positions)
+		for n, (boardInfo, isFirstPlayer) in enumerate(positions):
+			moves = getAllPossibleMoves(boardInfo, isFirstPlayer)
+			self.assertEqual(evaluation.moveCounts[n], len(moves))
+			counts = {}
+			for move in moves:
+				counts[move.position] = counts.get(move.position, 0) + 1
+			attacked = evaluation.attackMaps[n].nonzero()
+			self.assertEqual(dict(((x, y), evaluation.attackMaps[n, x, y]) for x, y in zip(*attacked)), counts)
+			captures = set(move.position for move in moves if isCapture(move, boardInfo, isFirstPlayer))
+			self.assertEqual(sorted(evaluation.captures[n]), sorted(captures))
+
+	def test_RandomPositions(self):
+		rand = random.Random(5)
+		self.assertSameEvaluation([(randomBoardInfo(rand, rand.randint(1, 16)), rand.random() < 0.5) for i in xrange(40)])
+		self.assertSameEvaluation([(randomLargeBoardInfo(rand, 20, 60), rand.random() < 0.5) for i in xrange(10)])
+
+	def test_StandardPositions(self):
+		self.assertSameEvaluation([(standardBoardInfo(8), True), (standardBoardInfo(8), False)])
+
+	def test_Errors(self):
+		from vectorized import evaluateBatch
+		self.assertRaises(ValueError, evaluateBatch, [])
+		self.assertRaises(ValueError, evaluateBatch, [(standardBoardInfo(8), True), (standardBoardInfo(16), True)])
+
+
+if __name__ == '__main__':
+    unittest.main()
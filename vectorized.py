@@ -0,0 +1,287 @@
+from chess import Move, SlidingPiece, JumpingPiece, Pawn
+import numpy
+
+"""
+NumPy move generation backend for very large boards with many pieces
+Occupancy of each player is kept as a boardSize x boardSize boolean array indexed by [x, y]
+and the moves of all pieces that move alike are computed together in array operations:
+slider rays advance one step at a time for all sliders of a direction set,
+jumps and pawn moves are computed for all pieces at once
+
+Gives the same moves in the same order as chess.getAllPossibleMoves
+evaluateBatch stacks many positions of one board size and gives their move counts,
+per square move maps and captures in one pass over the stack
+
+Requires numpy, piece types other than sliding, jumping pieces and pawns use their own move generation
+"""
+
+""" Get the boolean occupancy array of a list of pieces """
+def occupancyArray(pieces, boardSize):
+	occupied = numpy.zeros((boardSize, boardSize), dtype=bool)
+	if pieces:
+		positions = numpy.array([piece.position for piece in pieces], dtype=numpy.intp)
+		if ((positions < 0) | (positions >= boardSize)).any():
+			raise ValueError('NumPy backend only supports pieces on the board')
+		occupied[positions[:, 0], positions[:, 1]] = True
+	return occupied
+
+def _inBounds(x, y, boardSize):
+	return (x >= 0) & (x < boardSize) & (y >= 0) & (y < boardSize)
+
+class _MoveBuffer(object):
+	"""
+	Moves found by the array operations, as parallel arrays of piece index, order key and target
+	The order key sorts the moves of one piece the way the piece classes generate them
+	"""
+	def __init__(self):
+		self.parts = []
+
+	def add(self, pieceIndexes, order, x, y):
+		if len(pieceIndexes):
+			self.parts.append((pieceIndexes, numpy.broadcast_to(order, pieceIndexes.shape), x, y))
+
+	""" Get the target positions of each piece, indexed like the pieces """
+	def positionsPerPiece(self, pieceCount):
+		perPiece = [[] for i in range(pieceCount)]
+		if not self.parts:
+			return perPiece
+		pieceIndexes, orders, x, y = [numpy.concatenate(arrays) for arrays in zip(*self.parts)]
+		sort = numpy.lexsort((orders, pieceIndexes))
+		for pieceIndex, position in zip(pieceIndexes[sort].tolist(), zip(x[sort].tolist(), y[sort].tolist())):
+			perPiece[pieceIndex].append(position)
+		return perPiece
+
+
+"""
+Walk the rays of all sliders sharing a direction set one step at a time
+A ray stops before an own piece and after an enemy piece
+"""
+def slidingMoves(buffer, pieceIndexes, positions, directions, own, enemy):
+	boardSize = own.shape[0]
+	for d, (dx, dy) in enumerate(directions):
+		x = positions[:, 0].copy()
+		y = positions[:, 1].copy()
+		active = numpy.ones(len(pieceIndexes), dtype=bool)
+		for step in range(1, boardSize):
+			x += dx
+			y += dy
+			active &= _inBounds(x, y, boardSize)
+			walking = active.nonzero()[0]
+			if not len(walking):
+				break
+			xs, ys = x[walking], y[walking]
+			blocked = own[xs, ys]
+			free = ~blocked
+			buffer.add(pieceIndexes[walking[free]], d * boardSize + step, xs[free], ys[free])
+			active[walking[blocked | enemy[xs, ys]]] = False
+
+""" Jump all pieces sharing a set of offsets at once, keeping targets not blocked by own pieces """
+def jumpingMoves(buffer, pieceIndexes, positions, offsets, own):
+	boardSize = own.shape[0]
+	offsets = numpy.array(offsets, dtype=numpy.intp)
+	x = positions[:, 0, None] + offsets[None, :, 0]
+	y = positions[:, 1, None] + offsets[None, :, 1]
+	valid = _inBounds(x, y, boardSize)
+	valid[valid] = ~own[x[valid], y[valid]]
+	order = numpy.broadcast_to(numpy.arange(len(offsets)), x.shape)
+	rows = numpy.broadcast_to(pieceIndexes[:, None], x.shape)
+	buffer.add(rows[valid], order[valid], x[valid], y[valid])
+
+"""
+Pawn pushes and diagonal captures of all pawns of a player at once
+Pushes are only blocked by own pieces, the double push needs the pawn on its starting row
+"""
+def pawnMoves(buffer, pieceIndexes, positions, isP1Piece, own, enemy):
+	boardSize = own.shape[0]
+	if isP1Piece:
+		displacement, startingRow = 1, 1
+	else:
+		displacement, startingRow = -1, boardSize - 2
+	x = positions[:, 0]
+	y = positions[:, 1]
+
+	y1 = y + displacement
+	push = _inBounds(x, y1, boardSize)
+	push[push] = ~own[x[push], y1[push]]
+	buffer.add(pieceIndexes[push], 0, x[push], y1[push])
+
+	y2 = y + 2 * displacement
+	double = push & (y == startingRow) & _inBounds(x, y2, boardSize)
+	double[double] = ~own[x[double], y2[double]]
+	buffer.add(pieceIndexes[double], 1, x[double], y2[double])
+
+	for order, dx in ((2, displacement), (3, -displacement)):
+		xd = x + dx
+		capture = _inBounds(xd, y1, boardSize)
+		capture[capture] = enemy[xd[capture], y1[capture]]
+		buffer.add(pieceIndexes[capture], order, xd[capture], y1[capture])
+
+
+""" Iterate through all of players pieces and get all possible moves """
+def getAllPossibleMoves(boardInfo, isFirstPlayer):
+	boardSize = boardInfo['boardSize']
+	p1 = occupancyArray(boardInfo['P1'], boardSize)
+	p2 = occupancyArray(boardInfo['P2'], boardSize)
+	if isFirstPlayer:
+		pieces, own, enemy = boardInfo['P1'], p1, p2
+	else:
+		pieces, own, enemy = boardInfo['P2'], p2, p1
+
+	# group the pieces that move alike
+	sliders = {}
+	jumpers = {}
+	pawns = []
+	for i, piece in enumerate(pieces):
+		if isinstance(piece, SlidingPiece):
+			sliders.setdefault(piece.directions, []).append(i)
+		elif isinstance(piece, JumpingPiece):
+			jumpers.setdefault(piece.offsets, []).append(i)
+		elif isinstance(piece, Pawn):
+			pawns.append(i)
+
+	buffer = _MoveBuffer()
+	for directions, indexes in sliders.items():
+		indexes = numpy.array(indexes, dtype=numpy.intp)
+		slidingMoves(buffer, indexes, _positions(pieces, indexes), directions, own, enemy)
+	for offsets, indexes in jumpers.items():
+		indexes = numpy.array(indexes, dtype=numpy.intp)
+		jumpingMoves(buffer, indexes, _positions(pieces, indexes), offsets, own)
+	if pawns:
+		indexes = numpy.array(pawns, dtype=numpy.intp)
+		pawnMoves(buffer, indexes, _positions(pieces, indexes), isFirstPlayer, own, enemy)
+
+	moves = []
+	perPiece = buffer.positionsPerPiece(len(pieces))
+	for i, piece in enumerate(pieces):
+		if isinstance(piece, (SlidingPiece, JumpingPiece, Pawn)):
+			moves.extend(Move(piece, position) for position in perPiece[i])
+		else:
+			# custom pieces fall back to their own move generation
+			moves.extend(piece.getPossibleMoves(boardInfo, isFirstPlayer))
+	return moves
+
+def _positions(pieces, indexes):
+	return numpy.array([pieces[i].position for i in indexes], dtype=numpy.intp).reshape(-1, 2)
+
+
+class StackedBoards(object):
+	"""
+	Positions of the same board size stacked into arrays of shape (N, boardSize, boardSize)
+	Arrays are seen from the side to move of each position:
+	own and enemy occupancy, one mask of own pieces per slider direction set and per jump offset set, and own pawns
+	"""
+	def __init__(self, positions):
+		positions = list(positions)
+		if not positions:
+			raise ValueError('No positions to stack')
+		boardSize = positions[0][0]['boardSize']
+		shape = (len(positions), boardSize, boardSize)
+		self.boardSize = boardSize
+		self.sides = numpy.array([bool(isFirstPlayer) for boardInfo, isFirstPlayer in positions])
+		self.own = numpy.zeros(shape, dtype=bool)
+		self.enemy = numpy.zeros(shape, dtype=bool)
+		self.pawns = numpy.zeros(shape, dtype=bool)
+		self.sliders = {}
+		self.jumpers = {}
+		# pieces without array rules, as (position index, piece, boardInfo)
+		self.others = []
+
+		for n, (boardInfo, isFirstPlayer) in enumerate(positions):
+			if boardInfo['boardSize'] != boardSize:
+				raise ValueError('Stacked positions must have the same board size')
+			own, enemy = ('P1', 'P2') if isFirstPlayer else ('P2', 'P1')
+			self.own[n] = occupancyArray(boardInfo[own], boardSize)
+			self.enemy[n] = occupancyArray(boardInfo[enemy], boardSize)
+			for piece in boardInfo[own]:
+				if isinstance(piece, SlidingPiece):
+					mask = self.sliders.setdefault(piece.directions, numpy.zeros(shape, dtype=bool))
+				elif isinstance(piece, JumpingPiece):
+					mask = self.jumpers.setdefault(piece.offsets, numpy.zeros(shape, dtype=bool))
+				elif isinstance(piece, Pawn):
+					mask = self.pawns
+				else:
+					self.others.append((n, piece, boardInfo))
+					continue
+				mask[n, piece.position[0], piece.position[1]] = True
+
+	def __len__(self):
+		return len(self.sides)
+
+
+""" Shift stacked boards by (dx, dy), squares moved off the board are dropped """
+def shift(boards, dx, dy):
+	boardSize = boards.shape[1]
+	shifted = numpy.zeros_like(boards)
+	if abs(dx) >= boardSize or abs(dy) >= boardSize:
+		return shifted
+	source = (slice(None), slice(max(-dx, 0), boardSize - max(dx, 0)), slice(max(-dy, 0), boardSize - max(dy, 0)))
+	target = (slice(None), slice(max(dx, 0), boardSize - max(-dx, 0)), slice(max(dy, 0), boardSize - max(-dy, 0)))
+	shifted[target] = boards[source]
+	return shifted
+
+"""
+Count the moves landing on each square of each stacked position
+Rays of one direction never overlap, a rear slider is stopped by the own piece in front of it,
+so each direction can be flooded for all sliders of all positions at once
+"""
+def moveMaps(stacked):
+	own, enemy = stacked.own, stacked.enemy
+	free = ~own
+	counts = numpy.zeros(own.shape, dtype=numpy.int32)
+
+	directionMasks = {}
+	for directions, mask in stacked.sliders.items():
+		for direction in directions:
+			if direction in directionMasks:
+				directionMasks[direction] = directionMasks[direction] | mask
+			else:
+				directionMasks[direction] = mask
+	for (dx, dy), ray in directionMasks.items():
+		for step in range(1, stacked.boardSize):
+			ray = shift(ray, dx, dy) & free
+			if not ray.any():
+				break
+			counts += ray
+			ray &= ~enemy
+
+	for offsets, mask in stacked.jumpers.items():
+		for dx, dy in offsets:
+			counts += shift(mask, dx, dy) & free
+
+	boardSize = stacked.boardSize
+	for isP1Piece, displacement, startingRow in ((True, 1, 1), (False, -1, boardSize - 2)):
+		pawns = stacked.pawns & (stacked.sides == isP1Piece)[:, None, None]
+		if not pawns.any():
+			continue
+		push = shift(pawns, 0, displacement) & free
+		counts += push
+		starting = numpy.zeros_like(pawns)
+		starting[:, :, startingRow] = pawns[:, :, startingRow]
+		counts += shift(shift(starting, 0, displacement) & free, 0, displacement) & free
+		counts += shift(pawns, displacement, displacement) & enemy
+		counts += shift(pawns, -displacement, displacement) & enemy
+
+	for n, piece, boardInfo in stacked.others:
+		for x, y in piece.getPossiblePositions(boardInfo, stacked.sides[n]):
+			counts[n, x, y] += 1
+	return counts
+
+
+class BatchEvaluation(object):
+	"""
+	Move counts, move maps and captures of stacked positions, all from the side to move
+	moveCounts[n] is the number of possible moves of position n
+	attackMaps[n, x, y] is the number of possible moves of position n that land on (x, y)
+	captures[n] lists the enemy positions that can be captured in position n
+	"""
+	def __init__(self, stacked):
+		self.attackMaps = moveMaps(stacked)
+		self.moveCounts = self.attackMaps.sum(axis=(1, 2))
+		capturable = (self.attackMaps > 0) & stacked.enemy
+		self.captures = [[] for n in range(len(stacked))]
+		for n, x, y in zip(*[axis.tolist() for axis in capturable.nonzero()]):
+			self.captures[n].append((x, y))
+
+""" Evaluate many (boardInfo, isFirstPlayer) positions of the same board size in one vectorised pass """
+def evaluateBatch(positions):
+	return BatchEvaluation(StackedBoards(positions))